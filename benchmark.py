@@ -31,6 +31,7 @@ import platform
 from pprint import pprint
 from cProfile import Profile
 from collections import OrderedDict
+from itertools import islice
 from contextlib import contextmanager
 from tempfile import NamedTemporaryFile
 from tempfile import gettempdir
@@ -292,6 +293,54 @@ def main_run(args):
         store_result(key, doc)
 
 
+def read_project_blobs(project, limit=None):
+    blobs = {'statepoint': [], 'document': []}
+    for job in tqdm(islice(project, limit), 'read project metadata'):
+        for key, fn in (('statepoint', job.FN_MANIFEST), ('document', job.FN_DOCUMENT)):
+            try:
+                with open(job.fn(fn), 'rb') as file:
+                    blobs[key].append(file.read())
+            except FileNotFoundError:
+                pass
+    return blobs
+
+
+def benchmark_codecs(blobs, codecs, repeat=3, number=10):
+    from signac.core import json as signac_json
+
+    data = OrderedDict()
+    active_codec = signac_json.get_codec()
+    try:
+        for name in codecs:
+            signac_json.set_codec(name)
+            codec = signac_json.get_codec()
+            for key, blobs_ in blobs.items():
+                docs = [codec.decode(blob) for blob in blobs_]
+                data[(name, 'decode_' + key)] = min(timeit.repeat(
+                    lambda: [codec.decode(blob) for blob in blobs_],
+                    repeat=repeat, number=number)) / number
+                data[(name, 'encode_' + key)] = min(timeit.repeat(
+                    lambda: [codec.encode(doc) for doc in docs],
+                    repeat=repeat, number=number)) / number
+    finally:
+        signac_json.set_codec(active_codec.name)
+    return data
+
+
+def main_codecs(args):
+    from signac.core import json as signac_json
+
+    codecs = args.codecs or signac_json.get_codecs()
+    project = signac.get_project(root=args.project)
+    blobs = read_project_blobs(project, args.limit)
+    for key, blobs_ in blobs.items():
+        print("{}: {} files, {} bytes".format(key, len(blobs_), sum(map(len, blobs_))))
+    data = benchmark_codecs(blobs, codecs, args.repeat, args.number)
+    df = pd.Series(data).unstack(level=0) * 1e3
+    print("All values in ms.")
+    print(df[codecs].round(2))
+
+
 def strip_complexity(cat):
     if len(cat) > 1 and cat[1] == '_':
         return COMPLEXITY[cat[2:]], cat[2:]
@@ -507,6 +556,27 @@ if __name__ == '__main__':
              "is above this value.")
     parser_compare.set_defaults(func=main_compare)
 
+    parser_codecs = subparsers.add_parser(
+        name='codecs',
+        description="Compare the JSON codecs used for documents, manifests and caches "
+                    "on the state points and documents of an existing project.")
+    parser_codecs.add_argument(
+        'project', default='.', nargs='?',
+        help="The root directory of the project, defaults to the current directory.")
+    parser_codecs.add_argument(
+        '-c', '--codecs', nargs='+',
+        help="Limit benchmark to given codecs, defaults to all installed codecs.")
+    parser_codecs.add_argument(
+        '-l', '--limit', type=int,
+        help="Limit benchmark to the first LIMIT jobs of the project.")
+    parser_codecs.add_argument(
+        '-r', '--repeat', type=int, default=3,
+        help="The number of repetitions, the fastest one is reported (default=3).")
+    parser_codecs.add_argument(
+        '-n', '--number', type=int, default=10,
+        help="The number of executions per repetition (default=10).")
+    parser_codecs.set_defaults(func=main_codecs)
+
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.INFO)
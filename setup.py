@@ -71,7 +71,8 @@ setup(
     extras_require={
         'db': ['pymongo>=3.0'],
         'mpi': ['mpi4py'],
-        'h5': ['h5py']
+        'h5': ['h5py'],
+        'json': ['orjson'],
     },
 
     entry_points={
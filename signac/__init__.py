@@ -28,6 +28,7 @@ from .contrib import export_to_mirror
 from .contrib import export_pymongo
 from .contrib import filesystems as fs
 from .contrib import Collection
+from .contrib import compile_filter
 from .contrib import index_files
 from .contrib import index
 from .contrib import RegexFileCrawler
@@ -53,7 +54,7 @@ __all__ = ['__version__', 'contrib', 'db', 'errors', 'warnings', 'sync',
            'diff_jobs',
            'get_database', 'fetch',
            'export_one', 'export', 'export_to_mirror',
-           'Collection',
+           'Collection', 'compile_filter',
            'export_pymongo', 'fs',
            'index_files', 'index',
            'RegexFileCrawler',
@@ -384,9 +384,14 @@ def main_find(args):
             return pformat(s, depth=args.pretty)
 
     try:
-        for job_id in find_with_filter(args):
+        job_ids = list(find_with_filter(args))
+        jobs = [project.open_job(id=job_id) for job_id in job_ids]
+        if args.doc is None:
+            docs = [None] * len(jobs)
+        else:
+            docs = (doc for _, doc in project._read_job_documents(job.id for job in jobs))
+        for job_id, job, doc in zip(job_ids, jobs, docs):
             print(job_id)
-            job = project.open_job(id=job_id)
 
             if args.sp is not None:
                 sp = job.statepoint()
@@ -395,7 +400,6 @@ def main_find(args):
                 print(format_lines('sp ', job_id, sp))
 
             if args.doc is not None:
-                doc = job.document()
                 if len(args.doc) != 0:
                     doc = {key: doc[key] for key in args.doc if key in doc}
                 print(format_lines('sp ', job_id, doc))
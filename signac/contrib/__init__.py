@@ -24,6 +24,8 @@ from .indexing import export_pymongo
 from .indexing import index_files
 from .indexing import index
 from .collection import Collection
+from .collection import CompiledFilter
+from .collection import compile_filter
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +37,7 @@ __all__ = [
     'MainCrawler', 'MasterCrawler', 'fetch', 'fetched',
     'export_one', 'export', 'export_to_mirror', 'export_pymongo',
     'index_files', 'index',
-    'Collection',
+    'Collection', 'CompiledFilter', 'compile_filter',
 ]
 
 
@@ -0,0 +1,147 @@
+# Copyright (c) 2020 The Regents of the University of Michigan
+# All rights reserved.
+# This software is licensed under the BSD 3-Clause License.
+"""Binary file format of the persistent state point cache.
+
+A cache file consists of a fixed-size header, a table of job ids sorted by
+their binary representation, a table of offsets, and a blob of JSON-encoded
+state points::
+
+    header  : magic (8 bytes), version (uint32), reserved (uint32), N (uint64)
+    ids     : N x 16 bytes (binary MD5 digests, sorted)
+    offsets : (N + 1) x uint64 (relative to the start of the blob)
+    blob    : concatenated JSON-encoded state points
+
+The file is accessed *via* :mod:`mmap`, such that opening a cache file takes
+constant time and state points are only decoded when they are looked up.
+"""
+import mmap
+import os
+import struct
+from bisect import bisect_left
+
+from ..core import json
+
+
+MAGIC = b'SIGNACSP'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<8sIIQ')
+_OFFSET = struct.Struct('<Q')
+_OFFSET_PAIR = struct.Struct('<QQ')
+_ID_SIZE = 16
+
+
+class _IdTable(object):
+    """Sequence view of the sorted binary job id table for bisection."""
+
+    def __init__(self, buffer, start, size):
+        self._buffer = buffer
+        self._start = start
+        self._size = size
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, i):
+        offset = self._start + i * _ID_SIZE
+        return self._buffer[offset:offset + _ID_SIZE]
+
+
+class StatepointCacheFile(object):
+    """Read-only, memory-mapped view of a state point cache file.
+
+    Parameters
+    ----------
+    file :
+        A file object opened in binary read mode. The file may be closed
+        after the instance has been constructed.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a valid state point cache file.
+
+    """
+
+    def __init__(self, file):
+        size = os.fstat(file.fileno()).st_size
+        if size < _HEADER.size:
+            raise ValueError("The state point cache file is truncated.")
+        self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, num = _HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError("Unsupported state point cache file format.")
+            self._len = num
+            self._ids = _IdTable(self._mmap, _HEADER.size, num)
+            self._offsets = _HEADER.size + num * _ID_SIZE
+            self._blob = self._offsets + (num + 1) * _OFFSET.size
+            if self._blob > size or self._blob + self._offset(num) != size:
+                raise ValueError("The state point cache file is truncated.")
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _offset(self, i):
+        return _OFFSET.unpack_from(self._mmap, self._offsets + i * _OFFSET.size)[0]
+
+    def _find(self, jobid):
+        """Return the position of jobid in the id table or None."""
+        try:
+            key = bytes.fromhex(jobid)
+        except (TypeError, ValueError):
+            return None
+        if len(key) != _ID_SIZE:
+            return None
+        i = bisect_left(self._ids, key)
+        if i < self._len and self._ids[i] == key:
+            return i
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, jobid):
+        return self._find(jobid) is not None
+
+    def __iter__(self):
+        for i in range(self._len):
+            yield self._ids[i].hex()
+
+    def get_raw(self, jobid):
+        """Return the encoded state point for jobid or None if not found."""
+        i = self._find(jobid)
+        if i is not None:
+            start, end = _OFFSET_PAIR.unpack_from(self._mmap, self._offsets + i * _OFFSET.size)
+            return self._mmap[self._blob + start:self._blob + end]
+
+    def get(self, jobid, default=None):
+        """Return the decoded state point for jobid or default if not found."""
+        blob = self.get_raw(jobid)
+        return default if blob is None else json.decode(blob)
+
+    def close(self):
+        """Release the memory map."""
+        self._mmap.close()
+
+
+def write_cache_file(file, blobs):
+    """Write a state point cache file.
+
+    Parameters
+    ----------
+    file :
+        A file object opened in binary write mode.
+    blobs : dict
+        A mapping of job ids to JSON-encoded state points (bytes).
+
+    """
+    entries = sorted((bytes.fromhex(_id), blob) for _id, blob in blobs.items())
+    offsets = [0]
+    for _, blob in entries:
+        offsets.append(offsets[-1] + len(blob))
+    file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(entries)))
+    file.write(b''.join(key for key, _ in entries))
+    file.write(struct.pack('<{}Q'.format(len(offsets)), *offsets))
+    for _, blob in entries:
+        file.write(blob)
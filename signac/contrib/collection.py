@@ -17,12 +17,16 @@
 import argparse
 import io
 import logging
+import mmap
 import operator
+import os
 import re
 import sys
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Mapping, MutableMapping
 from itertools import islice
-from numbers import Number
-from math import isclose
+from numbers import Number, Real
+from math import isclose, isinf, isnan
 
 from ..core import json
 from .utility import _nested_dicts_to_dotted_keys
@@ -49,6 +53,15 @@ _TYPES = {
 
 MAX_DEFAULT_ID = int('F' * 32, 16)
 
+_MISSING = object()
+
+# Key of the records that mark the deletion of a document in log mode; keys
+# with dots are not permitted in documents.
+_LOG_DELETE_KEY = '.delete'
+
+# Format version of the sidecar file with the offsets of lazily opened collections.
+_OFFSETS_VERSION = 1
+
 
 def _flatten(container):
     """Yield elements from the container.
@@ -102,6 +115,149 @@ def _valid_filter(f, top=True):
         return True
 
 
+# Within a collection's indexes, documents are identified by the dense integer
+# position that the collection assigns to each primary key. A set of positions
+# is either an int bitmap or a tuple/set of positions; the helper functions
+# below operate on both representations.
+
+def _bitmap(positions):
+    """Return the bitmap (int) with the bits of the given positions set.
+
+    Parameters
+    ----------
+    positions : collection
+        Positions as a sized collection of non-negative ints.
+
+    Returns
+    -------
+    int
+        The bitmap.
+
+    """
+    if not positions:
+        return 0
+    buf = bytearray((max(positions) >> 3) + 1)
+    for p in positions:
+        buf[p >> 3] |= 1 << (p & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def _iter_positions(positions):
+    """Iterate over a set of positions.
+
+    Parameters
+    ----------
+    positions : int or collection
+        A bitmap or a collection of positions.
+
+    Returns
+    -------
+    iterator
+        Iterator over the positions, in ascending order for bitmaps.
+
+    """
+    if type(positions) is not int:
+        return iter(positions)
+
+    def iter_bits(bits):
+        i = bits.find('1')
+        while i != -1:
+            yield i
+            i = bits.find('1', i + 1)
+
+    return iter_bits(bin(positions)[:1:-1])
+
+
+def _count_positions(positions):
+    """Return the number of positions in a bitmap or collection of positions."""
+    if type(positions) is int:
+        return bin(positions).count('1')
+    return len(positions)
+
+
+def _select_positions(positions, bitmap, present):
+    """Return the set of positions whose bit in bitmap is (not) set.
+
+    Parameters
+    ----------
+    positions : collection
+        The positions to select from.
+    bitmap : int
+        The bitmap to test the positions against.
+    present : bool
+        Whether to select the positions with or without bit set.
+
+    Returns
+    -------
+    set
+        The selected positions.
+
+    """
+    mask = bitmap.to_bytes((bitmap.bit_length() + 7) >> 3, 'little')
+    n = len(mask) << 3
+    return {p for p in positions
+            if bool(p < n and (mask[p >> 3] >> (p & 7)) & 1) is present}
+
+
+def _intersect_positions(a, b):
+    """Return the intersection of two sets of positions."""
+    if type(a) is int:
+        if type(b) is int:
+            return a & b
+        a, b = b, a
+    elif type(b) is not int:
+        return set(a).intersection(b)
+    return _select_positions(a, b, True)
+
+
+def _subtract_positions(a, b):
+    """Return the positions of a that are not in b."""
+    if type(a) is int:
+        return a & ~(b if type(b) is int else _bitmap(b))
+    elif type(b) is int:
+        return _select_positions(a, b, False)
+    return set(a).difference(b)
+
+
+def _union_positions(position_sets):
+    """Return the union of the given sets of positions."""
+    bitmap, positions = 0, set()
+    for p in position_sets:
+        if type(p) is int:
+            bitmap |= p
+        else:
+            positions.update(p)
+    if bitmap:
+        return bitmap | _bitmap(positions)
+    return positions
+
+
+def _compact_positions(positions):
+    """Return a non-empty set of positions in its most compact representation.
+
+    A bitmap requires one bit per position up to the largest position, a sorted
+    tuple one word (64 bits) per position.
+
+    Parameters
+    ----------
+    positions : int or collection
+        A bitmap or a collection of positions.
+
+    Returns
+    -------
+    int or tuple
+        The positions as bitmap or as sorted tuple.
+
+    """
+    if type(positions) is int:
+        if _count_positions(positions) << 6 > positions.bit_length():
+            return positions
+        return tuple(_iter_positions(positions))
+    if len(positions) << 6 > max(positions):
+        return _bitmap(positions)
+    return tuple(sorted(positions))
+
+
 class _float(float):
     # Numerical objects of either integer or float type, that share the same numerical value,
     # but not the same type, are distinguished within a Collection, but considered equal within
@@ -121,7 +277,144 @@ class _TypedSetDefaultDict(dict):
     to the same integer as int type, which means they cannot be stored separately in a
     standard dict.
 
+    The dictionary also provides sorted views of its numerical and string keys, which
+    are built on demand and then updated by bisection whenever a key is added or removed.
+
     """
+    _sorted = None
+
+    def _sorted_keys(self):
+        """Return the keys grouped by type, with numbers and strings sorted.
+
+        Returns
+        -------
+        tuple
+            Sorted list of real numbers except NaN, list of NaN values, sorted list
+            of strings, and list of all remaining keys.
+
+        """
+        if self._sorted is None:
+            numbers, nans, strings, other = [], [], [], []
+            for key in dict.keys(self):
+                if isinstance(key, Real):
+                    (nans if isnan(key) else numbers).append(key)
+                elif isinstance(key, str):
+                    strings.append(key)
+                else:
+                    other.append(key)
+            numbers.sort()
+            strings.sort()
+            self._sorted = numbers, nans, strings, other
+        return self._sorted
+
+    def _add_sorted(self, key):
+        """Add a new (internal) key to the sorted views, if they were built."""
+        if self._sorted is None:
+            return
+        numbers, nans, strings, other = self._sorted
+        if isinstance(key, Real):
+            if isnan(key):
+                nans.append(key)
+            else:
+                insort(numbers, key)
+        elif isinstance(key, str):
+            insort(strings, key)
+        else:
+            other.append(key)
+
+    def _discard_sorted(self, key):
+        """Remove an (internal) key from the sorted views, if they were built."""
+        if self._sorted is None:
+            return
+        numbers, nans, strings, other = self._sorted
+        if isinstance(key, Real) and not isnan(key):
+            keys, is_sorted = numbers, True
+        elif isinstance(key, str):
+            keys, is_sorted = strings, True
+        else:
+            keys, is_sorted = (nans if isinstance(key, Real) else other), False
+        for i in range(bisect_left(keys, key) if is_sorted else 0, len(keys)):
+            k = keys[i]
+            if k is key or (type(k) is type(key) and k == key):
+                del keys[i]
+                return
+            if is_sorted and k != key:
+                break
+        # Not found, e.g. a NaN key that is not identical; rebuild on demand.
+        self._sorted = None
+
+    def _union(self, keys):
+        """Return the union of the sets stored for the given (internal) keys."""
+        return set().union(*(dict.__getitem__(self, key) for key in keys))
+
+    def _find_range(self, op, argument):
+        """Find all values that compare to argument by bisection of the sorted keys.
+
+        Parameters
+        ----------
+        op : str
+            One of '$lt', '$lte', '$gt', and '$gte'.
+        argument :
+            The value to compare against.
+
+        Returns
+        -------
+        set or None
+            The union of the matching sets or None if the keys are not all
+            comparable with the argument.
+
+        """
+        numbers, nans, strings, other = self._sorted_keys()
+        if isinstance(argument, Real) and not isnan(argument):
+            if strings or other:
+                return None
+            keys = numbers
+        elif isinstance(argument, str):
+            if numbers or nans or other:
+                return None
+            keys = strings
+        else:
+            return None
+        if op == '$lt':
+            return self._union(keys[:bisect_left(keys, argument)])
+        elif op == '$lte':
+            return self._union(keys[:bisect_right(keys, argument)])
+        elif op == '$gt':
+            return self._union(keys[bisect_right(keys, argument):])
+        else:
+            return self._union(keys[bisect_left(keys, argument):])
+
+    def _find_near(self, argument, rel_tol, abs_tol):
+        """Find all values close to argument by bisection of the sorted keys.
+
+        Parameters
+        ----------
+        argument : float
+            The value to compare against.
+        rel_tol : float
+            Relative tolerance.
+        abs_tol : float
+            Absolute tolerance.
+
+        Returns
+        -------
+        set or None
+            The union of the matching sets or None if the keys are not all
+            real numbers or the tolerance does not permit a bounded search.
+
+        """
+        numbers, nans, strings, other = self._sorted_keys()
+        if strings or other:
+            return None
+        if not 0 <= rel_tol < 1 or abs_tol < 0 or isnan(argument) or isinf(argument):
+            return None
+        # Any value v close to the argument satisfies |v - argument| <= width.
+        width = max(rel_tol * abs(argument) / (1 - rel_tol), abs_tol)
+        width += 4 * sys.float_info.epsilon * (abs(argument) + width)
+        lo = bisect_left(numbers, argument - width)
+        hi = bisect_right(numbers, argument + width)
+        return self._union(key for key in numbers[lo:hi] if isclose(
+            key, argument, rel_tol=rel_tol, abs_tol=abs_tol))
 
     def keys(self):
         for key in dict.keys(self):
@@ -136,6 +429,7 @@ class _TypedSetDefaultDict(dict):
     def __missing__(self, key):
         value = set()
         dict.__setitem__(self, key, value)
+        self._add_sorted(key)
         return value
 
     def __getitem__(self, key):
@@ -143,12 +437,15 @@ class _TypedSetDefaultDict(dict):
                                 _float(key) if type(key) is float else key)
 
     def __setitem__(self, key, value):
-        return dict.__setitem__(self,
-                                _float(key) if type(key) is float else key, value)
+        key = _float(key) if type(key) is float else key
+        if not dict.__contains__(self, key):
+            self._add_sorted(key)
+        return dict.__setitem__(self, key, value)
 
     def __delitem__(self, key):
-        dict.__delitem__(self,
-                         _float(key) if type(key) is float else key)
+        key = _float(key) if type(key) is float else key
+        dict.__delitem__(self, key)
+        self._discard_sorted(key)
 
     def get(self, key, default=None):
         """Get the value for given key.
@@ -169,7 +466,118 @@ class _TypedSetDefaultDict(dict):
                         _float(key) if type(key) is float else key, default)
 
 
-def _build_index(docs, key, primary_key):
+class _PositionIndex(_TypedSetDefaultDict):
+    """Index that maps values to the positions of the documents with that value.
+
+    The positions of each value are stored as bitmap or as sorted tuple,
+    whichever is more compact, see :func:`~._compact_positions`.
+
+    The index further records the (internal) key that each position is stored
+    under, such that positions can be removed without searching all keys.
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(_PositionIndex, self).__init__(*args, **kwargs)
+        self._keys = []
+
+    def _union(self, keys):
+        """Return the union of the positions stored for the given (internal) keys."""
+        return _union_positions([dict.__getitem__(self, key) for key in keys])
+
+    def _merge(self, other):
+        """Add all positions of another index to this index."""
+        keys = self._keys
+        for key, positions in dict.items(other):
+            current = dict.get(self, key)
+            if current is None:
+                dict.__setitem__(self, key, positions)
+                self._add_sorted(key)
+            else:
+                dict.__setitem__(self, key, _compact_positions(
+                    _union_positions((current, positions))))
+            for p in _iter_positions(positions):
+                if p >= len(keys):
+                    keys.extend([_MISSING] * (p + 1 - len(keys)))
+                keys[p] = key
+
+    def _remove(self, positions):
+        """Remove positions from this index, discarding keys without positions."""
+        keys = self._keys
+        removed = dict()
+        for p in positions:
+            if p < len(keys) and keys[p] is not _MISSING:
+                removed.setdefault(keys[p], []).append(p)
+                keys[p] = _MISSING
+        for key, group in removed.items():
+            remaining = _subtract_positions(dict.__getitem__(self, key), group)
+            if remaining:
+                dict.__setitem__(self, key, _compact_positions(remaining))
+            else:
+                del self[key]
+
+
+class _IndexView(Mapping):
+    """Read-only view of a collection index, which maps values to sets of ids.
+
+    The view is backed by the internal :class:`~._PositionIndex` of the
+    collection and reflects all changes of the collection.  The sets of ids
+    are created on access; modifying them does not affect the collection.
+
+    Like the index itself, the view distinguishes integer and float values
+    and returns an empty set for values that no document has.
+
+    Parameters
+    ----------
+    collection : :class:`~.Collection`
+        The collection of the index.
+    key : str
+        The key of the index.
+
+    """
+
+    def __init__(self, collection, key):
+        self._collection = collection
+        self._key = key
+
+    def _positions(self):
+        return self._collection._index(self._key, build=True)
+
+    def _ids(self, positions):
+        ids = self._collection._ids_by_position
+        return {ids[p] for p in _iter_positions(positions)}
+
+    def __getitem__(self, value):
+        positions = self._positions().get(value)
+        return set() if positions is None else self._ids(positions)
+
+    def __contains__(self, value):
+        return dict.__contains__(
+            self._positions(), _float(value) if type(value) is float else value)
+
+    def __iter__(self):
+        return iter(list(self._positions().keys()))
+
+    def __len__(self):
+        return len(self._positions())
+
+    def get(self, value, default=None):
+        positions = self._positions().get(value)
+        return default if positions is None else self._ids(positions)
+
+    def items(self):
+        for value, positions in list(self._positions().items()):
+            yield value, self._ids(positions)
+
+    def values(self):
+        for _, ids in self.items():
+            yield ids
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, dict(self.items()))
+
+
+def _build_index(docs, key, primary_key, positions):
     """Build an index for 'key'; highly performance critical code path.
 
     Parameters
@@ -180,10 +588,12 @@ def _build_index(docs, key, primary_key):
         The key to build index.
     primary_key : str
         The primary key.
+    positions : dict
+        The positions of the documents by primary key.
 
     Returns
     -------
-    :class:`~_TypedSetDefaultDict`
+    :class:`~_PositionIndex`
         Index for key.
 
     Raises
@@ -192,53 +602,104 @@ def _build_index(docs, key, primary_key):
         The document contains invalid keys.
 
     """
-    nodes = key.split('.')
-    index = _TypedSetDefaultDict()
+    return _build_indexes(docs, (key,), primary_key, positions)[key]
 
-    for doc in docs:
-        try:
-            v = doc[nodes[0]]
-            for n in nodes[1:]:
-                v = v[n]
-            if type(v) is dict:
-                v = _DictPlaceholder
-        except (KeyError, TypeError):
-            pass
-        except Exception as error:
-            raise RuntimeError(
-                "An unexpected error occured while processing "
-                "doc '{}': {}.".format(doc, error))
-        else:
-            # inlined for performance
-            if type(v) is dict:
-                continue
-            elif type(v) is list:   # performance
-                index[_to_hashable(v)].add(doc[primary_key])
-            else:
-                index[v].add(doc[primary_key])
 
-        if len(nodes) > 1:
+def _build_indexes(docs, keys, primary_key, positions):
+    """Build the indexes for several keys in a single pass over the documents.
+
+    Parameters
+    ----------
+    docs : iterable
+        iterable of doc to build the indexes.
+    keys : iterable
+        The keys to build indexes.
+    primary_key : str
+        The primary key.
+    positions : dict
+        The positions of the documents by primary key.
+
+    Returns
+    -------
+    dict
+        The index (:class:`~_PositionIndex`) by key.
+
+    Raises
+    ------
+    InvalidKeyError
+        The document contains invalid keys.
+
+    """
+    indexes = {key: _PositionIndex() for key in keys}
+    paths = [(key.split('.'), index) for key, index in indexes.items()]
+
+    for doc in docs:
+        for nodes, index in paths:
             try:
-                v = doc['.'.join(nodes)]
-            except KeyError:
+                v = doc[nodes[0]]
+                for n in nodes[1:]:
+                    v = v[n]
+                if type(v) is dict:
+                    v = _DictPlaceholder
+            except (KeyError, TypeError):
                 pass
+            except Exception as error:
+                raise RuntimeError(
+                    "An unexpected error occured while processing "
+                    "doc '{}': {}.".format(doc, error))
             else:
-                from ..errors import InvalidKeyError
-                raise InvalidKeyError(
-                    "\nThe document contains invalid keys. "
-                    "Specifically keys with dots ('.').\n\n"
-                    "See https://signac.io/document-wide-migration/ "
-                    "for a recipe on how to replace dots in existing keys.")
-    return index
+                # inlined for performance
+                if type(v) is dict:
+                    continue
+                elif type(v) is list:   # performance
+                    v = _to_hashable(v)
+                elif type(v) is float:
+                    v = _float(v)
+                index[v].add(positions[doc[primary_key]])
+
+            if len(nodes) > 1:
+                try:
+                    v = doc['.'.join(nodes)]
+                except KeyError:
+                    pass
+                else:
+                    from ..errors import InvalidKeyError
+                    raise InvalidKeyError(
+                        "\nThe document contains invalid keys. "
+                        "Specifically keys with dots ('.').\n\n"
+                        "See https://signac.io/document-wide-migration/ "
+                        "for a recipe on how to replace dots in existing keys.")
+    for index in indexes.values():
+        for v, group in dict.items(index):
+            dict.__setitem__(index, v, _compact_positions(group))
+    return indexes
+
+
+def _match_index_values(index, test):
+    """Return the positions of the documents whose value passes the test.
+
+    Parameters
+    ----------
+    index : :class:`_PositionIndex`
+        The index to search.
+    test : callable
+        Called with each value of the index.
+
+    Returns
+    -------
+    int or set
+        Positions of the documents with matching values.
+
+    """
+    return index._union([key for key, value in zip(dict.keys(index), index.keys())
+                         if test(value)])
 
 
-def _find_with_index_operator(index, op, argument):
-    """Find index for given operator and argument.
+def _compile_index_operator(op, argument):
+    """Compile an index operator and its argument.
 
     Parameters
     ----------
-    index : dict
-        Index for the operator.
     op : str
         logical operator.
     argument :
@@ -247,37 +708,37 @@ def _find_with_index_operator(index, op, argument):
 
     Returns
     -------
-    set
-        Index for given operator and argument.
+    callable
+        A function that returns the positions of the documents of an index
+        matching the operator and argument.
 
     Raises
     ------
     ValueError
-        When unknown argument is given for $type operator (When the operator is $type).
+        When unknown argument is given for $type operator (When the operator is $type)
+        or an invalid argument is given for the $near operator.
 
     """
     if op == '$in':
-        def op(value, argument):
+        def test(value):
             return value in argument
     elif op == '$nin':
-        def op(value, argument):
+        def test(value):
             return value not in argument
     elif op == '$regex':
-        def op(value, argument):
-            if isinstance(value, str):
-                return re.search(argument, value)
-            else:
-                return False
+        pattern = re.compile(argument)
+
+        def test(value):
+            return isinstance(value, str) and pattern.search(value) is not None
     elif op == '$type':
-        def op(value, argument):
-            if argument in _TYPES:
-                t = _TYPES[argument]
-            else:
-                raise ValueError("Unknown argument for $type operator: '{}'.".format(argument))
+        if argument not in _TYPES:
+            raise ValueError("Unknown argument for $type operator: '{}'.".format(argument))
+        t = _TYPES[argument]
+
+        def test(value):
             return isinstance(value, t)
     elif op == '$where':
-        def op(value, argument):
-            return eval(argument)(value)
+        test = eval(argument)
     elif op == '$near':
         rel_tol, abs_tol = 1e-9, 0.0  # default values
         if isinstance(argument, (list, tuple)):
@@ -295,15 +756,32 @@ def _find_with_index_operator(index, op, argument):
         rel_tol = float(rel_tol)
         abs_tol = float(abs_tol)
 
-        def op(value, argument):
+        def test(value):
             return isclose(value, argument, rel_tol=rel_tol, abs_tol=abs_tol)
+
+        def find(index):
+            matches = index._find_near(argument, rel_tol, abs_tol)
+            if matches is None:
+                matches = _match_index_values(index, test)
+            return matches
+        return find
     else:
-        op = getattr(operator, {'$gte': '$ge', '$lte': '$le'}.get(op, op)[1:])
-    matches = set()
-    for value in index:
-        if op(value, argument):
-            matches.update(index[value])
-    return matches
+        compare = getattr(operator, {'$gte': '$ge', '$lte': '$le'}.get(op, op)[1:])
+
+        def test(value):
+            return compare(value, argument)
+
+        if op in ('$lt', '$lte', '$gt', '$gte'):
+            def find(index):
+                matches = index._find_range(op, argument)
+                if matches is None:
+                    matches = _match_index_values(index, test)
+                return matches
+            return find
+
+    def find(index):
+        return _match_index_values(index, test)
+    return find
 
 
 def _check_logical_operator_argument(op, argument):
@@ -328,6 +806,280 @@ def _check_logical_operator_argument(op, argument):
         raise ValueError("The argument of logical-operator '{}' cannot be empty!".format(op))
 
 
+class _CompiledExpression(object):
+    """A non-logical filter expression with a pre-resolved operator.
+
+    Parameters
+    ----------
+    field : str
+        The top-level key of the filter that the expression belongs to.
+    key : str
+        The dotted key of the index that is searched.
+    op : str
+        The expression-operator or None for equality.
+    value :
+        The value or the argument of the operator.
+    find : callable
+        Returns the positions of the documents of an index that match the
+        expression.
+
+    """
+    __slots__ = ('field', 'key', 'op', 'value', 'find')
+
+    def __init__(self, field, key, op, value, find):
+        self.field = field
+        self.key = key
+        self.op = op
+        self.value = value
+        self.find = find
+
+    def _prefixed(self, prefix):
+        """Return the expression with the given prefix for its keys."""
+        key = '{}.{}'.format(prefix, self.key) if self.key else prefix
+        return type(self)('{}.{}'.format(prefix, self.field), key, self.op, self.value, self.find)
+
+
+def _compile_expression(field, key, value):
+    """Compile a non-logical expression.
+
+    Parameters
+    ----------
+    field : str
+        The top-level key of the filter that the expression belongs to.
+    key : str
+        The dotted key of the expression, including the operator.
+    value :
+        The value for the expression-operator.
+
+    Returns
+    -------
+    :class:`_CompiledExpression`
+        The compiled expression.
+
+    Raises
+    ------
+    KeyError
+        When Bad operator expression/ Bad operator placement or
+        the expression-operator is unknown.
+    ValueError
+        The value is not bool when operator for '$exists' operator.
+
+    """
+    if '$' in key:
+        if key.count('$') > 1:
+            raise KeyError("Bad operator expression '{}'.".format(key))
+        nodes = key.split('.')
+        op = nodes[-1]
+        if not op.startswith('$'):
+            raise KeyError("Bad operator placement '{}'.".format(key))
+        key = '.'.join(nodes[:-1])
+        if op in _INDEX_OPERATORS:
+            find = _compile_index_operator(op, value)
+        elif op == '$exists':
+            if not isinstance(value, bool):
+                raise ValueError("The value of the '$exists' operator must be boolean.")
+
+            def find(index):
+                return index._union(dict.keys(index))
+        else:
+            raise KeyError("Unknown expression-operator '{}'.".format(op))
+    else:
+        op = None
+        # Check to see if 'value' is a floating point type but an
+        # integer value (e.g., 4.0), and search for both the int and float
+        # values. This allows the user to find statepoints that have
+        # integer-valued keys that are stored as floating point types.
+        # Note that this both cases: 1) user searches for an int and hopes
+        # to find values that are stored as integer-valued floats and 2) user
+        # searches for a integer-valued float and hopes to find ints.
+        # This way, both `signac find x 4.0` and `signac find x 4` would
+        # return jobs where `sp.x` is stored as either 4.0 or 4.
+        if isinstance(value, Number) and float(value).is_integer():
+            values = int(value), _float(value)
+
+            def find(index):
+                return _union_positions([index.get(v, ()) for v in values])
+        else:
+            def find(index):
+                return index.get(value, ())
+    return _CompiledExpression(field, key, op, value, find)
+
+
+class _CompiledNode(object):
+    """A compiled filter expression, possibly nested within logical operators.
+
+    Parameters
+    ----------
+    expr : dict
+        The normalized filter expression.
+
+    Raises
+    ------
+    ValueError
+        When the expression or the argument of a logical-operator is invalid.
+
+    """
+    __slots__ = ('values', 'expressions', 'not_', 'and_', 'or_', '_size')
+
+    def __init__(self, expr):
+        if not isinstance(expr, dict):
+            raise ValueError("Invalid filter expression '{}'.".format(expr))
+        self._size = len(expr)
+        expr = dict(expr)
+
+        # Extract all logical-operator expressions.
+        or_expressions = expr.pop('$or', None)
+        and_expressions = expr.pop('$and', None)
+        not_expression = expr.pop('$not', None)
+        self.or_ = self.and_ = self.not_ = None
+        if or_expressions is not None:
+            _check_logical_operator_argument('$or', or_expressions)
+            self.or_ = tuple(type(self)(expr_) for expr_ in or_expressions)
+        if and_expressions is not None:
+            _check_logical_operator_argument('$and', and_expressions)
+            self.and_ = tuple(type(self)(expr_) for expr_ in and_expressions)
+        if not_expression is not None:
+            self.not_ = type(self)(not_expression)
+
+        # The values are kept for the look-up of primary keys.
+        self.values = expr
+        self.expressions = tuple(
+            _compile_expression(field, key, value)
+            for field in expr
+            for key, value in _nested_dicts_to_dotted_keys(expr[field], key=field))
+
+    def __len__(self):
+        return self._size
+
+    def _keys(self):
+        """Return the keys of the indexes searched by the node's expressions."""
+        keys = {e.key for e in self.expressions}
+        for node in (self.not_,) + (self.and_ or ()) + (self.or_ or ()):
+            if node is not None:
+                keys.update(node._keys())
+        return keys
+
+    @classmethod
+    def _conjunction(cls, nodes):
+        """Return a node that matches the documents matching all given nodes."""
+        node = object.__new__(cls)
+        node._size = 1
+        node.values = {}
+        node.expressions = ()
+        node.not_ = node.or_ = None
+        node.and_ = tuple(nodes)
+        return node
+
+    def _prefixed(self, prefix):
+        """Return the node with the given prefix for all keys.
+
+        Keys within logical-operator expressions are prefixed recursively.
+
+        """
+        node = object.__new__(type(self))
+        node._size = self._size
+        node.values = {'{}.{}'.format(prefix, k): v for k, v in self.values.items()}
+        node.expressions = tuple(e._prefixed(prefix) for e in self.expressions)
+        node.not_ = None if self.not_ is None else self.not_._prefixed(prefix)
+        node.and_ = None if self.and_ is None else tuple(n._prefixed(prefix) for n in self.and_)
+        node.or_ = None if self.or_ is None else tuple(n._prefixed(prefix) for n in self.or_)
+        return node
+
+
+class CompiledFilter(object):
+    """A filter that is normalized, validated and compiled once.
+
+    Compiled filters are returned by :func:`compile_filter` and are accepted
+    in place of a filter by :meth:`Collection.find`,
+    :meth:`~signac.Project.find_jobs` and
+    :class:`~signac.contrib.project.JobsCursor`, such that repeated searches
+    with the same filter skip its normalization. Compiled filters are
+    immutable and compare equal if their filters are equal.
+
+    Parameters
+    ----------
+    filter : dict
+        The filter.
+
+    """
+    __slots__ = ('_json', '_node', '_prefixed_nodes')
+
+    def __init__(self, filter):
+        self._json = json.dumps(filter)
+        filter = json.loads(self._json)  # Normalize
+        if not _valid_filter(filter):
+            raise ValueError(filter)
+        self._node = _CompiledNode({} if filter is None else filter)
+        self._prefixed_nodes = {}
+
+    @property
+    def filter(self):
+        """dict: A copy of the normalized filter."""
+        return json.loads(self._json)
+
+    def _prefixed_node(self, prefix):
+        """Return the compiled node with the given prefix for all keys."""
+        try:
+            return self._prefixed_nodes[prefix]
+        except KeyError:
+            node = self._prefixed_nodes[prefix] = self._node._prefixed(prefix)
+            return node
+
+    def __bool__(self):
+        return len(self._node) > 0
+
+    def __eq__(self, other):
+        if not isinstance(other, CompiledFilter):
+            return NotImplemented
+        return self.filter == other.filter
+
+    def __hash__(self):
+        return hash(json.dumps(self.filter, sort_keys=True))
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.filter)
+
+
+def compile_filter(filter):
+    """Compile a filter for repeated searches.
+
+    The filter is normalized and validated, nested keys are flattened, the
+    expression-operators are resolved, regular expressions are compiled and
+    ``$where`` expressions are evaluated once. The returned compiled filter
+    can be passed to :meth:`Collection.find` or :meth:`~signac.Project.find_jobs`
+    in place of the filter:
+
+    .. code-block:: python
+
+        f = compile_filter({'a': {'$regex': '^foo'}})
+        for project in projects:
+            print(len(project.find_jobs(f)))
+
+    Parameters
+    ----------
+    filter : dict
+        The filter, see :meth:`Collection.find` for the supported operators.
+
+    Returns
+    -------
+    :class:`CompiledFilter`
+        The compiled filter; compiled filters are returned unchanged.
+
+    Raises
+    ------
+    TypeError
+        If the filter is not JSON serializable.
+    ValueError
+        If the filter is invalid.
+    KeyError
+        If the filter contains invalid or unknown operators.
+
+    """
+    if isinstance(filter, CompiledFilter):
+        return filter
+    return CompiledFilter(filter)
+
+
 class _CollectionSearchResults(object):
     """Iterator for a Collection result vector."""
     def __init__(self, collection, _ids):
@@ -348,6 +1100,174 @@ class JSONParseError(ValueError):
     pass
 
 
+def _scan_lines(buffer, primary_key):
+    """Return the start offsets of the documents in a buffer with one document per line.
+
+    The primary key of a document is read without decoding the document if
+    it is the document's first key and an unescaped string.
+
+    Parameters
+    ----------
+    buffer :
+        A bytes-like object with one JSON-encoded document per line.
+    primary_key : str
+        The primary key.
+
+    Returns
+    -------
+    dict
+        The start offsets of the documents by primary key.
+
+    Raises
+    ------
+    JSONParseError
+        When a line cannot be decoded or the document has no primary key.
+
+    """
+    key = json.dumps(primary_key).encode('utf-8')
+    prefixes = [b'{' + key + b': "', b'{' + key + b':"']
+    offsets = dict()
+    start, size = 0, len(buffer)
+    while start < size:
+        end = buffer.find(b'\n', start)
+        if end == -1:
+            end = size
+        _id = None
+        for prefix in prefixes:
+            if buffer[start:start + len(prefix)] == prefix:
+                quote = buffer.find(b'"', start + len(prefix), end)
+                if quote != -1:
+                    raw = buffer[start + len(prefix):quote]
+                    if b'\\' not in raw:
+                        _id = raw.decode('utf-8')
+                break
+        if _id is None:
+            # Empty lines are rejected, like they are by Collection.open().
+            try:
+                _id = json.decode(buffer[start:end])[primary_key]
+            except (ValueError, KeyError, TypeError) as error:
+                raise JSONParseError(
+                    "Error while trying to parse line at offset {}: {}.".format(start, error))
+        offsets[_id] = start
+        start = end + 1
+    return offsets
+
+
+def _fsync_dir(dirname):
+    """Sync a directory to disk, such that the renames of its files persist."""
+    try:
+        fd = os.open(dirname, os.O_RDONLY)
+    except OSError:
+        return  # directories cannot be opened on all platforms
+    try:
+        os.fsync(fd)
+    except OSError as error:
+        logger.warning("Unable to fsync directory '{}': {}".format(dirname, error))
+    finally:
+        os.close(fd)
+
+
+def _read_offsets(fn, primary_key, stat):
+    """Read the offsets of the documents of a collection file from its sidecar file.
+
+    Returns None if the sidecar file does not exist or does not match the
+    size and modification time of the collection file.
+    """
+    try:
+        with open(fn, 'rb') as file:
+            sidecar = json.decode(file.read())
+        if sidecar['version'] == _OFFSETS_VERSION and sidecar['primary_key'] == primary_key \
+                and sidecar['size'] == stat.st_size and sidecar['mtime_ns'] == stat.st_mtime_ns:
+            return dict(zip(sidecar['ids'], sidecar['offsets']))
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        pass
+
+
+def _write_offsets(fn, primary_key, stat, offsets):
+    """Write the offsets of the documents of a collection file to its sidecar file."""
+    sidecar = {
+        'version': _OFFSETS_VERSION,
+        'primary_key': primary_key,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'ids': list(offsets),
+        'offsets': list(offsets.values()),
+    }
+    fn_tmp = fn + '~'
+    try:
+        with open(fn_tmp, 'wb') as file:
+            file.write(json.encode(sidecar))
+        os.replace(fn_tmp, fn)
+    except (IOError, OSError) as error:
+        logger.debug("Unable to write collection offsets file '{}': {}".format(fn, error))
+        try:
+            os.remove(fn_tmp)
+        except (IOError, OSError):
+            pass
+
+
+class _LazyDocs(MutableMapping):
+    """Mapping of primary keys to documents that are decoded on access.
+
+    The documents are read from a memory-mapped file with one JSON-encoded
+    document per line. Documents that are set are kept in memory, the file is
+    never modified.
+
+    Parameters
+    ----------
+    file :
+        A file object opened in binary read mode.
+    offsets : dict
+        The start offsets of the documents' lines by primary key.
+
+    """
+
+    def __init__(self, file, offsets):
+        if os.fstat(file.fileno()).st_size:
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._buffer = b''  # empty files cannot be memory-mapped
+        self._offsets = offsets
+        self._docs = dict()
+
+    def __getitem__(self, _id):
+        try:
+            return self._docs[_id]
+        except KeyError:
+            start = self._offsets[_id]
+        end = self._buffer.find(b'\n', start)
+        return json.decode(self._buffer[start:] if end == -1 else self._buffer[start:end])
+
+    def __setitem__(self, _id, doc):
+        self._offsets.pop(_id, None)
+        self._docs[_id] = doc
+
+    def __delitem__(self, _id):
+        try:
+            del self._docs[_id]
+        except KeyError:
+            del self._offsets[_id]
+
+    def __contains__(self, _id):
+        return _id in self._offsets or _id in self._docs
+
+    def __iter__(self):
+        yield from self._offsets
+        yield from self._docs
+
+    def __len__(self):
+        return len(self._offsets) + len(self._docs)
+
+    def clear(self):
+        self._offsets.clear()
+        self._docs.clear()
+
+    def close(self):
+        """Release the memory map."""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+
 class Collection(object):
     """A collection of documents.
 
@@ -421,6 +1341,8 @@ class Collection(object):
                 "First argument cannot be of str type. "
                 "Did you mean to use {}.open()?".format(type(self).__name__))
         self.index_rebuild_threshold = 0.1
+        self.index_verify_threshold = 0.05
+        self.log_compaction_threshold = 1.0
         self._primary_key = primary_key
         if compresslevel > 0:
             self._file = io.BytesIO()
@@ -430,8 +1352,14 @@ class Collection(object):
         self._requires_flush = False
         self._dirty = set()
         self._indexes = dict()
+        self._index_batch = ()      # keys of indexes to build along with others
         self._next_default_id_ = None
         self._docs = dict()
+        self._reset_positions()
+        self._log_changes = None    # ids changed since the last flush in log mode
+        self._log_num_records = 0
+        self._log_offset = 0
+        self._log_needs_newline = False
         if docs is not None:
             for doc in docs:
                 if self._primary_key not in doc:
@@ -468,49 +1396,65 @@ class Collection(object):
                 return _id
         raise RuntimeError("Unable to determine default id.")
 
-    def _remove_from_indexes(self, _id):
-        """Remove index corresponding to given id.
+    def _reset_positions(self):
+        """Reset the positions of the documents used within the indexes.
 
-        Parameters
-        ----------
-        _id : str
-            id to remove from the index.
+        Each primary key is assigned a dense integer position on insertion,
+        the indexes store positions instead of primary keys. The positions of
+        removed documents are reused once they are removed from all indexes.
 
         """
-        for index in self._indexes.values():
-            remove_keys = set()
-            for key, group in index.items():
-                if _id in group:    # faster than exception handling (performance)
-                    group.remove(_id)
-                if not len(group):
-                    remove_keys.add(key)
-            for key in remove_keys:
-                del index[key]
+        self._positions = dict()
+        self._ids_by_position = []
+        self._free_positions = []
+        self._removed_positions = []
+
+    def _all_positions(self):
+        """Return the bitmap of the positions of all documents."""
+        return ((1 << len(self._ids_by_position)) - 1) & \
+            ~_bitmap(self._free_positions + self._removed_positions)
+
+    def _clear_indexes(self):
+        """Clear all indexes."""
+        self._indexes.clear()
+        self._free_positions.extend(self._removed_positions)
+        self._removed_positions = []
 
     def _update_indexes(self):
         """Update the indexes."""
-        if self._dirty:
-            for _id in self._dirty:
-                self._remove_from_indexes(_id)
-            docs = [self[_id] for _id in self._dirty]
+        if self._dirty or self._removed_positions:
+            positions = [self._positions[_id] for _id in self._dirty]
+            positions.extend(self._removed_positions)
+            for index in self._indexes.values():
+                index._remove(positions)
+            self._free_positions.extend(self._removed_positions)
+            self._removed_positions = []
+            docs = [self._docs[_id] for _id in self._dirty]
             for key, index in self._indexes.items():
-                tmp = _build_index(docs, key, self._primary_key)
-                for v, group in tmp.items():
-                    index[v].update(group)
+                index._merge(_build_index(docs, key, self._primary_key, self._positions))
             self._dirty.clear()
 
     def _build_index(self, key):
         """Build index for given key.
 
+        The indexes of the keys in :attr:`_index_batch`, which are searched by
+        the current query, are built in the same pass over the documents.
+
         Parameters
         ----------
         key : str
             The key to build index for.
 
         """
-        logger.debug("Building index for key '{}'...".format(key))
-        self._indexes[key] = _build_index(self._docs.values(), key, self._primary_key)
-        logger.debug("Built index for key '{}'.".format(key))
+        keys = {key}
+        keys.update(k for k in self._index_batch if k not in self._indexes)
+        logger.debug("Building indexes for keys {}...".format(sorted(keys)))
+        for key, built in _build_indexes(
+                self._docs.values(), keys, self._primary_key, self._positions).items():
+            index = _PositionIndex()
+            index._merge(built)
+            self._indexes[key] = index
+        logger.debug("Built indexes.")
 
     def index(self, key, build=False):
         """Get (and optionally build) the index for a given key.
@@ -530,8 +1474,9 @@ class Collection(object):
         search.
 
         Once an index has been built, it will be internally managed by the
-        class and updated with subsequent changes. An index returned by this
-        method is always current with the latest state of the collection.
+        class and updated with subsequent changes. This method returns a
+        read-only view of the index, which reflects these changes and
+        creates the set of ids of a value when it is accessed.
 
         Parameters
         ----------
@@ -543,8 +1488,8 @@ class Collection(object):
 
         Returns
         -------
-        dict
-            Index for the given key.
+        :class:`collections.abc.Mapping`
+            Read-only view of the index for the given key.
 
         Raises
         ------
@@ -555,10 +1500,35 @@ class Collection(object):
         """
         if key == self._primary_key:
             raise KeyError("Can't access index for primary key via index() method.")
-        elif key in self._indexes:
+        self._index(key, build=build)
+        return _IndexView(self, key)
+
+    def _index(self, key, build=False):
+        """Get (and optionally build) the internal index for a given key.
+
+        Parameters
+        ----------
+        key : str
+            The key of the requested index.
+        build : bool
+            If True, build a non-existing index if necessary,
+            otherwise raise KeyError (Default value = False).
+
+        Returns
+        -------
+        :class:`~_PositionIndex`
+            Positions of the documents by value for the given key.
+
+        Raises
+        ------
+        KeyError
+            In case the build is False and the index has not been built yet.
+
+        """
+        if key in self._indexes:
             if len(self._dirty) > self.index_rebuild_threshold * len(self):
                 logger.debug("Indexes outdated, rebuilding...")
-                self._indexes.clear()
+                self._clear_indexes()
                 self._build_index(key)
                 self._dirty.clear()
             else:
@@ -673,12 +1643,22 @@ class Collection(object):
             self._docs[_id] = doc
         else:
             try:
-                doc_ = json.loads(json.dumps(doc))
+                doc_ = json.decode(json.encode(doc))
             except TypeError as error:
                 raise TypeError(
                     "Serialization of document '{}' failed with error: {}".format(doc, error))
             self._docs[_id] = self._validate_doc(doc_)
+        if _id not in self._positions:
+            if self._free_positions:
+                position = self._free_positions.pop()
+                self._ids_by_position[position] = _id
+            else:
+                position = len(self._ids_by_position)
+                self._ids_by_position.append(_id)
+            self._positions[_id] = position
         self._dirty.add(_id)
+        if self._log_changes is not None:
+            self._log_changes[_id] = None
         self._requires_flush = True
 
     def insert_one(self, doc):
@@ -721,18 +1701,29 @@ class Collection(object):
     def __delitem__(self, _id):
         self._assert_open()
         del self._docs[_id]
-        self._remove_from_indexes(_id)
+        position = self._positions.pop(_id)
+        self._ids_by_position[position] = None
+        # The position is removed from the indexes with the next update.
+        if self._indexes:
+            self._removed_positions.append(position)
+        else:
+            self._free_positions.append(position)
         try:
             self._dirty.remove(_id)
         except KeyError:
             pass
+        if self._log_changes is not None:
+            self._log_changes[_id] = None
         self._requires_flush = True
 
     def clear(self):
         """Remove all documents from the collection."""
+        if self._log_changes is not None:
+            self._log_changes.update(dict.fromkeys(self._docs))
         self._docs.clear()
         self._indexes.clear()
         self._dirty.clear()
+        self._reset_positions()
         self._requires_flush = True
 
     def update(self, docs):
@@ -754,93 +1745,108 @@ class Collection(object):
                 _id = doc[self._primary_key] = self._next_default_id()
             self[_id] = doc
 
-    def _find_expression(self, key, value):
-        """Find document for key value pair.
+    def _find_expression(self, expression, candidates=None):
+        """Find the documents matching a compiled non-logical expression.
 
         Parameters
         ----------
-        key : str
-            The key for expression-operator.
-        value :
-            The value for expression-operator.
+        expression : :class:`_CompiledExpression`
+            The compiled expression.
+        candidates : int or set
+            If provided, only the documents at these positions are searched
+            *via* a temporary index instead of the collection's index for key
+            (Default value = None).
 
         Returns
         -------
-        set
-            The document for key value pair.
-
-        Raises
-        ------
-        KeyError
-            When Bad operator expression/ Bad operator placement or
-            the expression-operator is unknown.
-        ValueError
-            The value is not bool when operator for '$exists' operator.
+        int or set
+            The positions of the documents matching the expression.
 
         """
-        logger.debug("Find documents for expression '{}: {}'.".format(key, value))
-        if '$' in key:
-            if key.count('$') > 1:
-                raise KeyError("Bad operator expression '{}'.".format(key))
-            nodes = key.split('.')
-            op = nodes[-1]
-            if not op.startswith('$'):
-                raise KeyError("Bad operator placement '{}'.".format(key))
-            key = '.'.join(nodes[:-1])
-            if op in _INDEX_OPERATORS:
-                index = self.index(key, build=True)
-                return _find_with_index_operator(index, op, value)
-            elif op == '$exists':
-                if not isinstance(value, bool):
-                    raise ValueError("The value of the '$exists' operator must be boolean.")
-                index = self.index(key, build=True)
-                match = {elem for elems in index.values() for elem in elems}
-                return match if value else set(self.ids).difference(match)
-            else:
-                raise KeyError("Unknown expression-operator '{}'.".format(op))
+        logger.debug("Find documents for expression '{}: {}'.".format(
+            expression.key,
+            expression.value if expression.op is None else {expression.op: expression.value}))
+        if candidates is None:
+            index = self._index(expression.key, build=True)
         else:
-            index = self.index(key, build=True)
-            # Check to see if 'value' is a floating point type but an
-            # integer value (e.g., 4.0), and search for both the int and float
-            # values. This allows the user to find statepoints that have
-            # integer-valued keys that are stored as floating point types.
-            # Note that this both cases: 1) user searches for an int and hopes
-            # to find values that are stored as integer-valued floats and 2) user
-            # searches for a integer-valued float and hopes to find ints.
-            # This way, both `signac find x 4.0` and `signac find x 4` would
-            # return jobs where `sp.x` is stored as either 4.0 or 4.
-            if isinstance(value, Number) and float(value).is_integer():
-                result_float = index.get(_float(value), set())
-                result_int = index.get(int(value), set())
-                return result_int.union(result_float)
-            else:
-                return index.get(value, set())
+            ids = self._ids_by_position
+            index = _build_index(
+                (self._docs[ids[p]] for p in _iter_positions(candidates)),
+                expression.key, self._primary_key, self._positions)
+        match = expression.find(index)
+        if expression.op == '$exists' and not expression.value:
+            return _subtract_positions(
+                self._all_positions() if candidates is None else candidates, match)
+        return match
+
+    def _estimate_cardinality(self, expression):
+        """Estimate the number of documents matching a non-logical expression.
+
+        The estimate is exact for equality expressions on keys that are already
+        indexed and otherwise pessimistic.
+
+        Parameters
+        ----------
+        expression : :class:`_CompiledExpression`
+            The compiled expression.
 
-    def _find_result(self, expr):
-        """Find ids for given expression.
+        Returns
+        -------
+        tuple
+            The estimated number of matches, whether the key is not indexed
+            yet, and whether the expression uses an operator (equality is
+            assumed to be more selective), for use as sort key.
+
+        """
+        index = self._indexes.get(expression.key)
+        if expression.op is None:
+            value = expression.value
+            if index is not None and isinstance(value, (str, Number, type(None))):
+                return _count_positions(index.get(value, ())), False, False
+            return len(self), index is None, False
+        return len(self), index is None, True
+
+    def _find_result(self, node, candidates=None):
+        """Find the positions of the documents matching the given expression.
+
+        Non-logical expressions are evaluated in the order of their estimated
+        cardinality. Once the number of remaining candidates falls below the
+        fraction :attr:`index_verify_threshold` of the collection, the
+        remaining expressions are verified against the candidate documents
+        instead of building the collection's indexes, or of searching indexes
+        with more keys than candidates.
+
+        Comparisons of values that cannot be compared with the argument of an
+        expression raise a TypeError only if the values belong to documents
+        that match all other expressions that can be evaluated.
 
         Parameters
         ----------
-        expr : str
-            The expression for which to get ids.
+        node : :class:`_CompiledNode`
+            The compiled expression for which to get positions.
+        candidates : int or set
+            If provided, only positions within this set are returned
+            (Default value = None).
 
         Returns
         -------
-        set
-            Set of all the ids if the given expression is empty.
+        int or set
+            Bitmap or set of the matching positions; all positions (or
+            candidates) if the given expression is empty.
 
         """
-        if not len(expr):
-            return set(self.ids)    # Empty expression yields all ids...
+        if not len(node):
+            # Empty expression yields all positions...
+            return self._all_positions() if candidates is None else candidates
 
-        result_ids = None
+        result_ids = candidates
 
         def reduce_results(match):
             """Reduce the results by intersection of matches.
 
             Parameters
             ----------
-            match : set
+            match : int or set
                 match for the given expression.
 
             """
@@ -848,50 +1854,92 @@ class Collection(object):
             if result_ids is None:  # First match
                 result_ids = match
             else:               # Update previous match
-                result_ids = result_ids.intersection(match)
+                result_ids = _intersect_positions(result_ids, match)
+
+        def verify(expression):
+            """Determine whether to search only the remaining candidates."""
+            if result_ids is None:
+                return False
+            num_candidates = _count_positions(result_ids)
+            if num_candidates >= self.index_verify_threshold * len(self):
+                return False
+            index = self._indexes.get(expression.key)
+            return index is None or (expression.op is not None and len(index) > num_candidates)
 
         # Check if filter contains primary key, in which case we can
         # immediately reduce the result.
-        _id = expr.pop(self._primary_key, None)
+        _id = node.values.get(self._primary_key)
         if _id is not None and _id in self:
-            reduce_results({_id})
-
-        # Extract all logical-operator expressions for now.
-        or_expressions = expr.pop('$or', None)
-        and_expressions = expr.pop('$and', None)
-        not_expression = expr.pop('$not', None)
-
-        # Reduce the result based on the remaining non-logical expression:
-        for key, value in _nested_dicts_to_dotted_keys(expr):
-            reduce_results(self._find_expression(key, value))
+            reduce_results({self._positions[_id]})
+
+        # Reduce the result based on the remaining non-logical expression,
+        # starting with the most selective expressions:
+        expressions = sorted(
+            (e for e in node.expressions if e.field != self._primary_key),
+            key=self._estimate_cardinality)
+        # Expressions that raise a TypeError, because values cannot be compared
+        # with their argument, are deferred and evaluated again against the
+        # remaining candidates. They only raise if no other expression reduces
+        # the candidates any further, such that whether a filter raises does
+        # not depend on the order of evaluation.
+        deferred = []
+        for expression in expressions:
+            try:
+                if verify(expression):
+                    match = self._find_expression(expression, candidates=result_ids)
+                else:
+                    match = self._find_expression(expression)
+            except TypeError:
+                deferred.append(
+                    lambda candidates, e=expression: self._find_expression(e, candidates))
+                continue
+            reduce_results(match)
             if not result_ids:          # No match, no need to continue...
                 return set()
 
         # Reduce the result based on the logical-operator expressions:
-        if not_expression is not None:
-            not_match = self._find_result(not_expression)
-            reduce_results(set(self.ids).difference(not_match))
-
-        if and_expressions is not None:
-            _check_logical_operator_argument('$and', and_expressions)
-            for expr_ in and_expressions:
-                reduce_results(self._find_result(expr_))
+        logical = []
+        if node.not_ is not None:
+            def find_not(candidates):
+                not_match = self._find_result(node.not_, candidates=candidates)
+                return _subtract_positions(
+                    self._all_positions() if candidates is None else candidates, not_match)
+            logical.append(find_not)
+        if node.and_ is not None:
+            logical.extend(lambda candidates, n=node_: self._find_result(n, candidates)
+                           for node_ in node.and_)
+        if node.or_ is not None:
+            logical.append(lambda candidates: _union_positions([
+                self._find_result(node_, candidates=candidates) for node_ in node.or_]))
+        for find in logical:
+            try:
+                reduce_results(find(result_ids))
+            except TypeError:
+                deferred.append(find)
 
-        if or_expressions is not None:
-            _check_logical_operator_argument('$or', or_expressions)
-            or_results = set()
-            for expr_ in or_expressions:
-                or_results.update(self._find_result(expr_))
-            reduce_results(or_results)
+        while deferred:
+            if result_ids is not None and not result_ids:
+                return set()
+            remaining = []
+            for find in deferred:
+                try:
+                    reduce_results(find(result_ids))
+                except TypeError as error:
+                    remaining.append(find)
+                    last_error = error
+            if len(remaining) == len(deferred):
+                raise last_error
+            deferred = remaining
 
         assert result_ids is not None
         return result_ids
 
-    def _find(self, filter=None, limit=0):
+    def _find(self, filter=None, limit=0, ids=None):
         """Return a result vector of ids for the given filter and limit.
 
-        This function normalizes the filter argument and then attempts to
-        build a result vector for the given key-value queries.
+        This function compiles the filter argument, unless it is already
+        compiled, and then attempts to build a result vector for the given
+        key-value queries.
         For each key that is queried, an internal index is built and then
         searched.
 
@@ -906,13 +1954,18 @@ class Collection(object):
                is directly returned since no search operation is necessary.
             3. The filter is processed key by key, once the result vector is
                empty it is immediately returned.
+            4. The result vector is built from the document positions stored
+               in the indexes and only translated into ids once complete.
 
         Parameters
         ----------
-        filter : dict
+        filter : dict or :class:`CompiledFilter`
             The filter argument that all documents must match (Default value = None).
         limit : int
             Limit the size of the result vector (Default value = 0).
+        ids : iterable
+            If provided, only the documents with these ids are searched
+            (Default value = None).
 
         Returns
         -------
@@ -926,14 +1979,30 @@ class Collection(object):
 
         """
         self._assert_open()
+        candidates = None
+        if ids is not None:
+            positions = self._positions
+            candidates = _bitmap([positions[_id] for _id in ids if _id in positions])
+            if not candidates:
+                return set()
         if filter:
-            filter = json.loads(json.dumps(filter))  # Normalize
-            if not _valid_filter(filter):
-                raise ValueError(filter)
-            result = self._find_result(filter)
-            return set(islice(result, limit if limit else None))
+            if not isinstance(filter, _CompiledNode):
+                filter = compile_filter(filter)._node
+            if isinstance(self._docs, _LazyDocs):
+                # Decoding the documents dominates the cost of building indexes,
+                # so all indexes that the query may need are built in one pass.
+                self._index_batch = filter._keys() - {self._primary_key}
+            try:
+                result = self._find_result(filter, candidates=candidates)
+            finally:
+                self._index_batch = ()
+        elif candidates is not None:
+            result = candidates
         else:
             return set(islice(self._docs.keys(), limit if limit else None))
+        ids = self._ids_by_position
+        return set(islice((ids[p] for p in _iter_positions(result)),
+                          limit if limit else None))
 
     def find(self, filter=None, limit=0):
         """Find all documents matching filter, but not more than limit.
@@ -1041,9 +2110,19 @@ class Collection(object):
 
             Matches all docs, where the value for foo starts with the word 'bar'.
 
+        Compiled filters
+
+            Filters that are used repeatedly may be compiled once with
+            :func:`compile_filter`, e.g.:
+
+                    .. code-block:: python
+
+                        f = compile_filter({"foo": {"$regex": "^bar"}})
+                        docs = collection.find(f)
+
         Parameters
         ----------
-        filter : dict
+        filter : dict or :class:`CompiledFilter`
             All documents must match the given filter (Default value = None).
         limit : int
             Do not return more than limit number of documents.
@@ -1277,10 +2356,10 @@ class Collection(object):
                 import gzip
                 with gzip.GzipFile(fileobj=file, mode='rb') as gzipfile:
                     text_io = io.TextIOWrapper(gzipfile, encoding='utf-8')
-                    collection = cls(docs=(json.loads(line) for line in text_io))
+                    collection = cls(docs=(json.decode(line) for line in text_io))
                     text_io.detach()
             else:
-                collection = cls(docs=(json.loads(line) for line in file))
+                collection = cls(docs=(json.decode(line) for line in file))
         except (IOError, io.UnsupportedOperation) as error:
             if str(error) in ('not readable', 'read'):
                 collection = cls()
@@ -1307,7 +2386,113 @@ class Collection(object):
         return collection
 
     @classmethod
-    def open(cls, filename, mode=None, compresslevel=None):
+    def _open_log(cls, file):
+        """Open a collection associated with a file on disk in log mode.
+
+        The records of the file are replayed in order, where each record is
+        either a document, which replaces any previous document with the same
+        primary key, or marks the deletion of a document. An incomplete last
+        record, e.g., from an interrupted write, is discarded and overwritten
+        by the next flush.
+
+        Parameters
+        ----------
+        file :
+            The binary file to read the records from.
+
+        Returns
+        -------
+        :class:`~Collection`
+            An instance of :class:`~Collection`.
+
+        """
+        collection = cls()
+        primary_key = collection._primary_key
+        docs = dict()
+        num_records = offset = 0
+        needs_newline = False
+        try:
+            for line in file:
+                try:
+                    record = json.decode(line)
+                except ValueError as error:
+                    if line.endswith(b'\n'):
+                        file.close()
+                        raise JSONParseError(
+                            "Error while trying to parse file '{}': {}.".format(
+                                file.name, error))
+                    logger.warning(
+                        "Discarding incomplete record at the end of '{}'.".format(file.name))
+                    break
+                needs_newline = not line.endswith(b'\n')
+                offset += len(line)
+                num_records += 1
+                if _LOG_DELETE_KEY in record:
+                    docs.pop(record[_LOG_DELETE_KEY], None)
+                else:
+                    docs[record.get(primary_key, (None, num_records))] = record
+        except io.UnsupportedOperation as error:
+            if str(error) not in ('not readable', 'read'):
+                raise error
+            offset = file.seek(0, io.SEEK_END)
+        collection.update(docs.values())
+        collection._dirty.clear()
+        collection._file = file
+        collection._requires_flush = False  # not needed after initial read
+        collection._log_changes = dict()
+        collection._log_num_records = num_records
+        collection._log_offset = offset
+        collection._log_needs_newline = needs_newline
+        return collection
+
+    @classmethod
+    def _open_lazy(cls, filename):
+        """Open a collection associated with a file on disk lazily.
+
+        The file is memory-mapped and documents are only decoded on access.
+        The offsets of the documents are read from the sidecar file
+        ``filename + '.idx'`` if it is current and otherwise determined with
+        a scan of the file and written to the sidecar file.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file to read the documents from.
+
+        Returns
+        -------
+        :class:`~Collection`
+            An instance of :class:`~Collection`.
+
+        """
+        collection = cls()
+        primary_key = collection._primary_key
+        file = io.open(filename, 'rb')
+        try:
+            stat = os.fstat(file.fileno())
+            fn_offsets = filename + '.idx'
+            offsets = _read_offsets(fn_offsets, primary_key, stat)
+            docs = _LazyDocs(file, dict() if offsets is None else offsets)
+            if offsets is None:
+                logger.debug("Scan collection file '{}'.".format(filename))
+                try:
+                    docs._offsets = _scan_lines(docs._buffer, primary_key)
+                except JSONParseError as error:
+                    docs.close()
+                    raise JSONParseError(
+                        "Error while trying to parse file '{}': {}".format(filename, error))
+                _write_offsets(fn_offsets, primary_key, stat, docs._offsets)
+        except BaseException:
+            file.close()
+            raise
+        collection._docs = docs
+        collection._ids_by_position = list(docs)
+        collection._positions = {_id: i for i, _id in enumerate(collection._ids_by_position)}
+        collection._file = file
+        return collection
+
+    @classmethod
+    def open(cls, filename, mode=None, compresslevel=None, log=False, lazy=False):
         """Open a collection associated with a file on disk.
 
         Using this factory method will return a collection that is
@@ -1342,6 +2527,23 @@ class Collection(object):
         the manner in which gzip works, opening a file in `mode=wt` will
         effectively erase the current file, so take care using `mode=wt`.
 
+        In *log mode*, changes are appended to the file as records on flush,
+        instead of rewriting the file, such that the cost of a flush is
+        proportional to the number of changed documents. The file is
+        compacted with :meth:`~Collection.compact`, which is also called on
+        flush once the number of superseded records exceeds the
+        ``log_compaction_threshold`` fraction (default: 1.0) of the number of
+        documents. A compacted file is a regular collection file; files that
+        have not been compacted must be opened in log mode. Log mode is not
+        available for compressed collections.
+
+        A *lazy* collection is opened read-only: the file is memory-mapped and
+        documents are only decoded when they are accessed, for example when
+        they are returned by :meth:`~Collection.find`, or when an index is
+        built for a search. The offsets of the documents in the file are
+        stored in the sidecar file ``filename + '.idx'``, such that the file
+        is only scanned again once it has been modified.
+
         Parameters
         ----------
         filename : str
@@ -1352,6 +2554,10 @@ class Collection(object):
             The level of compression to use. Any positive value
             implies compression and is used by the underlying gzip implementation.
             (Default value = None)
+        log : bool
+            Open the collection in log mode (Default value = False).
+        lazy : bool
+            Open the collection lazily in read-only mode (Default value = False).
 
         Returns
         -------
@@ -1361,8 +2567,10 @@ class Collection(object):
         Raises
         ------
         RuntimeError
-            File open-mode is not None for in-memory collection or
-            compressed collections are not opened in binary mode.
+            File open-mode is not None for in-memory collection,
+            compressed collections are not opened in binary mode,
+            in-memory or compressed collections are opened in log mode or
+            lazily, or a lazy collection is not opened in read-only mode.
 
         """
         if compresslevel is None:
@@ -1372,12 +2580,30 @@ class Collection(object):
         if filename == ':memory:':
             if mode is not None:
                 raise RuntimeError("File open-mode must be None for in-memory collection.")
+            if log:
+                raise RuntimeError("In-memory collections cannot be opened in log mode.")
+            if lazy:
+                raise RuntimeError("In-memory collections cannot be opened lazily.")
             return cls(compresslevel=compresslevel)    # That's the default open mode.
+        elif lazy:
+            if log or compresslevel > 0:
+                raise RuntimeError(
+                    "Compressed collections and collections in log mode cannot be opened lazily.")
+            if mode not in (None, 'r', 'rb'):
+                raise RuntimeError("Lazy collections must be opened in read-only mode.")
+            return cls._open_lazy(filename)
         else:
             # Set default mode
             if mode is None:
                 mode = 'ab+'
 
+            if log:
+                if compresslevel > 0:
+                    raise RuntimeError("Compressed collections cannot be opened in log mode.")
+                file = io.open(filename, mode.replace('t', '').replace('b', '') + 'b')
+                file.seek(0)
+                return cls._open_log(file)
+
             file = io.open(filename, mode)
             file.seek(0)
 
@@ -1405,7 +2631,9 @@ class Collection(object):
         """
         self._assert_open()
         if self._requires_flush:
-            if self._file is None:
+            if self._log_changes is not None:
+                self._flush_log()
+            elif self._file is None:
                 logger.debug("Flushed collection.")
             else:
                 logger.debug("Flush collection to file '{}'.".format(self._file))
@@ -1420,6 +2648,75 @@ class Collection(object):
         else:
             logger.debug("Flushed collection (no changes).")
 
+    def _flush_log(self):
+        """Append the changes to the file of a collection in log mode.
+
+        The appended records are synced to disk before the changes are
+        considered to be flushed.
+
+        """
+        num_records = self._log_num_records + len(self._log_changes)
+        if num_records - len(self) > self.log_compaction_threshold * len(self):
+            self.compact()
+            return
+        logger.debug("Append {} records to collection file '{}'.".format(
+            len(self._log_changes), self._file.name))
+        blob = b''.join(json.encode(self._docs.get(_id, {_LOG_DELETE_KEY: _id})) + b'\n'
+                        for _id in self._log_changes)
+        if self._log_needs_newline:
+            blob = b'\n' + blob
+        # Discard an incomplete record at the end of the file before appending.
+        if self._file.seek(0, io.SEEK_END) != self._log_offset:
+            self._file.truncate(self._log_offset)
+        self._file.write(blob)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._log_num_records = num_records
+        self._log_offset += len(blob)
+        self._log_needs_newline = False
+        self._log_changes.clear()
+
+    def compact(self):
+        """Rewrite the file of a collection in log mode.
+
+        The file is replaced by a file that only contains the current
+        documents, which is written next to it and synced to disk before it
+        replaces the previous file. The previous file therefore remains intact
+        if writing the new file fails and either file is found complete after
+        a crash. For collections that are not in log mode, this is equivalent
+        to :meth:`~Collection.flush`.
+
+        """
+        self._assert_open()
+        if self._log_changes is None:
+            self.flush()
+            return
+        if not self._file.writable():
+            raise io.UnsupportedOperation('not writable')
+        fn = self._file.name
+        fn_tmp = fn + '~'
+        logger.debug("Compact collection file '{}'.".format(fn))
+        try:
+            with io.open(fn_tmp, 'w', encoding='utf-8', newline='\n') as file:
+                self._dump(file)
+                file.flush()
+                os.fsync(file.fileno())
+        except (IOError, OSError):  # clean-up
+            try:
+                os.remove(fn_tmp)
+            except (IOError, OSError):
+                pass
+            raise
+        self._file.close()
+        os.replace(fn_tmp, fn)
+        _fsync_dir(os.path.dirname(os.path.abspath(fn)))
+        self._file = io.open(fn, 'ab+')
+        self._log_num_records = len(self)
+        self._log_offset = self._file.seek(0, io.SEEK_END)
+        self._log_needs_newline = False
+        self._log_changes.clear()
+        self._requires_flush = False
+
     def close(self):
         """Close this collection instance.
 
@@ -1436,6 +2733,8 @@ class Collection(object):
             finally:
                 self._file.close()
                 self._indexes.clear()
+                if isinstance(self._docs, _LazyDocs):
+                    self._docs.close()
                 self._docs = None
                 self._file = None
 
@@ -6,6 +6,11 @@
 import hashlib
 import json
 # We must use the standard library json for exact consistency in formatting
+from multiprocessing import Pool
+
+# The encoder used by json.dumps(spec, sort_keys=True), which is stateless and
+# therefore shared by all calls.
+_ENCODER = json.JSONEncoder(sort_keys=True)
 
 
 def calc_id(spec):
@@ -26,7 +31,30 @@ def calc_id(spec):
         Encoded hash in hexadecimal format.
 
     """
-    blob = json.dumps(spec, sort_keys=True)
-    m = hashlib.md5()
-    m.update(blob.encode())
-    return m.hexdigest()
+    return hashlib.md5(_ENCODER.encode(spec).encode()).hexdigest()
+
+
+def calc_ids(specs, parallel=False):
+    """Calculate and return the hash values for many specs.
+
+    The hash values are identical to those calculated by :func:`~.calc_id`.
+
+    Parameters
+    ----------
+    specs : iterable
+        JSON-encodable mappings.
+    parallel : bool or int
+        Calculate the hash values with a pool of processes if True or with
+        the given number of processes if an integer (Default value = False).
+
+    Returns
+    -------
+    list
+        Encoded hashes in hexadecimal format in the order of specs.
+
+    """
+    if parallel is True or (parallel is not False and parallel > 1):
+        specs = list(specs)
+        with Pool(None if parallel is True else parallel) as pool:
+            return pool.map(calc_id, specs)
+    return list(map(calc_id, specs))
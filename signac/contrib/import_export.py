@@ -747,6 +747,7 @@ def _copy_to_job_workspace(src, job, copytree):
     """
     dst = job.workspace()
     try:
+        _mkdir_p(os.path.dirname(dst))  # the parent may be a shard directory
         copytree(src, dst)
     except (IOError, OSError) as error:
         if error.errno in (errno.ENOTEMPTY, errno.EEXIST):
@@ -323,12 +323,18 @@ def _index_signac_project_workspace(root,
                                     statepoint_index='statepoint',
                                     signac_id_alias='_id',
                                     encoding='utf-8',
-                                    statepoint_dict=None):
+                                    statepoint_dict=None,
+                                    shard_length=0):
     "Yields standard index documents for a signac project workspace."
     logger.debug("Indexing workspace '{}'...".format(root))
     m = re.compile(r'[a-f0-9]{32}')
     try:
-        job_ids = [jid for jid in os.listdir(root) if m.match(jid)]
+        if shard_length:
+            job_ids = [jid for shard in os.listdir(root) if len(shard) == shard_length
+                       for jid in os.listdir(os.path.join(root, shard))
+                       if jid.startswith(shard) and m.match(jid)]
+        else:
+            job_ids = [jid for jid in os.listdir(root) if m.match(jid)]
     except OSError as error:
         if error.errno == errno.ENOENT:
             return
@@ -340,7 +346,8 @@ def _index_signac_project_workspace(root,
         doc = {'signac_id': job_id, KEY_PATH: root}
         if signac_id_alias:
             doc[signac_id_alias] = job_id
-        fn_sp = os.path.join(root, job_id, fn_statepoint)
+        job_wd = os.path.join(root, job_id[:shard_length], job_id)
+        fn_sp = os.path.join(job_wd, fn_statepoint)
         with open(fn_sp, 'rb') as file:
             sp = json.loads(file.read().decode(encoding))
             if statepoint_dict is not None:
@@ -350,7 +357,7 @@ def _index_signac_project_workspace(root,
             else:
                 doc.update(sp)
         if include_job_document:
-            fn_doc = os.path.join(root, job_id, fn_job_document)
+            fn_doc = os.path.join(job_wd, fn_job_document)
             try:
                 with open(fn_doc, 'rb') as file:
                     doc.update(json.loads(file.read().decode(encoding)))
@@ -384,15 +391,17 @@ class SignacProjectCrawler(RegexFileCrawler):
                 details="The indexing module is deprecated.")
     def __init__(self, root):
         from .project import get_project
-        root = get_project(root=root).workspace()
+        project = get_project(root=root)
+        self._project = project
         self._statepoints = dict()
-        return super(SignacProjectCrawler, self).__init__(root=root)
+        return super(SignacProjectCrawler, self).__init__(root=project.workspace())
 
     def _get_job_id(self, dirpath):
-        return os.path.relpath(dirpath, self.root).split('/')[0]
+        parts = os.path.relpath(dirpath, self.root).split('/')
+        return parts[1] if self._project._workspace_shard_length else parts[0]
 
     def _read_statepoint(self, job_id):
-        fn_sp = os.path.join(self.root, job_id, self.fn_statepoint)
+        fn_sp = os.path.join(self._project._get_job_workspace(job_id), self.fn_statepoint)
         with open(fn_sp, 'rb') as file:
             return json.loads(file.read().decode(self.encoding))
 
@@ -424,7 +433,8 @@ class SignacProjectCrawler(RegexFileCrawler):
                 statepoint_index=self.statepoint_index,
                 signac_id_alias=self.signac_id_alias,
                 encoding=self.encoding,
-                statepoint_dict=self._statepoints):
+                statepoint_dict=self._statepoints,
+                shard_length=self._project._workspace_shard_length):
             yield self.process(doc, None, None)
         for doc in super(SignacProjectCrawler, self).crawl(depth=depth):
             yield doc
@@ -90,7 +90,7 @@ class Job(object):
         self._id = calc_id(self._statepoint()) if _id is None else _id
 
         # Prepare job working directory
-        self._wd = os.path.join(project.workspace(), self._id)
+        self._wd = project._get_job_workspace(self._id)
 
         # Prepare job document
         self._fn_doc = os.path.join(self._wd, self.FN_DOCUMENT)
@@ -102,6 +102,10 @@ class Job(object):
         # Prepare current working directory for context management
         self._cwd = list()
 
+        # Whether the job is known to be initialized, such that implicit
+        # initialization can be skipped.
+        self._initialized = False
+
     @deprecated(deprecated_in="1.3", removed_in="2.0", current_version=__version__,
                 details="Use job.id instead.")
     def get_id(self):
@@ -181,6 +185,7 @@ class Job(object):
         try:
             os.replace(fn_manifest, fn_manifest_backup)
             try:
+                _mkdir_p(os.path.dirname(dst.workspace()))
                 os.replace(self.workspace(), dst.workspace())
             except OSError as error:
                 os.replace(fn_manifest_backup, fn_manifest)  # rollback
@@ -203,6 +208,7 @@ class Job(object):
         self._document = None
         self._data = None
         self._cwd = list()
+        self._initialized = dst._initialized
         logger.info("Moved '{}' -> '{}'.".format(self, dst))
 
     def _reset_sp(self, new_sp=None):
@@ -316,8 +322,11 @@ class Job(object):
 
         """
         if self._document is None:
-            self.init()
-            self._document = JSONDict(filename=self._fn_doc, write_concern=True)
+            self._init_implicitly()
+            self._document = JSONDict(
+                filename=self._fn_doc, write_concern=True,
+                consistency=self._project._document_consistency,
+                buffer=self._project._buffer)
         return self._document
 
     @document.setter
@@ -383,7 +392,8 @@ class Job(object):
             The HDF5-Store manager for this job.
 
         """
-        return self.init()._stores
+        self._init_implicitly()
+        return self._stores
 
     @property
     def data(self):
@@ -434,6 +444,27 @@ class Job(object):
             raise an Exception if the manifest exists
             (Default value = False).
 
+        """
+        created = self._write_manifest(force=force)
+        self._check_manifest()
+        if created:
+            # Record the new job in the project's state point cache.
+            self._project._register(self)
+
+    def _write_manifest(self, force=False):
+        """Create the job workspace directory and write the job manifest.
+
+        Parameters
+        ----------
+        force : bool
+            If ``True``, write the job manifest even if it
+            already exists (Default value = False).
+
+        Returns
+        -------
+        bool
+            True if the manifest was written, False if it already existed.
+
         """
         fn_manifest = os.path.join(self._wd, self.FN_MANIFEST)
 
@@ -445,6 +476,7 @@ class Job(object):
                          "workspace directory for job '{}'.".format(self))
             raise
 
+        created = False
         try:
             # Ensure to create the binary to write before file creation
             blob = json.dumps(self._statepoint, indent=2)
@@ -456,6 +488,8 @@ class Job(object):
             except (IOError, OSError) as error:
                 if error.errno not in (errno.EEXIST, errno.EACCES):
                     raise
+            else:
+                created = True
         except Exception as error:
             # Attempt to delete the file on error, to prevent corruption.
             try:
@@ -463,15 +497,14 @@ class Job(object):
             except Exception:  # ignore all errors here
                 pass
             raise error
-        else:
-            self._check_manifest()
+        return created
 
     def _check_manifest(self):
         """Check whether the manifest file is correct (if it exists)."""
         fn_manifest = os.path.join(self._wd, self.FN_MANIFEST)
         try:
             with open(fn_manifest, 'rb') as file:
-                assert calc_id(json.loads(file.read().decode())) == self._id
+                assert calc_id(json.decode(file.read())) == self._id
         except IOError as error:
             if error.errno != errno.ENOENT:
                 raise error
@@ -504,8 +537,21 @@ class Job(object):
             logger.error(
                 "State point manifest file of job '{}' appears to be corrupted.".format(self._id))
             raise
+        self._initialized = True
         return self
 
+    def _init_implicitly(self):
+        """Initialize the job unless it is known to be initialized.
+
+        Jobs obtained from the workspace, for example by iterating over a
+        project, are known to be initialized and are not initialized again
+        when their document or stores are accessed. Use
+        :meth:`~signac.Project.check` to verify the integrity of all jobs.
+
+        """
+        if not self._initialized:
+            self.init()
+
     def clear(self):
         """Remove all job data, but not the job itself.
 
@@ -544,6 +590,7 @@ class Job(object):
         does not exist.
 
         """
+        self._initialized = False
         try:
             shutil.rmtree(self.workspace())
         except OSError as error:
@@ -572,7 +619,7 @@ class Job(object):
 
         """
         dst = project.open_job(self.statepoint())
-        _mkdir_p(project.workspace())
+        _mkdir_p(os.path.dirname(dst.workspace()))
         try:
             os.replace(self.workspace(), dst.workspace())
         except OSError as error:
@@ -689,7 +736,7 @@ class Job(object):
 
         """
         self._cwd.append(os.getcwd())
-        self.init()
+        self._init_implicitly()
         logger.info("Enter workspace '{}'.".format(self._wd))
         os.chdir(self._wd)
 
@@ -15,6 +15,7 @@ from ...version import __version__, SCHEMA_VERSION
 
 
 from .v0_to_v1 import migrate_v0_to_v1
+from .workspace_layout import reshard_workspace
 
 
 FN_MIGRATION_LOCKFILE = '.SIGNAC_PROJECT_MIGRATION_LOCK'
@@ -102,4 +103,5 @@ def apply_migrations(project):
 
 __all__ = [
     'apply_migrations',
+    'reshard_workspace',
     ]
@@ -0,0 +1,83 @@
+# Copyright (c) 2020 The Regents of the University of Michigan
+# All rights reserved.
+# This software is licensed under the BSD 3-Clause License.
+"""Migrate between the flat and the sharded workspace layout.
+
+In the flat layout, every job workspace is a direct subdirectory of the
+project workspace. In the sharded layout, job workspaces are grouped into
+shard directories named after the first characters of the job id, e.g.,
+``workspace/ab/ab12...``, which keeps the number of entries per directory
+small for projects with very many jobs.
+"""
+import os
+import re
+
+from ..utility import _mkdir_p
+
+
+_JOB_ID = re.compile('[a-f0-9]{32}$')
+_SHARD = re.compile('[a-f0-9]{1,31}$')
+
+
+def _find_job_workspaces(wd):
+    """Generate the ids and workspace paths of all jobs in wd.
+
+    Jobs are found in the flat as well as in any sharded layout, such that
+    an interrupted migration can be resumed.
+    """
+    for d in os.listdir(wd):
+        path = os.path.join(wd, d)
+        if _JOB_ID.match(d):
+            yield d, path
+        elif _SHARD.match(d) and os.path.isdir(path):
+            for job_id in os.listdir(path):
+                if job_id.startswith(d) and _JOB_ID.match(job_id):
+                    yield job_id, os.path.join(path, job_id)
+
+
+def reshard_workspace(project, shard_length):
+    """Move all job workspaces of project into the given layout.
+
+    The new layout is recorded in the project configuration as
+    ``workspace_shard_length``. No other process should access the project
+    while the migration is in progress and previously opened job handles
+    must be reopened afterwards.
+
+    Parameters
+    ----------
+    project : :class:`~signac.Project`
+        The project to migrate.
+    shard_length : int
+        The number of job id characters used for the names of the shard
+        directories. A value of zero selects the flat layout.
+
+    Raises
+    ------
+    ValueError
+        If the shard length is not within the range [0, 32).
+
+    """
+    from . import _lock_for_migration, _update_project_config
+
+    shard_length = int(shard_length)
+    if not 0 <= shard_length < 32:
+        raise ValueError("The shard length must be within the range [0, 32).")
+    wd = project.workspace()
+    with _lock_for_migration(project):
+        shards = set()
+        for job_id, src in list(_find_job_workspaces(wd)):
+            if shard_length:
+                dst = os.path.join(wd, job_id[:shard_length], job_id)
+            else:
+                dst = os.path.join(wd, job_id)
+            if src != dst:
+                _mkdir_p(os.path.dirname(dst))
+                os.replace(src, dst)
+                if os.path.dirname(src) != wd:
+                    shards.add(os.path.dirname(src))
+        for shard in shards:
+            try:
+                os.rmdir(shard)
+            except OSError:
+                pass    # not empty
+        _update_project_config(project, workspace_shard_length=shard_length)
@@ -12,10 +12,11 @@ import errno
 import uuid
 import gzip
 import time
+from bisect import bisect_left, insort
 from collections.abc import Iterable
 from contextlib import contextmanager
 from deprecation import deprecated
-from itertools import groupby
+from itertools import chain, groupby
 from multiprocessing.pool import ThreadPool
 from tempfile import TemporaryDirectory
 from packaging import version
@@ -23,13 +24,19 @@ from packaging import version
 from ..version import __version__, SCHEMA_VERSION
 from .. import syncutil
 from ..core import json
-from ..core.jsondict import JSONDict
+from ..core.jsondict import JSONDict, JSONDictBuffer, in_buffered_mode
+from ..core.jsondict import DEFAULT_BUFFER_SIZE, DEFAULT_FLUSH_CONCURRENCY
 from ..core.h5store import H5StoreManager
+from ..core.attrdict import SyncedAttrDict
 from .collection import Collection
+from .collection import CompiledFilter
+from .collection import compile_filter
+from .collection import _CompiledNode
 from ..common.config import get_config, load_config, Config
 from ..sync import sync_projects
 from .job import Job
-from .hashing import calc_id
+from .hashing import calc_id, calc_ids
+from .cache import StatepointCacheFile, write_cache_file
 from .indexing import SignacProjectCrawler
 from .indexing import MainCrawler
 from .utility import _mkdir_p, split_and_print_progress, _nested_dicts_to_dotted_keys
@@ -43,6 +50,12 @@ logger = logging.getLogger(__name__)
 
 JOB_ID_REGEX = re.compile('[a-f0-9]{32}')
 
+SHARD_REGEX = re.compile('[a-f0-9]+$')
+
+# Directories modified within this number of seconds are rescanned, since
+# their modification time may not have been updated yet on all file systems.
+WORKSPACE_MTIME_RESOLUTION = 2
+
 ACCESS_MODULE_MINIMAL = """import signac
 
 def get_indexes(root):
@@ -107,17 +120,20 @@ class JobSearchIndex(object):
             else:
                 yield 'statepoint.{}'.format(k), v
 
-    def find_job_ids(self, filter=None, doc_filter=None):
+    def find_job_ids(self, filter=None, doc_filter=None, _job_ids=None):
         """Find job ids from a state point or document filter.
 
         Parameters
         ----------
-        filter : dict
+        filter : dict or :class:`~signac.contrib.collection.CompiledFilter`
             A mapping of key-value pairs that all indexed job state points are
             compared against (Default value = None).
-        doc_filter : dict
+        doc_filter : dict or :class:`~signac.contrib.collection.CompiledFilter`
             A mapping of key-value pairs that all indexed job documents are
             compared against (Default value = None).
+        _job_ids : iterable
+            If provided, only the jobs with these ids are searched
+            (Default value = None).
 
         Returns
         -------
@@ -125,13 +141,202 @@ class JobSearchIndex(object):
             List of job ids matching the provided filter(s).
 
         """
+        if isinstance(filter, CompiledFilter) or isinstance(doc_filter, CompiledFilter):
+            # The keys of compiled filters are prefixed without compiling
+            # the filters again.
+            nodes = []
+            if filter:
+                nodes.append(compile_filter(filter)._prefixed_node('statepoint'))
+            if doc_filter:
+                nodes.append(compile_filter(doc_filter)._node)
+            if len(nodes) > 1:
+                nodes = [_CompiledNode._conjunction(nodes)]
+            return self._collection._find(nodes[0] if nodes else None, ids=_job_ids)
         if filter:
             filter = dict(self._resolve_statepoint_filter(filter))
             if doc_filter:
-                filter.update(doc_filter)
+                filter = {'$and': [filter, doc_filter]}
         elif doc_filter:
             filter = doc_filter
-        return self._collection._find(filter)
+        return self._collection._find(filter, ids=_job_ids)
+
+    def _update(self, to_add, to_remove):
+        """Update the index incrementally.
+
+        The per-key indexes of the internal Collection are retained and
+        updated with the next search.
+
+        Parameters
+        ----------
+        to_add : iterable
+            Index documents to add to the index.
+        to_remove : iterable
+            Ids of documents to remove from the index.
+
+        """
+        for _id in to_remove:
+            del self._collection[_id]
+        for doc in to_add:
+            self._collection.__setitem__(doc['_id'], doc, _trust=True)
+
+
+def _is_statepoint_filter(f):
+    """Return True if the document filter f only refers to state point keys.
+
+    Parameters
+    ----------
+    f : dict
+        A filter for the documents of a job index.
+
+    Returns
+    -------
+    bool
+        Whether all keys of the filter, including the keys within logical
+        operators, are keys of the state point.
+
+    """
+    if not isinstance(f, dict):
+        return False
+    for key, value in f.items():
+        if key in ('$and', '$or'):
+            if not (isinstance(value, list) and all(_is_statepoint_filter(v) for v in value)):
+                return False
+        elif key == '$not':
+            if not _is_statepoint_filter(value):
+                return False
+        elif not (key == 'statepoint' or key.startswith('statepoint.')):
+            return False
+    return True
+
+
+def _split_statepoint_filter(doc_filter):
+    """Split the state point clauses off a document filter.
+
+    Top-level clauses of the document filter and clauses of its top-level
+    ``$and`` operator that only refer to state point keys are evaluated
+    against the state point search index, before any documents are read.
+
+    Parameters
+    ----------
+    doc_filter : dict
+        A filter for the documents of a job index.
+
+    Returns
+    -------
+    tuple
+        The filter with the state point clauses and the filter with the
+        remaining clauses, each None if empty.
+
+    """
+    if _is_statepoint_filter(doc_filter):
+        return doc_filter or None, None
+    sp_filter, remaining = dict(), dict()
+    for key, value in doc_filter.items():
+        if key == '$and' and isinstance(value, list) and value:
+            sp_and = [v for v in value if _is_statepoint_filter(v)]
+            remaining_and = [v for v in value if not _is_statepoint_filter(v)]
+            if sp_and:
+                sp_filter['$and'] = sp_and
+            if remaining_and:
+                remaining['$and'] = remaining_and
+        elif _is_statepoint_filter({key: value}):
+            sp_filter[key] = value
+        else:
+            remaining[key] = value
+    return sp_filter or None, remaining or None
+
+
+def _common_prefix_length(a, b):
+    """Return the length of the common prefix of the strings a and b."""
+    for i, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+            return i
+    return min(len(a), len(b))
+
+
+class _JobIdPrefixIndex(object):
+    """A sorted index of job ids for the lookup of abbreviated job ids.
+
+    Parameters
+    ----------
+    job_ids : dict
+        The job ids as keys, as returned by :meth:`Project._get_job_ids`.
+
+    """
+
+    # Rebuild the index instead of updating it if more ids changed than this
+    # fraction of the number of indexed ids.
+    rebuild_threshold = 0.1
+
+    def __init__(self, job_ids):
+        self._job_ids = job_ids
+        self._sorted_ids = sorted(job_ids)
+        self._min_len_unique_id = None
+
+    def update(self, job_ids):
+        """Update the index incrementally to the given job ids.
+
+        Parameters
+        ----------
+        job_ids : dict
+            The job ids as keys, as returned by :meth:`Project._get_job_ids`.
+
+        Returns
+        -------
+        :class:`_JobIdPrefixIndex`
+            The updated index, which may be a new instance.
+
+        """
+        if job_ids is self._job_ids:
+            return self
+        to_remove = [_id for _id in self._job_ids if _id not in job_ids]
+        to_add = [_id for _id in job_ids if _id not in self._job_ids]
+        if len(to_remove) + len(to_add) > self.rebuild_threshold * len(self._sorted_ids):
+            return type(self)(job_ids)
+        for _id in to_remove:
+            del self._sorted_ids[bisect_left(self._sorted_ids, _id)]
+        if to_remove:
+            self._min_len_unique_id = None
+        for _id in to_add:
+            insort(self._sorted_ids, _id)
+            if self._min_len_unique_id is not None:
+                i = bisect_left(self._sorted_ids, _id)
+                for neighbor in self._sorted_ids[max(0, i - 1):i] + self._sorted_ids[i + 1:i + 2]:
+                    self._min_len_unique_id = max(
+                        self._min_len_unique_id, _common_prefix_length(_id, neighbor) + 1)
+        self._job_ids = job_ids
+        return self
+
+    def find(self, prefix, limit=None):
+        """Return the sorted job ids that start with prefix.
+
+        Parameters
+        ----------
+        prefix : str
+            The abbreviated job id.
+        limit : int
+            Return at most this number of job ids (Default value = None).
+
+        Returns
+        -------
+        list
+            The matching job ids.
+
+        """
+        matches = []
+        for _id in self._sorted_ids[bisect_left(self._sorted_ids, prefix):]:
+            if not _id.startswith(prefix) or len(matches) == limit:
+                break
+            matches.append(_id)
+        return matches
+
+    def min_len_unique_id(self):
+        """Return the minimum length required for a job id to be unique."""
+        if self._min_len_unique_id is None:
+            ids = self._sorted_ids
+            self._min_len_unique_id = max(
+                (_common_prefix_length(a, b) + 1 for a, b in zip(ids, ids[1:])), default=0)
+        return self._min_len_unique_id
 
 
 class _ProjectConfig(Config):
@@ -180,9 +385,14 @@ class Project(object):
     FN_STATEPOINTS = 'signac_statepoints.json'
     "The default filename to read from and write state points to."
 
-    FN_CACHE = '.signac_sp_cache.json.gz'
+    FN_CACHE = '.signac_sp_cache.bin'
     "The default filename for the state point cache file."
 
+    _FN_CACHE_LEGACY = '.signac_sp_cache.json.gz'
+
+    FN_CACHE_JOURNAL = '.signac_sp_cache.journal'
+    "The default filename for the append-only state point cache journal."
+
     _use_pandas_for_html_repr = True  # toggle use of pandas for html repr
 
     def __init__(self, config=None, _ignore_schema_version=False):
@@ -204,6 +414,8 @@ class Project(object):
         # Prepare project document
         self._fn_doc = os.path.join(self._rd, self.FN_DOCUMENT)
         self._document = None
+        self._buffer = JSONDictBuffer(num_workers=int(self._config.get(
+            'buffer_flush_concurrency', DEFAULT_FLUSH_CONCURRENCY)))
 
         # Prepare project h5-stores
         self._stores = H5StoreManager(self._rd)
@@ -220,11 +432,25 @@ class Project(object):
 
         # Internal caches
         self._index_cache = dict()
+        self._index_cache_job_ids = None
+        self._search_index = None
+        self._doc_cache = dict()
+        self._doc_search_index = None
+        self._doc_search_index_keys = dict()
         self._sp_cache = dict()
         self._sp_cache_misses = 0
+        self._workspace_dir_cache = dict()
+        self._job_ids_cache = None
+        self._job_id_index = None
         self._sp_cache_warned = False
         self._sp_cache_miss_warning_threshold = self._config.get(
             'statepoint_cache_miss_warning_threshold', 500)
+        self._sp_cache_compaction_threshold = float(self._config.get(
+            'statepoint_cache_compaction_threshold', 0.5))
+        self._document_read_concurrency = int(self._config.get(
+            'document_read_concurrency', 16))
+        self._document_consistency = self._config.get('document_consistency', 'stat')
+        self._reset_persistent_cache_state()
 
     def __str__(self):
         """Return the project's id."""
@@ -255,6 +481,14 @@ class Project(object):
     def __eq__(self, other):
         return repr(self) == repr(other)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # The memory-mapped cache file is reopened on demand.
+        state['_sp_cache_snapshot'] = None
+        state['_sp_cache_snapshot_id'] = None
+        state['_sp_cache_file_exists'] = None
+        return state
+
     @property
     def config(self):
         """Get project's configuration.
@@ -295,6 +529,37 @@ class Project(object):
         else:
             return os.path.join(self._rd, wd)
 
+    @property
+    def _workspace_shard_length(self):
+        """Get the length of the job id prefix used to shard the workspace.
+
+        Returns
+        -------
+        int
+            Length of the shard directory names; zero for a flat workspace.
+
+        """
+        return int(self._config.get('workspace_shard_length', 0))
+
+    def _get_job_workspace(self, jobid):
+        """Get the workspace directory of the job with the given id.
+
+        Parameters
+        ----------
+        jobid : str
+            Identifier of the job.
+
+        Returns
+        -------
+        str
+            Path of the job's workspace directory.
+
+        """
+        shard_length = self._workspace_shard_length
+        if shard_length:
+            return os.path.join(self._wd, jobid[:shard_length], jobid)
+        return os.path.join(self._wd, jobid)
+
     def root_directory(self):
         """Return the project's root directory.
 
@@ -394,18 +659,7 @@ class Project(object):
             Minimum string length of a unique job identifier.
 
         """
-        job_ids = list(self._find_job_ids())
-        tmp = set()
-        for i in range(32):
-            tmp.clear()
-            for _id in job_ids:
-                if _id[:i] in tmp:
-                    break
-                else:
-                    tmp.add(_id[:i])
-            else:
-                break
-        return i
+        return self._get_job_id_index().min_len_unique_id()
 
     def fn(self, filename):
         """Prepend a filename with the project's root directory path.
@@ -461,7 +715,9 @@ class Project(object):
 
         """
         if self._document is None:
-            self._document = JSONDict(filename=self._fn_doc, write_concern=True)
+            self._document = JSONDict(
+                filename=self._fn_doc, write_concern=True,
+                consistency=self._document_consistency, buffer=self._buffer)
         return self._document
 
     @document.setter
@@ -622,14 +878,140 @@ class Project(object):
         else:
             # worst case (no state point and cache miss)
             if len(id) < 32:
-                job_ids = self._find_job_ids()
-                matches = [_id for _id in job_ids if _id.startswith(id)]
+                matches = self._find_job_ids_by_prefix(id)
                 if len(matches) == 1:
                     id = matches[0]
                 elif len(matches) > 1:
                     raise LookupError(id)
             return self.Job(project=self, statepoint=self._get_statepoint(id), _id=id)
 
+    def _open_initialized_job(self, id):
+        """Open the job with the given id, which is known to be initialized.
+
+        The id must have been obtained from the workspace, such that the job
+        is not initialized again when its document or stores are accessed.
+
+        Parameters
+        ----------
+        id : str
+            The full job id.
+
+        Returns
+        -------
+        :class:`~signac.contrib.job.Job`
+            The job instance.
+
+        """
+        job = self.open_job(id=id)
+        job._initialized = True
+        return job
+
+    def init_jobs(self, statepoints, parallel=True, hash_parallel=False):
+        """Initialize the jobs associated with many state points at once.
+
+        This is equivalent to calling ``project.open_job(statepoint).init()``
+        for each state point, but much faster for large numbers of state
+        points: the job ids are calculated up front with
+        :func:`~signac.contrib.hashing.calc_ids`, the workspace
+        directories and manifests are written by a pool of threads, and the
+        state point cache is updated once for all new jobs.
+
+        Unlike :meth:`~signac.contrib.job.Job.init`, the manifests of jobs
+        that already exist are not read back and verified; use
+        :meth:`~.check` to verify the integrity of the workspace.
+
+        Parameters
+        ----------
+        statepoints : iterable
+            The state points of the jobs to initialize.
+        parallel : bool or int
+            Write the workspace directories and manifests with a pool of
+            threads if True or with the given number of threads if an integer
+            (Default value = True).
+        hash_parallel : bool or int
+            Calculate the job ids with a pool of processes if True or with the
+            given number of processes if an integer. This only pays off for
+            very large numbers of state points or large state points
+            (Default value = False).
+
+        Returns
+        -------
+        list
+            The initialized jobs in the order of the given state points.
+
+        """
+        statepoints = [SyncedAttrDict._convert_to_plain_dict(sp) for sp in statepoints]
+        jobs = [self.Job(project=self, statepoint=statepoint, _id=_id) for statepoint, _id
+                in zip(statepoints, calc_ids(statepoints, parallel=hash_parallel))]
+        unique_jobs = list({job._id: job for job in jobs}.values())
+
+        def _write_manifest(job):
+            return job._write_manifest()
+
+        if parallel is True or (parallel is not False and parallel > 1):
+            with ThreadPool(None if parallel is True else parallel) as pool:
+                created = pool.map(_write_manifest, unique_jobs)
+        else:
+            created = list(map(_write_manifest, unique_jobs))
+
+        for job in unique_jobs:
+            if job._id not in self._sp_cache:
+                self._sp_cache[job._id] = job._statepoint._as_dict()
+        self._register_jobs([job for job, c in zip(unique_jobs, created) if c])
+        for job in jobs:
+            job._initialized = True
+        return jobs
+
+    def _get_job_id_index(self):
+        """Return the sorted index of all job ids in the workspace.
+
+        The index is updated incrementally whenever the workspace listing
+        changes.
+
+        Returns
+        -------
+        :class:`_JobIdPrefixIndex`
+            The index of job ids.
+
+        """
+        job_ids = self._get_job_ids()
+        if self._job_id_index is None:
+            self._job_id_index = _JobIdPrefixIndex(job_ids)
+        else:
+            self._job_id_index = self._job_id_index.update(job_ids)
+        return self._job_id_index
+
+    def _find_job_ids_by_prefix(self, prefix):
+        """Return at most two ids of jobs in the workspace that start with prefix.
+
+        With a sharded workspace, only the shard directory is listed if the
+        prefix is at least as long as the shard directory names.
+
+        Parameters
+        ----------
+        prefix : str
+            The abbreviated job id.
+
+        Returns
+        -------
+        list
+            The matching job ids.
+
+        """
+        shard_length = self._workspace_shard_length
+        if shard_length and len(prefix) >= shard_length:
+            shard = prefix[:shard_length]
+            try:
+                job_ids = self._scan_workspace_dir(
+                    os.path.join(self._wd, shard),
+                    lambda d: d.startswith(shard) and JOB_ID_REGEX.match(d))[1]
+            except OSError as error:
+                if error.errno != errno.ENOENT:
+                    raise
+                return []
+            return sorted(_id for _id in job_ids if _id.startswith(prefix))[:2]
+        return self._get_job_id_index().find(prefix, limit=2)
+
     def _job_dirs(self):
         """Generate ids of jobs in the workspace.
 
@@ -638,11 +1020,20 @@ class Project(object):
         str
             Job id.
 
+        """
+        yield from self._get_job_ids()
+
+    def _get_job_ids(self):
+        """Return the ids of all jobs in the workspace, handling access errors.
+
+        Returns
+        -------
+        dict
+            Job ids as keys in the order of the directory listing.
+
         """
         try:
-            for d in os.listdir(self._wd):
-                if JOB_ID_REGEX.match(d):
-                    yield d
+            return self._scan_job_ids()
         except OSError as error:
             if error.errno == errno.ENOENT:
                 if os.path.islink(self._wd):
@@ -657,6 +1048,86 @@ class Project(object):
             else:
                 logger.error("Unable to access the workspace directory '{}'.".format(self._wd))
                 raise WorkspaceError(error)
+        return dict()
+
+    def _scan_job_ids(self):
+        """Return the ids of all jobs in the workspace.
+
+        Returns
+        -------
+        dict
+            Job ids as keys in the order of the directory listing.
+
+        Raises
+        ------
+        OSError
+            If the workspace directory cannot be accessed.
+
+        """
+        shard_length = self._workspace_shard_length
+        if not shard_length:
+            return self._scan_workspace_dir(self._wd, JOB_ID_REGEX.match)[1]
+        key, shards = self._scan_workspace_dir(
+            self._wd, lambda d: len(d) == shard_length and SHARD_REGEX.match(d))
+        keys = [key]
+        job_ids = []
+        for shard in shards:
+            try:
+                key, shard_job_ids = self._scan_workspace_dir(
+                    os.path.join(self._wd, shard),
+                    lambda d, shard=shard: d.startswith(shard) and JOB_ID_REGEX.match(d))
+            except OSError as error:
+                if error.errno != errno.ENOENT:   # the shard was removed concurrently
+                    raise
+            else:
+                keys.append(key)
+                job_ids.append(shard_job_ids)
+        keys = tuple(keys)
+        if self._job_ids_cache is not None and self._job_ids_cache[0] == keys:
+            return self._job_ids_cache[1]
+        job_ids = dict.fromkeys(chain.from_iterable(job_ids))
+        if None not in keys:
+            self._job_ids_cache = keys, job_ids
+        return job_ids
+
+    def _scan_workspace_dir(self, path, match):
+        """Return the names of all subdirectories of path that match.
+
+        The names are cached and only rescanned when the inode number, the
+        modification time or the change time of the directory change. Since
+        some file systems only provide a coarse timestamp resolution, the
+        result is not cached if the directory has been modified very recently.
+
+        Parameters
+        ----------
+        path : str
+            Path of a workspace (shard) directory.
+        match : callable
+            Returns True for names of entries that should be included.
+
+        Returns
+        -------
+        tuple
+            The key used to validate the cached names and a dict with the
+            names as keys in the order of the directory listing.
+
+        """
+        st = os.stat(path)
+        key = (st.st_ino, st.st_mtime_ns, st.st_ctime_ns)
+        cached = self._workspace_dir_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached
+        with os.scandir(path) as it:
+            # is_dir() relies on the entry type reported by the directory listing
+            # and only falls back to stat() for symbolic links.
+            names = dict.fromkeys(entry.name for entry in it
+                                  if match(entry.name) and entry.is_dir())
+        if time.time() - st.st_mtime > WORKSPACE_MTIME_RESOLUTION:
+            self._workspace_dir_cache[path] = key, names
+        else:
+            self._workspace_dir_cache.pop(path, None)
+            key = None
+        return key, names
 
     def num_jobs(self):
         """Return the number of initialized jobs.
@@ -667,12 +1138,7 @@ class Project(object):
             Count of initialized jobs.
 
         """
-        # We simply count the the number of valid directories and avoid building a list
-        # for improved performance.
-        i = 0
-        for i, _ in enumerate(self._job_dirs(), 1):
-            pass
-        return i
+        return len(self._get_job_ids())
 
     __len__ = num_jobs
 
@@ -690,7 +1156,18 @@ class Project(object):
             True if the job is initialized for this project.
 
         """
-        return os.path.exists(os.path.join(self._wd, job.id))
+        shard_length = self._workspace_shard_length
+        path = os.path.join(self._wd, job.id[:shard_length]) if shard_length else self._wd
+        cached = self._workspace_dir_cache.get(path)
+        if cached is not None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                pass
+            else:
+                if cached[0] == (st.st_ino, st.st_mtime_ns, st.st_ctime_ns):
+                    return job.id in cached[1]
+        return os.path.exists(self._get_job_workspace(job.id))
 
     @deprecated(deprecated_in="1.3", removed_in="2.0", current_version=__version__)
     def build_job_search_index(self, index, _trust=False):
@@ -812,10 +1289,10 @@ class Project(object):
 
         Parameters
         ----------
-        filter : dict
+        filter : dict or :class:`~signac.contrib.collection.CompiledFilter`
             A mapping of key-value pairs that all
             indexed job state points are compared against (Default value = None).
-        doc_filter : dict
+        doc_filter : dict or :class:`~signac.contrib.collection.CompiledFilter`
             A mapping of key-value pairs that all
             indexed job documents are compared against (Default value = None).
         index :
@@ -850,10 +1327,10 @@ class Project(object):
 
         Parameters
         ----------
-        filter : Mapping
+        filter : Mapping or :class:`~signac.contrib.collection.CompiledFilter`
             A mapping of key-value pairs that all indexed job state points are
             compared against (Default value = None).
-        doc_filter :
+        doc_filter : Mapping or :class:`~signac.contrib.collection.CompiledFilter`
             A mapping of key-value pairs that all indexed job documents are
             compared against (Default value = None).
         index :
@@ -877,14 +1354,22 @@ class Project(object):
         if filter is None and doc_filter is None and index is None:
             return list(self._job_dirs())
         if index is None:
-            if doc_filter is None:
-                index = self._sp_index()
-            else:
-                index = self.index(include_job_document=True)
-            search_index = JobSearchIndex(index, _trust=True)
-        else:
-            search_index = JobSearchIndex(index)
-        return search_index.find_job_ids(filter=filter, doc_filter=doc_filter)
+            sp_doc_filter = None
+            if doc_filter is not None and not isinstance(doc_filter, CompiledFilter):
+                sp_doc_filter, doc_filter = _split_statepoint_filter(doc_filter)
+            if not doc_filter:
+                return self._sp_search_index().find_job_ids(
+                    filter=filter, doc_filter=sp_doc_filter)
+            job_ids = None
+            if filter or sp_doc_filter:
+                # Resolve the state point filter first and only search the
+                # documents of the remaining jobs.
+                job_ids = self._sp_search_index().find_job_ids(
+                    filter=filter, doc_filter=sp_doc_filter)
+                if not job_ids:
+                    return []
+            return self._find_job_ids_by_document(doc_filter, job_ids)
+        return JobSearchIndex(index).find_job_ids(filter=filter, doc_filter=doc_filter)
 
     def find_jobs(self, filter=None, doc_filter=None):
         """Find all jobs in the project's workspace.
@@ -892,14 +1377,23 @@ class Project(object):
         The optional filter arguments must be a Mapping of key-value pairs and
         JSON serializable. The `filter` argument is used to search against job
         state points, whereas the `doc_filter` argument compares against job
-        document keys.
+        document keys. Filters that are used repeatedly, for example to search
+        many projects, may be compiled once with
+        :func:`~signac.contrib.collection.compile_filter`:
+
+        .. code-block:: python
+
+            f = signac.compile_filter({'a': {'$gt': 0}})
+            for project in projects:
+                for job in project.find_jobs(f):
+                    pass
 
         Parameters
         ----------
-        filter : Mapping
+        filter : Mapping or :class:`~signac.contrib.collection.CompiledFilter`
             A mapping of key-value pairs that all indexed job state points are
             compared against (Default value = None).
-        doc_filter : Mapping
+        doc_filter : Mapping or :class:`~signac.contrib.collection.CompiledFilter`
             A mapping of key-value pairs that all indexed job documents are
             compared against (Default value = None).
 
@@ -1079,7 +1573,8 @@ class Project(object):
             state point.
 
         """
-        return {calc_id(sp): sp for sp in statepoints}
+        statepoints = list(statepoints)
+        return dict(zip(calc_ids(statepoints), statepoints))
 
     def write_statepoints(self, statepoints=None, fn=None, indent=2):
         """Dump state points to a file.
@@ -1115,7 +1610,8 @@ class Project(object):
             job_ids = self._job_dirs()
             _cache = {_id: self._get_statepoint(_id) for _id in job_ids}
         else:
-            _cache = {calc_id(sp): sp for sp in statepoints}
+            statepoints = list(statepoints)
+            _cache = dict(zip(calc_ids(statepoints), statepoints))
 
         tmp.update(_cache)
         logger.debug("Writing state points file with {} entries.".format(len(tmp)))
@@ -1131,7 +1627,35 @@ class Project(object):
             The job instance.
 
         """
-        self._sp_cache[job._id] = job._statepoint._as_dict()
+        self._register_jobs([job])
+
+    def _register_jobs(self, jobs):
+        """Register the jobs within the local index.
+
+        The jobs are recorded in the persistent state point cache (if it
+        exists) with a single journal record.
+
+        Parameters
+        ----------
+        jobs : list
+            The :class:`~signac.contrib.job.Job` instances.
+
+        """
+        if not jobs:
+            return
+        records = dict()
+        for job in jobs:
+            statepoint = job._statepoint._as_dict()
+            self._sp_cache[job._id] = statepoint
+            records[job._id] = statepoint
+        if self._sp_cache_file_exists is None:
+            self._sp_cache_file_exists = os.path.isfile(self.fn(self.FN_CACHE))
+        if self._sp_cache_file_exists:
+            try:
+                self._append_to_cache_journal(records)
+            except OSError as error:
+                logger.warning(
+                    "Unable to append to the state point cache journal: {}".format(error))
 
     def _get_statepoint_from_workspace(self, jobid):
         """Attempt to read the state point from the workspace.
@@ -1142,18 +1666,38 @@ class Project(object):
             Identifier of the job.
 
         """
-        fn_manifest = os.path.join(self._wd, jobid, self.Job.FN_MANIFEST)
+        wd = self._get_job_workspace(jobid)
+        fn_manifest = os.path.join(wd, self.Job.FN_MANIFEST)
         try:
             with open(fn_manifest, 'rb') as manifest:
-                return json.loads(manifest.read().decode())
+                return json.decode(manifest.read())
         except (IOError, ValueError) as error:
-            if os.path.isdir(os.path.join(self._wd, jobid)):
+            if os.path.isdir(wd):
                 logger.error(
                     "Error while trying to access state "
                     "point manifest file of job '{}': '{}'.".format(jobid, error))
                 raise JobsCorruptedError([jobid])
             raise KeyError(jobid)
 
+    def _get_statepoint_from_cache(self, jobid):
+        """Look up the state point in the persistent cache.
+
+        Parameters
+        ----------
+        jobid : str
+            Identifier of the job.
+
+        Returns
+        -------
+        dict
+            The state point or None if the job id is not cached.
+
+        """
+        if jobid in self._sp_cache_journal:
+            return self._sp_cache_journal[jobid]
+        elif self._sp_cache_snapshot is not None:
+            return self._sp_cache_snapshot.get(jobid)
+
     def _get_statepoint(self, jobid, fn=None):
         """Get the state point associated with a job id.
 
@@ -1182,12 +1726,13 @@ class Project(object):
             inaccessible or corrupted.
 
         """
-        if not self._sp_cache:
+        if self._sp_cache_file_exists is None:
             self._read_cache()
         try:
             if jobid in self._sp_cache:
                 return self._sp_cache[jobid]
-            else:
+            sp = self._get_statepoint_from_cache(jobid)
+            if sp is None:
                 self._sp_cache_misses += 1
                 if not self._sp_cache_warned and\
                         self._sp_cache_misses > self._sp_cache_miss_warning_threshold:
@@ -1662,9 +2207,10 @@ class Project(object):
                     logger.warning(
                         "The job id of job '{}' is incorrect; "
                         "it should be '{}'.".format(job_id, correct_id))
-                    invalid_wd = os.path.join(self.workspace(), job_id)
-                    correct_wd = os.path.join(self.workspace(), correct_id)
+                    invalid_wd = self._get_job_workspace(job_id)
+                    correct_wd = self._get_job_workspace(correct_id)
                     try:
+                        _mkdir_p(os.path.dirname(correct_wd))
                         os.replace(invalid_wd, correct_wd)
                     except OSError as error:
                         logger.critical(
@@ -1706,16 +2252,132 @@ class Project(object):
             Dictionary containing ids and state points in the cache.
 
         """
-        job_ids = set(self._job_dirs())
-        to_add = job_ids.difference(self._index_cache)
-        to_remove = set(self._index_cache).difference(job_ids)
+        job_ids = self._get_job_ids()
+        if job_ids is self._index_cache_job_ids:
+            return self._index_cache.values()   # the workspace listing is unchanged
+        to_add = [_id for _id in job_ids if _id not in self._index_cache]
+        to_remove = [_id for _id in self._index_cache if _id not in job_ids]
         for _id in to_remove:
             del self._index_cache[_id]
         for _id in to_add:
             self._index_cache[_id] = dict(statepoint=self._get_statepoint(_id), _id=_id)
+        self._index_cache_job_ids = job_ids
+        if self._search_index is not None:
+            if len(to_remove) > self._search_index._collection.index_rebuild_threshold \
+                    * len(self._search_index):
+                self._search_index = None   # cheaper to rebuild than to update
+            else:
+                self._search_index._update(
+                    (self._index_cache[_id] for _id in to_add), to_remove)
         return self._index_cache.values()
 
-    def _build_index(self, include_job_document=False):
+    def _sp_search_index(self):
+        """Update and return the state point search index.
+
+        The search index is kept for the lifetime of the project, such that
+        the per-key indexes built for one search are reused by the next.
+
+        Returns
+        -------
+        :class:`~signac.contrib.project.JobSearchIndex`
+            Search index of all state points in the workspace.
+
+        """
+        index = self._sp_index()
+        if self._search_index is None:
+            self._search_index = JobSearchIndex(index, _trust=True)
+        return self._search_index
+
+    def _find_job_ids_by_document(self, doc_filter, job_ids=None):
+        """Find the ids of the jobs whose documents match the filter.
+
+        The documents are searched with a search index that is kept for the
+        lifetime of the project. Only the documents of jobs whose document
+        file changed since they were indexed, as identified by the inode
+        number, the size and the modification time of the file, are read and
+        indexed again.
+
+        Parameters
+        ----------
+        doc_filter : Mapping or :class:`~signac.contrib.collection.CompiledFilter`
+            A mapping of key-value pairs that the job documents are compared
+            against.
+        job_ids : iterable
+            The ids of the jobs to search. By default, all jobs in the
+            workspace are searched (Default value = None).
+
+        Returns
+        -------
+        set
+            The ids of the matching jobs.
+
+        """
+        if self.Job is not Job or in_buffered_mode() or self._buffer.in_buffered_mode():
+            # The documents may be customized or hold buffered changes, which
+            # are not reflected by the document files.
+            index = self._build_index(include_job_document=True, job_ids=job_ids)
+            return JobSearchIndex(index, _trust=True).find_job_ids(doc_filter=doc_filter)
+        complete = job_ids is None
+        job_ids = list(self._find_job_ids() if complete else job_ids)
+        num_threads = min(self._document_read_concurrency, len(job_ids))
+        if num_threads < 2:
+            stats = list(map(self._stat_job_document, job_ids))
+        else:
+            with ThreadPool(num_threads) as pool:
+                stats = pool.map(self._stat_job_document, job_ids, chunksize=64)
+        indexed = self._doc_search_index_keys
+        to_read = dict()
+        for _id, key in zip(job_ids, stats):
+            if key is None or indexed.get(_id) != key:
+                to_read[_id] = key
+        to_remove = []
+        if complete:
+            to_remove = list(set(indexed).difference(job_ids))
+            for _id in to_remove:
+                del indexed[_id]
+        to_add = []
+        for _id, job_doc in self._read_job_documents(to_read):
+            doc = dict(_id=_id, statepoint=self._get_statepoint(_id))
+            doc.update(job_doc)
+            to_add.append(doc)
+            indexed[_id] = to_read[_id]
+        if self._doc_search_index is None:
+            self._doc_search_index = JobSearchIndex(to_add, _trust=True)
+        else:
+            self._doc_search_index._update(to_add, to_remove)
+        return self._doc_search_index.find_job_ids(
+            doc_filter=doc_filter, _job_ids=None if complete else job_ids)
+
+    def _stat_job_document(self, jobid):
+        """Return the key that identifies the current version of a job document.
+
+        Parameters
+        ----------
+        jobid : str
+            Identifier of the job.
+
+        Returns
+        -------
+        tuple or None
+            The inode number, the size and the modification time of the
+            document file, an empty tuple if the file does not exist, or None
+            if the file was modified too recently to be identified by its
+            modification time.
+
+        """
+        fn_doc = os.path.join(self._get_job_workspace(jobid), self.Job.FN_DOCUMENT)
+        try:
+            st = os.stat(fn_doc)
+        except OSError as error:
+            if error.errno != errno.ENOENT:
+                raise
+            return ()
+        # Recently modified files may change without a change of their timestamp.
+        if time.time() - st.st_mtime > WORKSPACE_MTIME_RESOLUTION:
+            return st.st_ino, st.st_size, st.st_mtime_ns
+        return None
+
+    def _build_index(self, include_job_document=False, job_ids=None):
         """Generate a basic state point index.
 
         Parameters
@@ -1723,40 +2385,124 @@ class Project(object):
         include_job_document :
             Whether to include the job document in the index (Default value =
             False).
+        job_ids : iterable
+            The ids of the jobs to index. By default, all jobs in the
+            workspace are indexed (Default value = None).
 
         """
-        wd = self.workspace() if self.Job is Job else None
-        for _id in self._find_job_ids():
+        complete = job_ids is None
+        if complete:
+            job_ids = self._find_job_ids()
+        if not include_job_document:
+            for _id in job_ids:
+                yield dict(_id=_id, statepoint=self._get_statepoint(_id))
+            return
+        for _id, job_doc in self._read_job_documents(job_ids):
             doc = dict(_id=_id, statepoint=self._get_statepoint(_id))
-            if include_job_document:
-                if wd is None:
-                    doc.update(self.open_job(id=_id).document)
-                else:   # use optimized path
-                    try:
-                        with open(os.path.join(wd, _id, self.Job.FN_DOCUMENT), 'rb') as file:
-                            doc.update(json.loads(file.read().decode()))
-                    except IOError as error:
-                        if error.errno != errno.ENOENT:
-                            raise
+            doc.update(job_doc)
             yield doc
+        if complete:
+            for _id in set(self._doc_cache).difference(job_ids):
+                del self._doc_cache[_id]
 
-    def _update_in_memory_cache(self):
-        """Update the in-memory state point cache to reflect the workspace."""
+    def _read_job_documents(self, job_ids):
+        """Generate the documents of the given jobs.
+
+        Documents are read from the workspace by a pool of threads, since the
+        reads are mostly latency-bound on network file systems. The number of
+        concurrent reads is configured with the ``document_read_concurrency``
+        configuration key (default: 16); a value of 1 disables concurrent
+        reads.
+
+        Parameters
+        ----------
+        job_ids : iterable
+            The ids of the jobs to read the documents of.
+
+        Yields
+        ------
+        tuple
+            The job id and the job document in the order of job_ids.
+
+        """
+        if self.Job is not Job or in_buffered_mode() or self._buffer.in_buffered_mode():
+            # Read documents through the job interface, which may be customized
+            # or hold buffered changes that have not been written yet.
+            for _id in job_ids:
+                yield _id, self._open_initialized_job(_id).document()
+            return
+        job_ids = list(job_ids)
+        num_threads = min(self._document_read_concurrency, len(job_ids))
+        if num_threads < 2:
+            for _id in job_ids:
+                yield _id, self._read_job_document(_id)
+            return
+        # Bound the number of documents held in memory at once.
+        chunksize = 16 * num_threads
+        with ThreadPool(num_threads) as pool:
+            for i in range(0, len(job_ids), chunksize):
+                chunk = job_ids[i:i + chunksize]
+                yield from zip(chunk, pool.map(self._read_job_document, chunk))
+
+    def _read_job_document(self, jobid):
+        """Read the document of a job from the workspace.
+
+        The encoded documents are cached and only read again when the inode
+        number, the size or the modification time of the document file change.
+        Each call decodes a new document, such that callers may modify it.
+
+        Parameters
+        ----------
+        jobid : str
+            Identifier of the job.
+
+        Returns
+        -------
+        dict
+            The job document, which is empty if the file does not exist.
+
+        """
+        fn_doc = os.path.join(self._get_job_workspace(jobid), self.Job.FN_DOCUMENT)
+        try:
+            st = os.stat(fn_doc)
+            key = (st.st_ino, st.st_size, st.st_mtime_ns)
+            cached = self._doc_cache.get(jobid)
+            if cached is not None and cached[0] == key:
+                return json.decode(cached[1])
+            with open(fn_doc, 'rb') as file:
+                blob = file.read()
+            doc = json.decode(blob)
+        except IOError as error:
+            if error.errno != errno.ENOENT:
+                raise
+            self._doc_cache.pop(jobid, None)
+            return dict()
+        # Recently modified files may change without a change of their timestamp.
+        if time.time() - st.st_mtime > WORKSPACE_MTIME_RESOLUTION:
+            self._doc_cache[jobid] = key, blob
+        else:
+            self._doc_cache.pop(jobid, None)
+        return doc
+
+    def _update_in_memory_cache(self, job_ids):
+        """Read the state points of the given jobs into the in-memory cache.
+
+        Parameters
+        ----------
+        job_ids : iterable
+            The ids of jobs, whose state points are read from the workspace
+            unless they are already cached.
+
+        """
         logger.debug("Updating in-memory cache...")
         start = time.time()
-        job_ids = set(self._job_dirs())
-        cached_ids = set(self._sp_cache)
-        to_add = job_ids.difference(cached_ids)
-        to_remove = cached_ids.difference(job_ids)
-        if to_add or to_remove:
-            for _id in to_remove:
-                del self._sp_cache[_id]
-
+        to_add = [_id for _id in job_ids if _id not in self._sp_cache]
+        if to_add:
             def _add(_id):
                 self._sp_cache[_id] = self._get_statepoint_from_workspace(_id)
 
             to_add_chunks = split_and_print_progress(
-                iterable=list(to_add),
+                iterable=to_add,
                 num_chunks=max(1, min(100, int(len(to_add) / 1000))),
                 write=logger.info,
                 desc="Read metadata: ")
@@ -1767,17 +2513,97 @@ class Project(object):
 
             delta = time.time() - start
             logger.debug("Updated in-memory cache in {:.3f} seconds.".format(delta))
-            return to_add, to_remove
         else:
             logger.debug("In-memory cache is up to date.")
 
+    def _reset_persistent_cache_state(self):
+        """Reset the bookkeeping of the persistent state point cache."""
+        if getattr(self, '_sp_cache_snapshot', None) is not None:
+            self._sp_cache_snapshot.close()
+        self._sp_cache_file_exists = None
+        self._sp_cache_snapshot = None
+        self._sp_cache_snapshot_id = None
+        self._sp_cache_journal = dict()
+        self._sp_cache_journal_offset = 0
+        self._sp_cache_journal_entries = 0
+
     def _remove_persistent_cache_file(self):
-        """Remove the persistent cache file (if it exists)."""
+        """Remove the persistent cache file and journal (if they exist)."""
+        self._reset_persistent_cache_state()
+        for fn in (self.FN_CACHE, self._FN_CACHE_LEGACY, self.FN_CACHE_JOURNAL):
+            try:
+                os.remove(self.fn(fn))
+            except (OSError, IOError) as error:
+                if error.errno != errno.ENOENT:
+                    raise error
+
+    def _get_persistent_cache_ids(self):
+        """Return the set of job ids in the persistent cache or None if there is none."""
+        if self._sp_cache_snapshot is None:
+            return None
+        ids = set(self._sp_cache_snapshot)
+        for _id, sp in self._sp_cache_journal.items():
+            if sp is None:
+                ids.discard(_id)
+            else:
+                ids.add(_id)
+        return ids
+
+    def _append_to_cache_journal(self, records):
+        """Append one record to the persistent state point cache journal.
+
+        Parameters
+        ----------
+        records : dict
+            A mapping of job ids to state points. A value of None marks
+            the removal of the corresponding job id from the cache.
+
+        """
+        blob = json.encode(records) + b'\n'
+        with open(self.fn(self.FN_CACHE_JOURNAL), 'ab') as journal:
+            journal.write(blob)
+
+    def _compact_cache(self, job_ids):
+        """Write a new cache file for the given jobs and discard the journal.
+
+        Parameters
+        ----------
+        job_ids : iterable
+            The ids of all jobs in the workspace. Their state points must
+            either be in the in-memory or the persistent cache.
+
+        """
+        blobs = dict()
+        for _id in job_ids:
+            if _id in self._sp_cache:
+                blobs[_id] = json.encode(self._sp_cache[_id])
+            elif _id in self._sp_cache_journal:
+                blobs[_id] = json.encode(self._sp_cache_journal[_id])
+            else:
+                # Copy the encoded state point without decoding it.
+                blobs[_id] = self._sp_cache_snapshot.get_raw(_id)
+        fn_cache = self.fn(self.FN_CACHE)
+        fn_cache_tmp = fn_cache + '~'
         try:
-            os.remove(self.fn(self.FN_CACHE))
-        except (OSError, IOError) as error:
-            if error.errno != errno.ENOENT:
-                raise error
+            with open(fn_cache_tmp, 'wb') as cachefile:
+                write_cache_file(cachefile, blobs)
+        except OSError:  # clean-up
+            try:
+                os.remove(fn_cache_tmp)
+            except (OSError, IOError):
+                pass
+            raise
+        else:
+            # Release the memory map of the previous cache file before replacing it.
+            self._reset_persistent_cache_state()
+            os.replace(fn_cache_tmp, fn_cache)
+        for fn in (self.FN_CACHE_JOURNAL, self._FN_CACHE_LEGACY):
+            try:
+                os.remove(self.fn(fn))
+            except OSError as error:
+                if error.errno != errno.ENOENT:
+                    raise
+        self._sp_cache_file_exists = True
 
     def update_cache(self):
         """Update the persistent state point cache.
@@ -1788,47 +2614,108 @@ class Project(object):
         to be significantly faster after calling this function, especially
         for large data spaces.
 
+        Changes are appended to a journal, such that the cost of an update
+        is proportional to the number of added or removed jobs. The journal
+        is compacted into the cache file once the number of journal entries
+        exceeds the ``statepoint_cache_compaction_threshold`` fraction
+        (default: 0.5) of the number of cached state points.
+
         """
         logger.info('Update cache...')
         start = time.time()
-        cache = self._read_cache()
-        self._update_in_memory_cache()
-        if cache is None or set(cache) != set(self._sp_cache):
-            fn_cache = self.fn(self.FN_CACHE)
-            fn_cache_tmp = fn_cache + '~'
-            try:
-                with gzip.open(fn_cache_tmp, 'wb') as cachefile:
-                    cachefile.write(json.dumps(self._sp_cache).encode())
-            except OSError:  # clean-up
-                try:
-                    os.remove(fn_cache_tmp)
-                except (OSError, IOError):
-                    pass
-                raise
-            else:
-                os.replace(fn_cache_tmp, fn_cache)
-            delta = time.time() - start
-            logger.info("Updated cache in {:.3f} seconds.".format(delta))
-            return len(self._sp_cache)
+        self._read_cache()
+        job_ids = set(self._job_dirs())
+        persisted = self._get_persistent_cache_ids()
+        if persisted is None:
+            to_add, to_remove = job_ids, set()
+        else:
+            to_add = job_ids.difference(persisted)
+            to_remove = persisted.difference(job_ids)
+        self._update_in_memory_cache(to_add)
+        num_entries = self._sp_cache_journal_entries + len(to_add) + len(to_remove)
+        if persisted is None or \
+                num_entries > self._sp_cache_compaction_threshold * max(len(persisted), 1000):
+            logger.debug("Compacting cache...")
+            self._compact_cache(job_ids)
+        elif to_add or to_remove:
+            record = dict.fromkeys(to_remove)
+            record.update({_id: self._sp_cache[_id] for _id in to_add})
+            self._append_to_cache_journal(record)
         else:
             logger.info("Cache is up to date.")
+            return
+        delta = time.time() - start
+        logger.info("Updated cache in {:.3f} seconds.".format(delta))
+        return len(job_ids)
 
     def _read_cache(self):
-        """Read the persistent state point cache (if available)."""
+        """Read the persistent state point cache (if available).
+
+        The persistent cache consists of a memory-mapped cache file and an
+        append-only journal. The cache file is only (re-)opened if it has not
+        been opened before or has been compacted since, and only journal
+        records that were appended after the last call are replayed.
+        State points stored in the cache file are decoded on demand.
+
+        """
         logger.debug("Reading cache...")
         start = time.time()
         try:
-            with gzip.open(self.fn(self.FN_CACHE), 'rb') as cachefile:
-                cache = json.loads(cachefile.read().decode())
-            self._sp_cache.update(cache)
+            with open(self.fn(self.FN_CACHE), 'rb') as file:
+                stat = os.fstat(file.fileno())
+                snapshot_id = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+                if snapshot_id != self._sp_cache_snapshot_id:
+                    self._reset_persistent_cache_state()
+                    self._sp_cache_snapshot = StatepointCacheFile(file)
+                    self._sp_cache_snapshot_id = snapshot_id
+        except ValueError as error:
+            logger.warning("Ignoring invalid state point cache file: {}".format(error))
+            self._reset_persistent_cache_state()
+            self._sp_cache_file_exists = False
         except IOError as error:
             if not error.errno == errno.ENOENT:
                 raise
-            logger.debug("No cache file found.")
+            self._reset_persistent_cache_state()
+            self._sp_cache_file_exists = False
+            self._read_legacy_cache()
         else:
+            self._sp_cache_file_exists = True
+            self._replay_cache_journal()
             delta = time.time() - start
             logger.debug("Read cache in {:.3f} seconds.".format(delta))
-            return cache
+
+    def _read_legacy_cache(self):
+        """Read a gzip-compressed JSON cache file written by previous versions (if available)."""
+        try:
+            with gzip.open(self.fn(self._FN_CACHE_LEGACY), 'rb') as cachefile:
+                self._sp_cache.update(json.decode(cachefile.read()))
+        except IOError as error:
+            if not error.errno == errno.ENOENT:
+                raise
+            logger.debug("No cache file found.")
+
+    def _replay_cache_journal(self):
+        """Apply all journal records that have not been replayed yet."""
+        try:
+            with open(self.fn(self.FN_CACHE_JOURNAL), 'rb') as journal:
+                if os.fstat(journal.fileno()).st_size < self._sp_cache_journal_offset:
+                    # The journal was reset, replaying records is idempotent.
+                    self._sp_cache_journal_offset = 0
+                journal.seek(self._sp_cache_journal_offset)
+                for line in journal:
+                    if not line.endswith(b'\n'):
+                        break   # incomplete record, possibly still being written
+                    self._sp_cache_journal_offset += len(line)
+                    try:
+                        record = json.decode(line)
+                    except ValueError:
+                        logger.warning("Skipping corrupted state point cache journal record.")
+                        continue
+                    self._sp_cache_journal.update(record)
+                    self._sp_cache_journal_entries += len(record)
+        except IOError as error:
+            if not error.errno == errno.ENOENT:
+                raise
 
     def index(self, formats=None, depth=0,
               skip_errors=False, include_job_document=True):
@@ -1948,6 +2835,40 @@ class Project(object):
         logger.info("Created access module file '{}'.".format(filename))
         return filename
 
+    def buffered(self, buffer_size=DEFAULT_BUFFER_SIZE, force_write=False):
+        """Context manager for buffering the documents of this project and its jobs.
+
+        Within this context, reads of the project and job documents are
+        performed from a buffer whenever possible and writes are deferred
+        until the context is exited or the buffer overflows. Unlike the global
+        :func:`signac.buffered` mode, the buffer is specific to this project
+        instance and may be used safely from multiple threads. Buffered
+        changes are written concurrently for up to ``buffer_flush_concurrency``
+        (configuration key, default: 8) job directories at a time.
+
+        .. code-block:: python
+
+            with project.buffered():
+                for job in project:
+                    job.doc.processed = True
+
+        Parameters
+        ----------
+        buffer_size : int
+            The maximum size of the buffer, a negative number indicates an
+            unrestricted buffer size (Default value = DEFAULT_BUFFER_SIZE).
+        force_write : bool
+            Write buffered changes even if the files were modified externally
+            (Default value = False).
+
+        Returns
+        -------
+        context manager
+            The context of the buffered mode.
+
+        """
+        return self._buffer.buffer_reads_writes(buffer_size=buffer_size, force_write=force_write)
+
     @contextmanager
     def temporary_project(self, name=None, dir=None):
         """Context manager for the initialization of a temporary project.
@@ -2206,7 +3127,7 @@ class _JobsCursorIterator(object):
         self._ids_iterator = iter(ids)
 
     def __next__(self):
-        return self._project.open_job(id=next(self._ids_iterator))
+        return self._project._open_initialized_job(next(self._ids_iterator))
 
     def __iter__(self):
         return type(self)(self._project, self._ids)
@@ -2221,10 +3142,10 @@ class JobsCursor(object):
     ----------
     project : :class:`~signac.Project`
         Project handle.
-    filter : dict
+    filter : dict or :class:`~signac.contrib.collection.CompiledFilter`
         A mapping of key-value pairs that all indexed job state points are
         compared against (Default value = None).
-    doc_filter : dict
+    doc_filter : dict or :class:`~signac.contrib.collection.CompiledFilter`
         A mapping of key-value pairs that all indexed job documents are
         compared against (Default value = None).
 
@@ -2317,6 +3238,8 @@ class JobsCursor(object):
 
         """
         _filter = self._filter
+        if isinstance(_filter, CompiledFilter):
+            _filter = _filter.filter
         if isinstance(key, str):
             if default is None:
                 if _filter is None:
@@ -2478,7 +3401,7 @@ class JobsCursor(object):
                     Document value corresponding to the key.
 
                     """
-                    return job.document[key]
+                    return docs[job._id][key]
             else:
                 def keyfunction(job):
                     """Return job's document value corresponding to the key.
@@ -2497,7 +3420,7 @@ class JobsCursor(object):
                     Default if key is not present.
 
                     """
-                    return job.document.get(key, default)
+                    return docs[job._id].get(key, default)
         elif isinstance(key, Iterable):
             if default is None:
                 def keyfunction(job):
@@ -2515,7 +3438,7 @@ class JobsCursor(object):
                         Document values.
 
                     """
-                    return tuple(job.document[k] for k in key)
+                    return tuple(docs[job._id][k] for k in key)
             else:
                 def keyfunction(job):
                     """Return job's document value corresponding to the key.
@@ -2534,7 +3457,7 @@ class JobsCursor(object):
                         Document values.
 
                     """
-                    return tuple(job.document.get(k, default) for k in key)
+                    return tuple(docs[job._id].get(k, default) for k in key)
         elif key is None:
             # Must return a type that can be ordered with <, >
             def keyfunction(job):
@@ -2568,7 +3491,10 @@ class JobsCursor(object):
 
                 """
                 return key(job.document)
-        return groupby(sorted(iter(self), key=keyfunction), key=keyfunction)
+        jobs = list(self)
+        if isinstance(key, (str, Iterable)):
+            docs = dict(self._project._read_job_documents(job._id for job in jobs))
+        return groupby(sorted(jobs, key=keyfunction), key=keyfunction)
 
     def export_to(self, target, path=None, copytree=None):
         """Export all jobs to a target location, such as a directory or a (zipped) archive file.
@@ -2649,13 +3575,15 @@ class JobsCursor(object):
         def _flatten(d):
             return dict(_nested_dicts_to_dotted_keys(d)) if flatten else d
 
-        def _export_sp_and_doc(job):
+        def _export_sp_and_doc(job, doc):
             """Prefix and filter state point and document keys.
 
             Parameters
             ----------
             job : :class:`~signac.contrib.job.Job`
                 The job instance.
+            doc : dict
+                The job document.
 
             Yields
             ------
@@ -2667,13 +3595,16 @@ class JobsCursor(object):
                 prefixed_key = sp_prefix + key
                 if usecols(prefixed_key):
                     yield prefixed_key, value
-            for key, value in _flatten(job.doc).items():
+            for key, value in _flatten(doc).items():
                 prefixed_key = doc_prefix + key
                 if usecols(prefixed_key):
                     yield prefixed_key, value
 
+        jobs = list(self)
+        docs = self._project._read_job_documents(job._id for job in jobs)
         return pandas.DataFrame.from_dict(
-            data={job._id: dict(_export_sp_and_doc(job)) for job in self},
+            data={job._id: dict(_export_sp_and_doc(job, doc))
+                  for job, (_, doc) in zip(jobs, docs)},
             orient='index').infer_objects()
 
     def __repr__(self):
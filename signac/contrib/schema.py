@@ -64,12 +64,13 @@ def _build_job_statepoint_index(exclude_const, index):
     from .collection import _DictPlaceholder
     from .utility import _nested_dicts_to_dotted_keys
     collection = Collection(index, _trust=True)
+    keys = set()
     for doc in collection.find():
         for key, _ in _nested_dicts_to_dotted_keys(doc):
             if key == '_id' or key.split('.')[0] != 'statepoint':
                 continue
-            collection.index(key, build=True)
-    tmp = collection._indexes
+            keys.add(key)
+    tmp = {key: collection.index(key, build=True) for key in keys}
 
     def strip_prefix(key): return k[len('statepoint.'):]
 
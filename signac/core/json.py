@@ -1,11 +1,19 @@
 # Copyright (c) 2018 The Regents of the University of Michigan
 # All rights reserved.
 # This software is licensed under the BSD 3-Clause License.
-"""Wrapper around json parsing library."""
+"""Wrapper around json parsing library.
+
+Besides the :func:`loads` and :func:`dumps` functions of the standard library
+:mod:`json` module, this module provides the :func:`encode` and :func:`decode`
+functions, which are used to store and read documents, manifests, and caches.
+They use the active codec, by default the fastest one installed, and produce
+the same data as the standard library :mod:`json` module.
+"""
 import logging
+from collections import OrderedDict
 from json import load, loads, JSONEncoder
 from json.decoder import JSONDecodeError
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +23,12 @@ try:
 except ImportError:
     NUMPY = False
 
+try:
+    import orjson
+    ORJSON = True
+except ImportError:
+    ORJSON = False
+
 
 class CustomJSONEncoder(JSONEncoder):
     """Attempt to JSON-encode objects beyond the default supported types.
@@ -42,4 +56,137 @@ def dumps(o: Any, sort_keys: bool = False, indent: Optional[int] = None) -> str:
     return CustomJSONEncoder(sort_keys=sort_keys, indent=indent).encode(o)
 
 
-__all__ = ['loads', 'load', 'dumps', 'JSONDecodeError']
+class Codec(object):
+    """A JSON codec used by :func:`encode` and :func:`decode`.
+
+    :param name:
+        The name of the codec.
+    :param encode:
+        A callable that encodes an object as JSON into bytes.
+    :param decode:
+        A callable that decodes JSON from bytes or str.
+    """
+
+    def __init__(self, name: str, encode: Callable[[Any], bytes],
+                 decode: Callable[[Union[bytes, str]], Any]) -> None:
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+
+    def __repr__(self) -> str:
+        return "{}(name='{}')".format(type(self).__name__, self.name)
+
+
+def _json_encode(o: Any) -> bytes:
+    return dumps(o).encode()
+
+
+def _json_decode(blob: Union[bytes, str]) -> Any:
+    return loads(blob.decode() if isinstance(blob, bytes) else blob)
+
+
+def _orjson_default(o: Any) -> Any:
+    try:
+        return o._as_dict()
+    except AttributeError:
+        raise TypeError("Object of type {} is not JSON serializable".format(type(o).__name__))
+
+
+def _orjson_compatible(o: Any) -> bool:
+    """Return True if orjson encodes o exactly like the standard library.
+
+    That is the case if o only contains dicts, lists, tuples, strings, ints,
+    bools, None, and finite floats. orjson encodes NaN and infinity as null
+    and encodes other types, such as UUIDs or enums, that the standard library
+    rejects.
+    """
+    stack = [o]
+    pop, extend = stack.pop, stack.extend
+    while stack:
+        o = pop()
+        t = type(o)
+        if t is dict:
+            extend(o.values())
+        elif t is list or t is tuple:
+            extend(o)
+        elif t is float:
+            if o - o != 0:  # NaN or infinity
+                return False
+        elif not (t is str or t is int or t is bool or o is None):
+            return False
+    return True
+
+
+# Do not let orjson encode types that the standard library rejects.
+_ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+                   | orjson.OPT_PASSTHROUGH_SUBCLASS if ORJSON else 0)
+
+
+def _orjson_encode(o: Any) -> bytes:
+    if not _orjson_compatible(o):
+        return _json_encode(o)
+    try:
+        return orjson.dumps(o, default=_orjson_default, option=_ORJSON_OPTIONS)
+    except TypeError:
+        # For example non-str keys or integers that exceed 64 bit.
+        return _json_encode(o)
+
+
+def _orjson_decode(blob: Union[bytes, str]) -> Any:
+    try:
+        return orjson.loads(blob)
+    except orjson.JSONDecodeError:
+        # For example NaN and infinity or integers that exceed 64 bit.
+        return _json_decode(blob)
+
+
+_CODECS = OrderedDict()     # type: Dict[str, Codec]
+
+
+def register_codec(codec: Codec) -> None:
+    """Register a codec, such that it can be activated with :func:`set_codec`."""
+    _CODECS[codec.name] = codec
+
+
+def get_codecs() -> List[str]:
+    """Return the names of all registered codecs."""
+    return list(_CODECS)
+
+
+def get_codec() -> Codec:
+    """Return the active codec."""
+    return _CODEC
+
+
+def set_codec(name: str) -> None:
+    """Activate the registered codec with the given name.
+
+    :raises KeyError:
+        If no codec with the given name is registered.
+    """
+    global _CODEC
+    try:
+        _CODEC = _CODECS[name]
+    except KeyError:
+        raise KeyError("Unknown JSON codec '{}', expected one of: {}.".format(
+            name, ', '.join(_CODECS)))
+
+
+def encode(o: Any) -> bytes:
+    """Encode a JSON-compatible object into bytes with the active codec."""
+    return _CODEC.encode(o)
+
+
+def decode(blob: Union[bytes, str]) -> Any:
+    """Decode a JSON-encoded object from bytes or str with the active codec."""
+    return _CODEC.decode(blob)
+
+
+register_codec(Codec('json', _json_encode, _json_decode))
+if ORJSON:
+    register_codec(Codec('orjson', _orjson_encode, _orjson_decode))
+_CODEC = _CODECS[get_codecs()[-1]]
+
+
+__all__ = ['loads', 'load', 'dumps', 'JSONDecodeError', 'encode', 'decode',
+           'Codec', 'register_codec', 'get_codecs', 'get_codec', 'set_codec']
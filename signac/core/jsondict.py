@@ -8,10 +8,14 @@ import errno
 import uuid
 import hashlib
 import logging
+import threading
+import time
 from tempfile import mkstemp
 from contextlib import contextmanager
 from copy import copy
+from collections import OrderedDict
 from collections.abc import Mapping
+from multiprocessing.pool import ThreadPool
 
 from .errors import Error
 from . import json
@@ -22,12 +26,13 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_BUFFER_SIZE = 32 * 2**20    # 32 MB
 
-_BUFFERED_MODE = 0
-_BUFFERED_MODE_FORCE_WRITE = None
-_BUFFER_SIZE = None
-_JSONDICT_BUFFER = dict()
-_JSONDICT_HASHES = dict()
-_JSONDICT_META = dict()
+DEFAULT_FLUSH_CONCURRENCY = 8
+
+CONSISTENCY_LEVELS = ('strict', 'stat', 'session')
+
+# Files modified within this number of seconds are always re-read, since
+# their modification time may not have been updated yet on all file systems.
+MTIME_RESOLUTION = 2
 
 
 class BufferException(Error):
@@ -53,6 +58,21 @@ class BufferedFileError(BufferException):
         return "{}({})".format(type(self).__name__, self.files)
 
 
+class TransactionConflictError(Error, RuntimeError):
+    """Raised when a file was modified by another process during a transaction.
+
+    .. attribute:: filename
+
+        The filename of the file that was modified.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def __str__(self):
+        return "The file '{}' was modified during the transaction.".format(self.filename)
+
+
 def _hash(blob):
     """Calculate and return the md5 hash value for the file data."""
     if blob is not None:
@@ -69,43 +89,145 @@ def _get_filemetadata(filename):
             raise
 
 
-def _store_in_buffer(filename, blob, store_hash=False):
-    assert _BUFFERED_MODE > 0
-    blob_size = sys.getsizeof(blob)
-    buffer_load = get_buffer_load()
-    if _BUFFER_SIZE > 0:
-        if blob_size > _BUFFER_SIZE:
-            return False
-        elif blob_size + buffer_load > _BUFFER_SIZE:
-            logger.debug("Buffer overflow, flushing...")
-            flush_all()
-
-    _JSONDICT_BUFFER[filename] = blob
-    if store_hash:
-        if not _BUFFERED_MODE_FORCE_WRITE:
-            _JSONDICT_META[filename] = _get_filemetadata(filename)
-        _JSONDICT_HASHES[filename] = _hash(blob)
-    return True
-
-
-def flush_all():
-    """Execute all deferred JSONDict write operations."""
-    logger.debug("Flushing buffer...")
-    issues = dict()
-    while _JSONDICT_BUFFER:
-        filename, blob = _JSONDICT_BUFFER.popitem()
-        if not _BUFFERED_MODE_FORCE_WRITE:
-            meta = _JSONDICT_META.pop(filename)
-        if _hash(blob) != _JSONDICT_HASHES.pop(filename):
+class JSONDictBuffer(object):
+    """A read/write buffer for JSONDict instances.
+
+    While the buffer is in buffered mode, all read operations of the
+    JSONDict instances that use it are performed from the buffer whenever
+    possible and all write operations are deferred until the buffer is
+    flushed. All operations are thread-safe.
+
+    When the buffer is full, the least recently used entries are evicted
+    until the new entry fits: modified entries are written back to disk,
+    unmodified entries are dropped.
+
+    Instances are independent of each other and of the global buffer used
+    by :func:`~.buffer_reads_writes`, for example, each
+    :class:`~signac.Project` has its own buffer.
+
+    :param num_workers:
+        The maximum number of directories written concurrently when the
+        buffer is flushed.
+    :param fsync:
+        Whether to fsync written files and their parent directories when the
+        buffer is flushed.
+    :param callback:
+        A callable invoked as ``callback(num_done, num_total)`` during a
+        flush to report progress, or None.
+    """
+
+    def __init__(self, num_workers=DEFAULT_FLUSH_CONCURRENCY, fsync=False, callback=None):
+        self.num_workers = num_workers
+        self.fsync = fsync
+        self.callback = callback
+        self._lock = threading.RLock()
+        self._mode = 0
+        self._force_write = None
+        self._size = None
+        self._num_bytes = 0
+        self._blobs = OrderedDict()
+        self._hashes = dict()
+        self._meta = dict()
+
+    def __reduce__(self):
+        # Buffered data is not shared with copies.
+        return type(self), (self.num_workers, self.fsync, self.callback)
+
+    def in_buffered_mode(self):
+        """Return true if in buffered read/write mode."""
+        return self._mode > 0
+
+    def get_size(self):
+        """Return the current maximum size of the read/write buffer."""
+        return self._size
+
+    def get_load(self):
+        """Return the current actual size of the read/write buffer."""
+        return self._num_bytes
+
+    def _get(self, filename, default=None):
+        with self._lock:
+            if filename in self._blobs:
+                self._blobs.move_to_end(filename)
+                return self._blobs[filename]
+            return default
+
+    def _load(self, filename, load_from_disk):
+        """Return the buffered blob for filename, load it if necessary."""
+        with self._lock:
+            if filename in self._blobs:
+                self._blobs.move_to_end(filename)
+                return self._blobs[filename]
+            blob = load_from_disk()
+            self._store(filename, blob, store_hash=True)
+            return blob
+
+    def _store(self, filename, blob, store_hash=False):
+        with self._lock:
+            assert self._mode > 0
+            blob_size = sys.getsizeof(blob)
+            if self._size > 0 and blob_size > self._size:
+                return False
+
+            if filename in self._blobs:
+                self._num_bytes -= sys.getsizeof(self._blobs.pop(filename))
+            elif not store_hash and filename not in self._hashes:
+                # The entry was evicted after it was loaded, track the file
+                # on disk as if it had been loaded with unknown content.
+                if not self._force_write:
+                    self._meta[filename] = _get_filemetadata(filename)
+                self._hashes[filename] = None
+            self._blobs[filename] = blob
+            self._num_bytes += blob_size
+            if store_hash:
+                if not self._force_write:
+                    self._meta[filename] = _get_filemetadata(filename)
+                self._hashes[filename] = _hash(blob)
+
+            if self._size > 0 and self._num_bytes > self._size:
+                logger.debug("Buffer overflow, evicting least recently used entries...")
+                self._evict()
+            return True
+
+    def _pop(self, filename):
+        """Remove the entry for filename from the buffer.
+
+        Returns a tuple of filename, blob, and file metadata if the entry was
+        modified, otherwise None.
+        """
+        blob = self._blobs.pop(filename)
+        self._num_bytes -= sys.getsizeof(blob)
+        meta = False if self._force_write else self._meta.pop(filename)
+        if _hash(blob) != self._hashes.pop(filename):
+            return filename, blob, meta
+
+    def _evict(self):
+        """Evict the least recently used entries until the buffer is no longer full."""
+        items = []
+        while self._num_bytes > self._size:
+            item = self._pop(next(iter(self._blobs)))
+            if item is not None:
+                items.append(item)
+        self._write(items)
+
+    def _flush_group(self, dirname, items, fsync):
+        """Write the buffered blobs of the files in one directory.
+
+        Returns the number of processed files and a dict of issues.
+        """
+        issues = dict()
+        for filename, blob, meta in items:
             try:
-                if not _BUFFERED_MODE_FORCE_WRITE:
-                    if _get_filemetadata(filename) != meta:
-                        issues[filename] = 'File appears to have been externally modified.'
-                        continue
+                if meta is not False and _get_filemetadata(filename) != meta:
+                    issues[filename] = 'File appears to have been externally modified.'
+                    continue
+                fd_tmp, fn_tmp = mkstemp(dir=dirname, suffix='.json')
                 try:
-                    fd_tmp, fn_tmp = mkstemp(dir=os.path.dirname(filename), suffix='.json')
                     with os.fdopen(fd_tmp, 'wb') as file:
                         file.write(blob)
+                        if fsync:
+                            file.flush()
+                            os.fsync(file.fileno())
                 except OSError:
                     os.remove(fn_tmp)
                     raise
@@ -114,26 +236,158 @@ def flush_all():
             except OSError as error:
                 logger.error(str(error))
                 issues[filename] = error
-    if issues:
-        raise BufferedFileError(issues)
+        if fsync and len(issues) < len(items):
+            # Persist the renames of all files in this directory at once.
+            try:
+                fd = os.open(dirname, os.O_RDONLY)
+            except OSError:
+                pass    # directories cannot be opened on all platforms
+            else:
+                try:
+                    os.fsync(fd)
+                except OSError as error:
+                    logger.warning("Unable to fsync directory '{}': {}".format(dirname, error))
+                finally:
+                    os.close(fd)
+        return len(items), issues
+
+    def flush(self, num_workers=None, fsync=None, callback=None):
+        """Execute all deferred JSONDict write operations.
+
+        Files are written in groups by directory, the groups are written
+        concurrently by a bounded number of worker threads.
+
+        :param num_workers:
+            The maximum number of directories written concurrently. Defaults
+            to the value the buffer was constructed with.
+        :param fsync:
+            Whether to fsync all written files and, once per directory, their
+            parent directory. Defaults to the value the buffer was constructed
+            with.
+        :param callback:
+            A callable invoked as ``callback(num_done, num_total)`` whenever
+            the files of one directory have been processed. Defaults to the
+            value the buffer was constructed with.
+        :raises BufferedFileError:
+            If one or more files could not be written.
+        """
+        logger.debug("Flushing buffer...")
+        with self._lock:
+            items = []
+            while self._blobs:
+                item = self._pop(next(iter(self._blobs)))
+                if item is not None:
+                    items.append(item)
+            self._write(items, num_workers, fsync, callback)
+
+    def _write(self, items, num_workers=None, fsync=None, callback=None):
+        """Write the (filename, blob, meta) items to disk, grouped by directory."""
+        num_workers = self.num_workers if num_workers is None else num_workers
+        fsync = self.fsync if fsync is None else fsync
+        callback = self.callback if callback is None else callback
+        with self._lock:
+            groups = dict()
+            for filename, blob, meta in items:
+                groups.setdefault(os.path.dirname(filename), []).append(
+                    (filename, blob, meta))
+            num_total = sum(len(items) for items in groups.values())
+            num_done = 0
+            issues = dict()
+
+            def flush_group(group):
+                return self._flush_group(*group, fsync=fsync)
+
+            num_workers = min(num_workers, len(groups))
+            if num_workers > 1:
+                pool = ThreadPool(num_workers)
+                results = pool.imap_unordered(flush_group, groups.items())
+            else:
+                pool = None
+                results = map(flush_group, groups.items())
+            try:
+                for num, group_issues in results:
+                    num_done += num
+                    issues.update(group_issues)
+                    if callback is not None:
+                        callback(num_done, num_total)
+            finally:
+                if pool is not None:
+                    pool.terminate()
+            if issues:
+                raise BufferedFileError(issues)
+
+    @contextmanager
+    def buffer_reads_writes(self, buffer_size=DEFAULT_BUFFER_SIZE, force_write=False):
+        """Enter the buffered mode of this buffer.
+
+        See :func:`~.buffer_reads_writes` for a description of the arguments.
+        """
+        # Basic type check (to prevent common user error)
+        if not isinstance(buffer_size, int) or \
+                buffer_size is True or buffer_size is False:    # explicit check against boolean
+            raise TypeError("The buffer size must be an integer!")
+
+        with self._lock:
+            assert self._mode >= 0
+
+            # Can't enter force write mode, if already in non-force write mode:
+            if self._force_write is not None and (force_write and not self._force_write):
+                raise BufferException(
+                    "Unable to enter buffered mode with force write enabled, because "
+                    "we are already in buffered mode with force write disabled.")
+
+            # Check whether we can adjust the buffer size and warn otherwise:
+            if self._size is not None and self._size != buffer_size:
+                raise BufferException("Buffer size already set, unable to change its size!")
+
+            self._size = buffer_size
+            self._force_write = force_write
+            self._mode += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._mode -= 1
+                if self._mode == 0:
+                    try:
+                        self.flush()
+                    finally:
+                        assert not self._blobs
+                        assert not self._hashes
+                        assert not self._meta
+                        self._size = None
+                        self._force_write = None
+
+
+# The global buffer used by all JSONDict instances.
+_BUFFER = JSONDictBuffer()
+
+_NOT_BUFFERED = object()
+
+
+def flush_all(num_workers=None, fsync=None, callback=None):
+    """Execute all deferred JSONDict write operations.
+
+    See :meth:`JSONDictBuffer.flush` for a description of the arguments.
+    """
+    _BUFFER.flush(num_workers=num_workers, fsync=fsync, callback=callback)
 
 
 def get_buffer_size():
     """Return the current maximum size of the read/write buffer."""
-    return _BUFFER_SIZE
+    return _BUFFER.get_size()
 
 
 def get_buffer_load():
     """Return the current actual size of the read/write buffer."""
-    return sum((sys.getsizeof(x) for x in _JSONDICT_BUFFER.values()))
+    return _BUFFER.get_load()
 
 
 def in_buffered_mode():
     """Return true if in buffered read/write mode."""
-    return _BUFFERED_MODE > 0
+    return _BUFFER.in_buffered_mode()
 
 
-@contextmanager
 def buffer_reads_writes(buffer_size=DEFAULT_BUFFER_SIZE, force_write=False):
     """Enter a global buffer mode for all JSONDict instances.
 
@@ -142,11 +396,16 @@ def buffer_reads_writes(buffer_size=DEFAULT_BUFFER_SIZE, force_write=False):
 
     All write operations are deferred until the flush_all() function
     is called, the buffer overflows, or upon exiting the buffer mode.
+    When the buffer overflows, only the least recently used entries are
+    written back or dropped.
 
     This context may be entered multiple times, however the buffer size
     can only be set *once*. Any subsequent specifications of the buffer
     size are ignored.
 
+    JSONDict instances that are bound to their own :class:`~.JSONDictBuffer`
+    use that buffer instead, while it is in buffered mode.
+
     :param buffer_size:
         Specify the maximum size of the read/write buffer. Defaults
         to DEFAULT_BUFFER_SIZE. A negative number indicates to not
@@ -154,43 +413,7 @@ def buffer_reads_writes(buffer_size=DEFAULT_BUFFER_SIZE, force_write=False):
     :type buffer_size:
         int
     """
-    global _BUFFERED_MODE
-    global _BUFFERED_MODE_FORCE_WRITE
-    global _BUFFER_SIZE
-    assert _BUFFERED_MODE >= 0
-
-    # Basic type check (to prevent common user error)
-    if not isinstance(buffer_size, int) or \
-            buffer_size is True or buffer_size is False:    # explicit check against boolean
-        raise TypeError("The buffer size must be an integer!")
-
-    # Can't enter force write mode, if already in non-force write mode:
-    if _BUFFERED_MODE_FORCE_WRITE is not None and (force_write and not _BUFFERED_MODE_FORCE_WRITE):
-        raise BufferException(
-            "Unable to enter buffered mode with force write enabled, because "
-            "we are already in buffered mode with force write disabled.")
-
-    # Check whether we can adjust the buffer size and warn otherwise:
-    if _BUFFER_SIZE is not None and _BUFFER_SIZE != buffer_size:
-        raise BufferException("Buffer size already set, unable to change its size!")
-
-    _BUFFER_SIZE = buffer_size
-    _BUFFERED_MODE_FORCE_WRITE = force_write
-
-    _BUFFERED_MODE += 1
-    try:
-        yield
-    finally:
-        _BUFFERED_MODE -= 1
-        if _BUFFERED_MODE == 0:
-            try:
-                flush_all()
-            finally:
-                assert not _JSONDICT_BUFFER
-                assert not _JSONDICT_HASHES
-                assert not _JSONDICT_META
-                _BUFFER_SIZE = None
-                _BUFFERED_MODE_FORCE_WRITE = None
+    return _BUFFER.buffer_reads_writes(buffer_size=buffer_size, force_write=force_write)
 
 
 class JSONDict(SyncedAttrDict):
@@ -236,17 +459,44 @@ class JSONDict(SyncedAttrDict):
         first, before replacing the original file. Default is False.
     :param parent:
         A parent instance of JSONDict or None.
+    :param consistency:
+        Controls when the file is re-read. With ``'strict'``, the file is read
+        and parsed on every access. With ``'stat'`` (the default), the file is
+        only read again if its inode, size, or modification time has changed
+        since it was last read. With ``'session'``, the file is read only once
+        and subsequent modifications by other processes are ignored; changes
+        made through this instance are still written to disk.
+    :param buffer:
+        A :class:`~.JSONDictBuffer` used instead of the global buffer while
+        it is in buffered mode, or None.
     """
 
-    def __init__(self, filename=None, write_concern=False, parent=None):
+    _PROTECTED_KEYS = SyncedAttrDict._PROTECTED_KEYS + ('_file_key', '_in_transaction')
+
+    def __init__(self, filename=None, write_concern=False, parent=None, consistency='stat',
+                 buffer=None):
         if (filename is None) == (parent is None):
             raise ValueError(
                 "Illegal argument combination, one of the two arguments, "
                 "parent or filename must be None, but not both.")
+        if consistency not in CONSISTENCY_LEVELS:
+            raise ValueError("Unknown consistency level '{}', expected one of: {}.".format(
+                consistency, ', '.join(CONSISTENCY_LEVELS)))
         self._filename = None if filename is None else os.path.realpath(filename)
         self._write_concern = write_concern
+        self._consistency = consistency
+        self._file_key = None
+        self._in_transaction = False
+        self._buffer = buffer
         super(JSONDict, self).__init__(parent=parent)
 
+    def _get_buffer(self):
+        """Return the buffer in buffered mode used by this instance or None."""
+        if self._buffer is not None and self._buffer.in_buffered_mode():
+            return self._buffer
+        elif _BUFFER.in_buffered_mode():
+            return _BUFFER
+
     def _load_from_disk(self):
         try:
             with open(self._filename, 'rb') as file:
@@ -255,34 +505,56 @@ class JSONDict(SyncedAttrDict):
             if error.errno == errno.ENOENT:
                 return None
 
+    def _get_file_key(self):
+        """Return a key that changes whenever the file is modified.
+
+        Returns None if the file was modified too recently for its
+        modification time to be trusted.
+        """
+        if self._consistency == 'session':
+            return True
+        try:
+            st = os.stat(self._filename)
+        except OSError as error:
+            if error.errno == errno.ENOENT:
+                return False
+            raise
+        if time.time() - st.st_mtime > MTIME_RESOLUTION:
+            return st.st_ino, st.st_size, st.st_mtime_ns
+
     def _load(self):
         assert self._filename is not None
 
-        if _BUFFERED_MODE > 0:
-            if self._filename in _JSONDICT_BUFFER:
-                # Load from buffer:
-                blob = _JSONDICT_BUFFER[self._filename]
-            else:
-                # Load from disk and store in buffer
-                blob = self._load_from_disk()
-                _store_in_buffer(self._filename, blob, store_hash=True)
-        else:
+        buffer = self._get_buffer()
+        if buffer is not None:
+            # Load from buffer or from disk and store in buffer
+            self._file_key = None
+            blob = buffer._load(self._filename, self._load_from_disk)
+        elif self._consistency == 'strict':
             # Just load from disk
             blob = self._load_from_disk()
+        else:
+            key = self._get_file_key()
+            if key is not None and key == self._file_key:
+                return None     # The file has not changed since the last load.
+            blob = self._load_from_disk()
+            self._file_key = key
 
-        return dict() if blob is None else json.loads(blob.decode())
+        return dict() if blob is None else json.decode(blob)
 
     def _save(self, data=None):
         assert self._filename is not None
+        self._file_key = None
 
         if data is None:
             data = self._as_dict()
 
         # Serialize data:
-        blob = json.dumps(data).encode()
+        blob = json.encode(data)
 
-        if _BUFFERED_MODE > 0:
-            _store_in_buffer(self._filename, blob)
+        buffer = self._get_buffer()
+        if buffer is not None:
+            buffer._store(self._filename, blob)
         else:   # Saving to disk:
             if self._write_concern:
                 dirname, filename = os.path.split(self._filename)
@@ -312,6 +584,68 @@ class JSONDict(SyncedAttrDict):
         else:
             raise ValueError("The document must be a mapping.")
 
+    def _get_version(self):
+        """Return a value that changes whenever the file is modified."""
+        buffer = self._get_buffer()
+        if buffer is not None:
+            blob = buffer._get(self._filename, default=_NOT_BUFFERED)
+            if blob is not _NOT_BUFFERED:
+                return blob
+        try:
+            st = os.stat(self._filename)
+        except OSError as error:
+            if error.errno == errno.ENOENT:
+                return None
+            raise
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    @contextmanager
+    def transaction(self, check_conflicts=False):
+        """Context manager for applying several modifications at once.
+
+        The file is loaded once when the transaction is entered, all
+        modifications within the context are applied in memory only, and the
+        data is written once when the context is exited. If an exception is
+        raised within the context, all modifications are discarded.
+
+        .. code-block:: python
+
+            with job.doc.transaction():
+                for i in range(1000):
+                    job.doc.results.append(i)
+
+        Transactions on nested instances apply to the whole file and nested
+        transactions are merged into the outermost one.
+
+        :param check_conflicts:
+            If True, raise a :class:`~.TransactionConflictError` and discard
+            all modifications if the file was modified by another process
+            during the transaction.
+        """
+        if self._parent is not None:
+            with self._parent.transaction(check_conflicts=check_conflicts):
+                yield self
+            return
+        if self._in_transaction:
+            yield self
+            return
+        self.load()
+        version = self._get_version() if check_conflicts else None
+        self._in_transaction = True
+        try:
+            with self._suspend_sync():
+                yield self
+            if check_conflicts and self._get_version() != version:
+                raise TransactionConflictError(self._filename)
+            self._save()
+        except BaseException:
+            # Discard all modifications:
+            self._file_key = None
+            self.load()
+            raise
+        finally:
+            self._in_transaction = False
+
     @contextmanager
     def buffered(self):
         """Context manager for buffering read and write operations.
@@ -139,11 +139,32 @@ class _SyncedDict(MutableMapping):
             return [cls._convert_to_dict(item) for item in root]
         return root
 
+    @classmethod
+    def _convert_to_plain_dict(cls, root):
+        """Convert a mapping to the plain dict that an instance would store for it.
+
+        Keys are validated and values are converted like by :meth:`_dfs_convert`,
+        without creating any synced containers.
+        """
+        if isinstance(root, Mapping):
+            return {cls._validate_key(k): cls._convert_to_plain_dict(v)
+                    for k, v in root.items()}
+        elif type(root) is tuple or type(root) is list:
+            return list(root)
+        elif NUMPY:
+            if isinstance(root, numpy.number):
+                return root.item()
+            elif isinstance(root, numpy.ndarray):
+                return root.tolist()
+        return root
+
     @contextmanager
     def _suspend_sync(self):
         self._suspend_sync_ += 1
-        yield
-        self._suspend_sync_ -= 1
+        try:
+            yield
+        finally:
+            self._suspend_sync_ -= 1
 
     def _load(self):
         return None
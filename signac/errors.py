@@ -11,6 +11,7 @@ from .core.errors import Error
 
 from .core.jsondict import BufferException
 from .core.jsondict import BufferedFileError
+from .core.jsondict import TransactionConflictError
 
 from .common.errors import ConfigError
 from .common.errors import AuthenticationError
@@ -69,6 +70,7 @@ __all__ = [
     'Error',
     'BufferException',
     'BufferedFileError',
+    'TransactionConflictError',
     'ConfigError',
     'AuthenticationError',
     'ExportError',
@@ -2,6 +2,7 @@
 # All rights reserved.
 # This software is licensed under the BSD 3-Clause License.
 import os
+import sys
 import pytest
 import json
 import logging
@@ -247,3 +248,83 @@ class TestBufferedMode(TestProjectBase):
             assert job.doc._filename in cm.value.files
 
             break    # only test for one job
+
+    def test_project_buffered_mode(self):
+        job = self.project.open_job(dict(a=0)).init()
+        with self.project.temporary_project() as other:
+            other_job = other.open_job(dict(a=0)).init()
+            with self.project.buffered():
+                assert not signac.is_buffered()
+                job.doc.a = 1
+                other_job.doc.a = 1
+                assert not os.path.exists(job.doc._filename)
+                with open(other_job.doc._filename) as file:
+                    assert json.load(file) == dict(a=1)
+                with other.buffered(buffer_size=12):
+                    assert other._buffer.get_size() == 12
+            with open(job.doc._filename) as file:
+                assert json.load(file) == dict(a=1)
+
+    def test_project_buffered_mode_threads(self):
+        from multiprocessing.pool import ThreadPool
+
+        jobs = [self.project.open_job(dict(a=i)).init() for i in range(20)]
+
+        def update(job):
+            for i in range(10):
+                job.doc[str(i)] = job.sp.a
+
+        with self.project.buffered():
+            with ThreadPool(4) as pool:
+                pool.map(update, jobs)
+            assert not any(os.path.exists(job.doc._filename) for job in jobs)
+        for job in jobs:
+            assert job.doc() == {str(i): job.sp.a for i in range(10)}
+
+    def test_flush_concurrently(self):
+        jobs = [self.project.open_job(dict(a=i)).init() for i in range(10)]
+        for job in jobs:
+            job.doc.a = -1
+        sleep(1.0)
+        progress = []
+        buffer = self.project._buffer
+        buffer.fsync = True
+        buffer.callback = lambda num_done, num_total: progress.append((num_done, num_total))
+        with pytest.raises(BufferedFileError) as cm:
+            with self.project.buffered():
+                for job in jobs:
+                    job.doc.a = job.sp.a
+                with open(jobs[0].doc._filename, 'wb') as file:
+                    file.write(json.dumps({'a': -2}).encode())
+        assert list(cm.value.files) == [jobs[0].doc._filename]
+        assert progress == [(i, 10) for i in range(1, 11)]
+        assert jobs[0].doc.a == -2
+        for job in jobs[1:]:
+            assert job.doc.a == job.sp.a
+
+    def test_buffered_mode_evict_least_recently_used(self):
+        jobs = [self.project.open_job(dict(a=i)).init() for i in range(4)]
+        for job in jobs:
+            job.doc.a = 0
+        buffer = self.project._buffer
+        with open(jobs[0].doc._filename, 'rb') as file:
+            blob_size = sys.getsizeof(file.read())
+        with self.project.buffered(buffer_size=3 * blob_size):
+            assert jobs[0].doc.a == 0
+            jobs[1].doc.a = 1
+            assert jobs[0].doc.a == 0
+            assert jobs[2].doc.a == 0
+            assert buffer.get_load() == 3 * blob_size
+            with open(jobs[1].doc._filename) as file:
+                assert json.load(file) == {'a': 0}
+            # The modified, least recently used document is written back.
+            assert jobs[3].doc.a == 0
+            assert buffer.get_load() == 3 * blob_size
+            with open(jobs[1].doc._filename) as file:
+                assert json.load(file) == {'a': 1}
+            assert jobs[0].doc._filename in buffer._blobs
+            assert jobs[1].doc._filename not in buffer._blobs
+            jobs[1].doc.a = 2
+            assert jobs[1].doc.a == 2
+        assert buffer.get_load() == 0
+        assert [job.doc.a for job in jobs] == [0, 2, 0, 0]
@@ -1,11 +1,19 @@
 import os
 import io
+import json
 import array
+import operator
+import random
 from collections import OrderedDict
+from copy import deepcopy
 from itertools import islice
+from math import isclose
 from tempfile import TemporaryDirectory
+from unittest import mock
 
 from signac import Collection
+from signac.core import json as json_module
+from signac import compile_filter
 from signac.contrib.collection import JSONParseError
 from signac.errors import InvalidKeyError
 import pytest
@@ -24,6 +32,8 @@ ARITHMETIC_EXPRESSIONS = [
     ({'$gte': n}, N - n),
 ]
 
+ORDER_OPS = {'$lt': operator.lt, '$lte': operator.le, '$gt': operator.gt, '$gte': operator.ge}
+
 
 ARRAY_EXPRESSIONS = [
     ({'$in': []}, 0),
@@ -217,6 +227,72 @@ class TestCollection():
             for _id in _ids:
                 assert self.c[_id]['a'] == value
 
+    def test_index_incremental_update(self):
+        docs = [dict(a=i % 3, b=[i % 2]) for i in range(10)]
+        docs.append(dict(a=1.5))
+        self.c.update(docs)
+        self.c.index_rebuild_threshold = len(docs)
+        self.c.index('a', build=True)
+        self.c.index('b', build=True)
+        for doc in docs[:4]:
+            del self.c[doc['_id']]
+        self.c[docs[4]['_id']] = dict(a=2.0, b=[2])
+        self.c[docs[5]['_id']] = dict(c=0)
+        del self.c[docs[-1]['_id']]
+        self.c.insert_one(dict(a=[0, 1]))
+        for key in ('a', 'b'):
+            index = self.c.index(key)
+            assert all(index.values())
+            expected = Collection(self.c).index(key, build=True)
+            assert {(type(value), value): _ids for value, _ids in index.items()} == \
+                {(type(value), value): _ids for value, _ids in expected.items()}
+        assert 1.5 not in self.c.index('a')
+        assert len(self.c.find({'a': 2})) == 2
+        assert len(self.c.find({'b': [2]})) == 1
+
+    def test_index_view(self):
+        self.c.update([dict(_id=str(i), a=i % 3) for i in range(9)])
+        self.c['x'] = dict(a=1.0)
+        index = self.c.index('a', build=True)
+        assert len(index) == 4
+        assert index[1] == {'1', '4', '7'}
+        assert index[1.0] == {'x'}
+        assert index[3] == set()
+        assert 3 not in index
+        assert index.get(3) is None
+        with pytest.raises(TypeError):
+            index[3] = {'y'}
+        index[0].add('y')
+        assert index[0] == {'0', '3', '6'}
+        # The view reflects later changes of the collection.
+        del self.c['0']
+        self.c['y'] = dict(a=3)
+        self.c['1'] = dict(a=2)
+        assert len(index) == 5
+        assert index[0] == {'3', '6'}
+        assert index[1] == {'4', '7'}
+        assert index[2] == {'1', '2', '5', '8'}
+        assert index[3] == {'y'}
+        assert {(type(value), value) for value in index} == \
+            {(int, 0), (int, 1), (float, 1.0), (int, 2), (int, 3)}
+
+    def test_index_reuse_positions(self):
+        docs = [dict(a=i, b=i % 2) for i in range(N)]
+        self.c.update(docs)
+        assert len(self.c.find({'a': {'$gte': 90}, 'b': 0})) == 5
+        for doc in docs[:N // 2]:
+            del self.c[doc['_id']]
+        assert len(self.c.find({'b': 0})) == N // 4
+        self.c.update(dict(a=i, b=i % 2) for i in range(N, N + N // 2))
+        assert len(self.c._ids_by_position) == N
+        for value, _ids in self.c.index('a', build=True).items():
+            for _id in _ids:
+                assert self.c[_id]['a'] == value
+        assert len(self.c.find({'a': {'$lt': 60}})) == 10
+        assert len(self.c.find({'a': {'$gte': N + 40}, 'b': 1})) == 5
+        assert len(self.c.find({'$not': {'b': 1}, 'a': {'$in': [60, 61, N]}})) == 2
+        assert len(self.c.find({'$or': [{'a': 50}, {'b': 1}]})) == N // 2 + 1
+
     def test_reindex(self):
         assert len(self.c) == 0
         docs = [dict(a=i) for i in range(10)]
@@ -475,6 +551,84 @@ class TestCollection():
         for expr, n in ARITHMETIC_EXPRESSIONS:
             assert len(self.c.find({'a': expr})) == n
 
+    def test_find_range_operators_sorted_index(self):
+        values = [i / 4 for i in range(-20, 20)] + list(range(-5, 5)) + [float('nan')]
+        self.c.update({'a': v, 'b': str(v)} for v in values)
+        for op in ('$lt', '$lte', '$gt', '$gte'):
+            for arg in (-10, -1, -0.25, 0, 0.0, 1, 2.5, 3.1, 10):
+                expected = sum(1 for v in values if ORDER_OPS[op](v, arg))
+                assert len(self.c.find({'a': {op: arg}})) == expected
+            for arg in ('-1', '0', '1.5', 'a'):
+                expected = sum(1 for v in values if ORDER_OPS[op](str(v), arg))
+                assert len(self.c.find({'b': {op: arg}})) == expected
+        for arg in (0, 1, -2.5):
+            for tol in ([1e-9], [0.1], [0.5, 0.3], [0, 1]):
+                expected = sum(1 for v in values if isclose(v, arg, rel_tol=tol[0],
+                               abs_tol=tol[1] if len(tol) > 1 else 0.0))
+                assert len(self.c.find({'a': {'$near': [arg] + tol}})) == expected
+        # The index is updated with the collection.
+        self.c.insert_one({'a': 100})
+        assert len(self.c.find({'a': {'$gt': 50}})) == 1
+        # Keys that cannot be compared with the argument are not ignored.
+        self.c.insert_one({'a': 'abc'})
+        with pytest.raises(TypeError):
+            self.c.find({'a': {'$gt': 50}})
+
+    def test_sorted_index_incremental_update(self):
+        self.c.index_rebuild_threshold = 1
+        self.c.update({'a': i % 10, 'b': str(i % 10)} for i in range(40))
+        assert len(self.c.find({'a': {'$gt': 5}, 'b': {'$lt': '3'}})) == 0
+        index_a, index_b = self.c._index('a'), self.c._index('b')
+        sorted_a, sorted_b = index_a._sorted_keys(), index_b._sorted_keys()
+        self.c.update({'a': v, 'b': str(v)} for v in (2.5, 20, -1, 1.0, float('nan')))
+        self.c.delete_many({'a': 7})
+        assert len(self.c.find({'a': {'$gt': 5}})) == 13
+        assert len(self.c.find({'b': {'$gte': '8'}})) == 9
+        # The sorted keys were updated instead of being rebuilt.
+        assert index_a._sorted_keys() is sorted_a
+        assert index_b._sorted_keys() is sorted_b
+        numbers, nans, strings, other = sorted_a
+        assert numbers == sorted(k for k in index_a.keys() if k == k)
+        assert [type(k) for k in numbers] == [
+            type(k) for k in sorted((k for k in dict.keys(index_a) if k == k), key=float)]
+        assert len(nans) == 1
+        assert sorted_b[2] == sorted(index_b.keys())
+
+    def test_find_ids(self):
+        self.c.update([dict(_id=str(i), a=i % 3) for i in range(10)])
+        self.c['x'] = dict(a='x')
+        assert self.c._find({'a': 1}, ids=['0', '1', '4', 'y']) == {'1', '4'}
+        assert self.c._find(ids=['0', '1', 'y']) == {'0', '1'}
+        assert self.c._find({'a': 1}, ids=[]) == set()
+        # Documents that are not searched do not raise.
+        assert self.c._find({'a': {'$gt': 0}}, ids=['0', '1', '2']) == {'1', '2'}
+        with pytest.raises(TypeError):
+            self.c._find({'a': {'$gt': 0}})
+
+    def test_find_mixed_types_independent_of_plan(self):
+        docs = [{'a': i, 'b': i % 3} for i in range(20)] + [{'a': 'x', 'b': 1}, {'b': 2}]
+        self.c.update(docs)
+        filters = [
+            ({'b': 0, 'a': {'$gt': 5}}, 5),
+            ({'b': 2, 'a': {'$lt': 10}}, 3),
+            ({'b': 1, 'a': {'$gt': 5}}, TypeError),
+            ({'a': {'$gt': 5}}, TypeError),
+            ({'b': 5, 'a': {'$gt': 5}}, 0),
+            ({'a': {'$lte': 3}, '$or': [{'b': 0}, {'b': 2}]}, 3),
+            ({'a': {'$lte': 3}, '$not': {'b': 0}}, TypeError),
+            ({'a': {'$lte': 3}, '$and': [{'a': {'$ne': 'x'}}]}, 4),
+        ]
+        for f, expectation in filters:
+            for threshold in (0, 0.5, 1):
+                self.c.index_verify_threshold = threshold
+                for c in (self.c, Collection(deepcopy(docs))):
+                    c.index_verify_threshold = threshold
+                    if isinstance(expectation, int):
+                        assert len(c.find(deepcopy(f))) == expectation
+                    else:
+                        with pytest.raises(expectation):
+                            c.find(deepcopy(f))
+
     def test_find_near(self):
         assert len(self.c) == 0
         # find 0 items in empty collection
@@ -572,6 +726,79 @@ class TestCollection():
                 assert len(self.c.find({'$not': expr})) == N - expectation
                 assert len(self.c.find({'$not': {'$not': expr}})) == expectation
 
+    def test_find_query_planner(self):
+        for i in range(N):
+            doc = {'a': i, 'b': i % 7, 'c': {'d': str(i % 3)}}
+            if i % 5 == 0:
+                doc['e'] = True
+            self.c.insert_one(doc)
+        filters = [
+            {'a': n, 'b': n % 7},
+            {'b': 3, 'a': {'$gt': 50}},
+            {'b': 3, 'c.d': '1', 'a': {'$lt': 60}},
+            {'a': {'$in': [1, 2, 3]}, 'c': {'d': {'$exists': True}}, 'e': {'$exists': False}},
+            {'a': n, '$not': {'b': 0}},
+            {'b': 1, '$not': {'c.d': '0'}},
+            {'b': 1, '$or': [{'c.d': '0'}, {'a': {'$gte': 90}}]},
+            {'b': 1, '$and': [{'c.d': '2'}, {'$not': {'a': {'$lt': 20}}}]},
+            {'$not': {'b': 1}, 'c.d': {'$regex': '[12]'}},
+        ]
+        for f in filters:
+            # The planner does not change the result, ...
+            self.c.index_verify_threshold = 0
+            expected = {doc['_id'] for doc in self.c.find(deepcopy(f))}
+            for threshold in (0.05, 1):
+                self.c.index_verify_threshold = threshold
+                assert {doc['_id'] for doc in self.c.find(deepcopy(f))} == expected
+        # ... but avoids building indexes that are not needed.
+        c = Collection({'a': i, 'b': i % 7} for i in range(N))
+        assert len(c.find({'b': {'$gt': 5}, 'a': 6})) == 1
+        assert 'a' in c._indexes
+        assert 'b' not in c._indexes
+
+    def test_find_compiled_filter(self):
+        for i in range(N):
+            self.c.insert_one({'a': i, 'b': i % 7, 'c': {'d': str(i % 3)}})
+        filters = [
+            {'a': n},
+            {'a': float(n)},
+            {'b': 3, 'a': {'$gt': 50}},
+            {'c': {'d': {'$regex': '[12]'}}, 'a': {'$near': [n, 0.1]}},
+            {'a': {'$where': 'lambda x: x % 11 == 0'}},
+            {'b': {'$type': 'int'}, 'c.d': {'$exists': False}},
+            {'b': 1, '$or': [{'c.d': '0'}, {'a': {'$gte': 90}}]},
+            {'$not': {'b': 1}, '$and': [{'a': {'$in': [1, 2, 3, 8]}}]},
+        ]
+        for f in filters:
+            compiled = compile_filter(f)
+            assert compile_filter(compiled) is compiled
+            assert compiled.filter == f
+            expected = {doc['_id'] for doc in self.c.find(deepcopy(f))}
+            assert {doc['_id'] for doc in self.c.find(compiled)} == expected
+            # Compiled filters are reusable and not modified by searches.
+            assert {doc['_id'] for doc in self.c.find(compiled)} == expected
+            assert compiled == compile_filter(f)
+            assert hash(compiled) == hash(compile_filter(f))
+        assert not compile_filter(None)
+        assert not compile_filter({})
+        assert len(self.c.find(compile_filter({}))) == N
+        _id = self.c.find_one({'a': n})['_id']
+        assert len(self.c.find(compile_filter({'_id': _id}))) == 1
+
+    def test_compile_invalid_filter(self):
+        for expr, expectation in LOGICAL_EXPRESSIONS:
+            if not isinstance(expectation, int):
+                with pytest.raises(expectation):
+                    compile_filter(expr)
+        with pytest.raises(ValueError):
+            compile_filter({'a': {'$type': 'foo'}})
+        with pytest.raises(ValueError):
+            compile_filter({'a': {'$exists': 1}})
+        with pytest.raises(KeyError):
+            compile_filter({'a': {'$foo': 0}})
+        with pytest.raises(TypeError):
+            compile_filter({'a': object()})
+
 
 class TestCompressedCollection(TestCollection):
 
@@ -640,6 +867,35 @@ class TestCollectionToFromJson():
         c.close()
 
 
+class TestCollectionMixedTypes():
+
+    def test_find_mixed_types_fuzz(self):
+        rng = random.Random(42)
+        values = [0, 1, 2.5, -1, 'a', 'b', None, True, [1]]
+        docs = [{k: rng.choice(values) for k in 'abc' if rng.random() < 0.9}
+                for _ in range(50)]
+        ops = ['$lt', '$lte', '$gt', '$gte', '$eq', '$ne', '$near']
+
+        def outcome(f, threshold):
+            c = Collection(deepcopy(docs))
+            c.index_verify_threshold = threshold
+            try:
+                return {doc['_id'] for doc in c.find(deepcopy(f))}
+            except TypeError:
+                return TypeError
+
+        for _ in range(200):
+            keys = rng.sample('abc', rng.randint(1, 3))
+            f = {}
+            for key in keys:
+                op = rng.choice(ops)
+                arg = rng.choice([0, 1, 'a']) if op != '$near' else rng.choice([0, 1])
+                f[key] = {op: arg} if rng.random() < 0.8 else arg
+            expected = outcome(f, 0)
+            assert outcome(f, 1) == expected
+            assert outcome(dict(reversed(list(f.items()))), 0.5) == expected
+
+
 class TestFileCollectionReadOnly():
 
     @pytest.fixture(autouse=True)
@@ -670,16 +926,114 @@ class TestFileCollectionReadOnly():
             c.find()
 
 
+class TestLazyFileCollection():
+
+    @pytest.fixture(autouse=True)
+    def setUp(self, request):
+        self._tmp_dir = TemporaryDirectory(prefix='signac_collection_')
+        request.addfinalizer(self._tmp_dir.cleanup)
+        self._fn_collection = os.path.join(self._tmp_dir.name, 'test.txt')
+        with Collection.open(self._fn_collection, 'w') as c:
+            c.update([dict(_id=str(i), a=i, b=dict(c=i % 3)) for i in range(N)])
+            c['x'] = dict(a=N, _id='x')     # primary key is not the first key
+            c['\u00e9\"'] = dict(a=-1)       # primary key with escaped characters
+
+    def test_read(self):
+        with Collection.open(self._fn_collection, mode='r') as c:
+            expected = {doc['_id']: doc for doc in c}
+        with Collection.open(self._fn_collection, lazy=True) as c:
+            assert len(c) == len(expected)
+            for _id, doc in expected.items():
+                assert _id in c
+                assert c[_id] == doc
+            assert 'y' not in c
+            assert {doc['_id'] for doc in c} == set(expected)
+            assert {doc['_id'] for doc in c.find({'b.c': 1})} == \
+                {str(i) for i in range(N) if i % 3 == 1}
+            assert len(c.find({'a': {'$lt': 10}})) == 11
+            assert c.find_one({'a': N})['_id'] == 'x'
+        assert os.path.isfile(self._fn_collection + '.idx')
+
+    def test_offsets_sidecar(self):
+        with Collection.open(self._fn_collection, lazy=True) as c:
+            assert c['1']['a'] == 1
+        with open(self._fn_collection + '.idx') as file:
+            sidecar = json.load(file)
+        offsets = sidecar['offsets']
+        i, j = sidecar['ids'].index('1'), sidecar['ids'].index('2')
+        offsets[i], offsets[j] = offsets[j], offsets[i]
+        with open(self._fn_collection + '.idx', 'w') as file:
+            json.dump(sidecar, file)
+        # The offsets are read from the sidecar file ...
+        with Collection.open(self._fn_collection, lazy=True) as c:
+            assert c['1']['a'] == 2
+        with open(self._fn_collection, 'a') as file:
+            file.write('{"_id": "y", "a": 0}\n')
+        # ... unless the collection file has been modified.
+        with Collection.open(self._fn_collection, lazy=True) as c:
+            assert c['1']['a'] == 1
+            assert c['y']['a'] == 0
+
+    def test_write_on_lazy(self):
+        with pytest.raises(RuntimeError):
+            Collection.open(self._fn_collection, mode='a', lazy=True)
+        with pytest.raises(RuntimeError):
+            Collection.open(self._fn_collection, log=True, lazy=True)
+        with pytest.raises(RuntimeError):
+            Collection.open(':memory:', lazy=True)
+        c = Collection.open(self._fn_collection, lazy=True)
+        c.replace_one({'_id': '0'}, dict(a=-2))
+        del c['1']
+        c.insert_one(dict(_id='y', a=-2))
+        assert len(c) == N + 2
+        assert len(c.find({'a': -2})) == 2
+        assert '1' not in c
+        with pytest.raises(io.UnsupportedOperation):
+            c.flush()
+        with pytest.raises(io.UnsupportedOperation):
+            c.close()
+        with Collection.open(self._fn_collection, lazy=True) as c:
+            assert len(c) == N + 2
+            assert c['0']['a'] == 0
+
+    def test_read_invalid(self):
+        with open(self._fn_collection, 'a') as file:
+            file.write("{'a': 0}\n")
+        with pytest.raises(JSONParseError):
+            Collection.open(self._fn_collection, lazy=True)
+
+    def test_read_blank_lines(self):
+        with open(self._fn_collection, 'a') as file:
+            file.write('\n{"_id": "y", "a": 0}\n')
+        for lazy in (False, True):
+            with pytest.raises(JSONParseError):
+                Collection.open(self._fn_collection, mode='r', lazy=lazy)
+
+    def test_build_indexes_in_one_pass(self):
+        with Collection.open(self._fn_collection, lazy=True) as c:
+            c.index_verify_threshold = 0
+            with mock.patch('signac.contrib.collection.json.decode',
+                            wraps=json_module.decode) as decode:
+                assert len(c.find({'a': {'$lt': 50}, 'b.c': 1,
+                                   '$or': [{'d': 0}, {'b.c': {'$ne': 2}}]})) == 17
+                # Each document is decoded once to build all indexes ...
+                assert decode.call_count == N + 2
+                # ... which are reused by later queries.
+                assert len(c.find({'b.c': 2, 'd': {'$exists': False}})) == N // 3
+                assert decode.call_count == N + 2
+
+
 class TestFileCollection(TestCollection):
     mode = 'w'
     filename = 'test.txt'
+    log = False
 
     @pytest.fixture(autouse=True)
     def setUp(self, request):
         self._tmp_dir = TemporaryDirectory(prefix='signac_collection_')
         request.addfinalizer(self._tmp_dir.cleanup)
         self._fn_collection = os.path.join(self._tmp_dir.name, self.filename)
-        self.c = Collection.open(self._fn_collection, mode=self.mode)
+        self.c = Collection.open(self._fn_collection, mode=self.mode, log=self.log)
         request.addfinalizer(self.c.close)
 
     def test_write_and_flush(self):
@@ -738,6 +1092,108 @@ class TestBinaryFileCollectionAppendPlus(TestFileCollectionAppend):
     mode = 'ab+'
 
 
+class TestFileCollectionLog(TestFileCollection):
+    mode = 'ab+'
+    log = True
+
+    def num_records(self):
+        with open(self._fn_collection) as file:
+            return len(list(file))
+
+    def test_log_append_and_replay(self):
+        docs = [dict(_id=str(i), a=i) for i in range(10)]
+        self.c.update(docs)
+        self.c.flush()
+        assert self.num_records() == 10
+        self.c.replace_one({'_id': '0'}, dict(a=-1))
+        del self.c['1']
+        self.c.flush()
+        assert self.num_records() == 12
+        self.c.flush()
+        assert self.num_records() == 12
+        with Collection.open(self._fn_collection, log=True) as c:
+            assert len(c) == 9
+            assert '1' not in c
+            assert c['0']['a'] == -1
+            c.insert_one(dict(_id='1', a=1))
+        assert self.num_records() == 13
+        self.c.close()
+        with Collection.open(self._fn_collection, log=True) as c:
+            assert len(c) == 10
+            assert c['1']['a'] == 1
+            c.compact()
+            assert self.num_records() == 10
+            del c['2']
+        with Collection.open(self._fn_collection, log=True) as c:
+            assert len(c) == 9
+            c.compact()
+        with Collection.open(self._fn_collection, mode='r') as c:
+            assert len(c) == 9
+            assert len(c.find({'a': {'$gte': 3}})) == 7
+
+    def test_log_fsync(self):
+        self.c.update(dict(_id=str(i), a=i) for i in range(10))
+        with mock.patch('os.fsync', wraps=os.fsync) as fsync:
+            self.c.flush()
+            # The appended records are synced.
+            assert fsync.call_count == 1
+            del self.c['1']
+            self.c.compact()
+            # The compacted file is synced before it replaces the log, and
+            # then the directory.
+            assert fsync.call_count == 3
+        assert self.num_records() == 9
+
+    def test_log_compaction_threshold(self):
+        self.c.log_compaction_threshold = 0.5
+        self.c.update([dict(_id=str(i), a=0) for i in range(10)])
+        self.c.flush()
+        for i in range(1, 20):
+            self.c.replace_one({'_id': '0'}, dict(a=i))
+            self.c.flush()
+            assert self.num_records() <= 15
+        self.c.clear()
+        self.c.flush()
+        assert self.num_records() == 0
+
+    def test_log_incomplete_record(self):
+        self.c.update([dict(_id=str(i), a=i) for i in range(3)])
+        self.c.close()
+        with open(self._fn_collection, 'a') as file:
+            file.write('{"_id": "3", "a":')
+        with Collection.open(self._fn_collection, log=True) as c:
+            assert len(c) == 3
+            c['4'] = dict(a=4)
+        with Collection.open(self._fn_collection, log=True) as c:
+            assert len(c) == 4
+            assert c['4']['a'] == 4
+        with open(self._fn_collection, 'a') as file:
+            file.write('{"a": 0\n{"_id": "5"}\n')
+        with pytest.raises(JSONParseError):
+            Collection.open(self._fn_collection, mode='r', log=True)
+
+    def test_log_modes(self):
+        with pytest.raises(RuntimeError):
+            Collection.open(':memory:', log=True)
+        with pytest.raises(RuntimeError):
+            Collection.open(self._fn_collection + '.gz', log=True)
+        self.c.insert_one(dict(a=0))
+        self.c.flush()
+        c = Collection.open(self._fn_collection, mode='r', log=True)
+        assert len(c) == 1
+        c.insert_one(dict(a=1))
+        with pytest.raises(io.UnsupportedOperation):
+            c.flush()
+        with pytest.raises(io.UnsupportedOperation):
+            c.compact()
+        with pytest.raises(io.UnsupportedOperation):
+            c.close()
+
+
+class TestFileCollectionLogWrite(TestFileCollectionLog):
+    mode = 'w'
+
+
 class TestZippedFileCollection(TestFileCollection):
     filename = 'test.txt.gz'
     mode = 'wb'
@@ -0,0 +1,62 @@
+# Copyright (c) 2020 The Regents of the University of Michigan
+# All rights reserved.
+# This software is licensed under the BSD 3-Clause License.
+import json
+import hashlib
+import pytest
+from collections import OrderedDict
+
+from signac.contrib.hashing import calc_id, calc_ids
+
+
+def _reference_id(spec):
+    blob = json.dumps(spec, sort_keys=True)
+    m = hashlib.md5()
+    m.update(blob.encode())
+    return m.hexdigest()
+
+
+SPECS = [
+    {},
+    {'a': 0},
+    {'a': 0.0},
+    {'a': -0.0},
+    {'a': 0.1, 'b': 1e-300, 'c': 1.7976931348623157e+308, 'd': 5e-324},
+    {'a': 1 / 3, 'b': 2 / 3, 'c': 1e16, 'd': 1e22, 'e': 123456789.123456789},
+    {'a': float('nan'), 'b': float('inf'), 'c': float('-inf')},
+    {'a': 2**53 + 1, 'b': -2**63, 'c': 2**64, 'd': 10**40},
+    {'a': True, 'b': False, 'c': None},
+    {'ä': 'ö', 'emoji': '\U0001F600', 'cjk': '中文', 'é': 'combining'},
+    {'escape': '"\\/\b\f\n\r\t', 'nul': '\x00', 'surrogate': '\ud800'},
+    {'b': 0, 'a': 1, 'B': 2, 'A': 3, '_': 4, '10': 5, '9': 6},
+    OrderedDict([('b', 0), ('a', 1)]),
+    {'a': {'b': {'c': {'d': [1, [2, [3, {'e': 'f', 'd': 'g'}]]]}}}},
+    {'a': [], 'b': {}, 'c': [{}], 'd': [[]]},
+    {'a': (1, 2), 'b': [1, 2]},
+    {1: 'int', 2: {2.5: 'float', 0.5: 'float'}},
+]
+
+
+@pytest.mark.parametrize('spec', SPECS)
+def test_calc_id(spec):
+    assert calc_id(spec) == _reference_id(spec)
+
+
+def test_calc_id_known_values():
+    assert calc_id({'a': 0}) == hashlib.md5(b'{"a": 0}').hexdigest()
+    assert calc_id({'b': 1, 'a': [1.5, 'x']}) == \
+        hashlib.md5(b'{"a": [1.5, "x"], "b": 1}').hexdigest()
+
+
+@pytest.mark.parametrize('parallel', [False, 1, 2, True])
+def test_calc_ids(parallel):
+    specs = SPECS + [{'a': i, 'b': {'c': str(i)}} for i in range(100)]
+    expected = [_reference_id(spec) for spec in specs]
+    assert calc_ids(specs, parallel=parallel) == expected
+    assert calc_ids(iter(specs), parallel=parallel) == expected
+    assert calc_ids([], parallel=parallel) == []
+
+
+def test_calc_ids_invalid():
+    with pytest.raises(TypeError):
+        calc_ids([{'a': 0}, {'a': object()}])
@@ -2,13 +2,23 @@
 # All rights reserved.
 # This software is licensed under the BSD 3-Clause License.
 import os
+import json
+import math
+import time
 import pytest
 import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
 from tempfile import TemporaryDirectory
+from unittest import mock
 
+from signac.core import json as signac_json
 from signac.core.jsondict import JSONDict
 from signac.errors import InvalidKeyError
 from signac.errors import KeyTypeError
+from signac.errors import TransactionConflictError
 
 
 FN_DICT = 'jsondict.json'
@@ -222,6 +232,47 @@ class TestJSONDict(TestJSONDictBase):
             assert key not in b
         assert key not in jsd
 
+    def test_transaction(self):
+        jsd = self.get_json_dict()
+        jsd['a'] = dict(b=[])
+        with mock.patch.object(JSONDict, '_save', autospec=True,
+                               side_effect=JSONDict._save) as save:
+            with jsd.transaction():
+                for i in range(10):
+                    jsd.a.b.append(i)
+                jsd['c'] = 0
+                with jsd.a.transaction():
+                    jsd.a['d'] = 1
+                assert len(self.get_json_dict()) == 1
+            assert save.call_count == 1
+        jsd2 = self.get_json_dict()
+        assert jsd2() == jsd() == dict(a=dict(b=list(range(10)), d=1), c=0)
+
+    def test_transaction_rollback(self):
+        jsd = self.get_json_dict()
+        jsd['a'] = 0
+        with pytest.raises(RuntimeError):
+            with jsd.transaction():
+                jsd['a'] = 1
+                jsd['b'] = 2
+                raise RuntimeError()
+        assert jsd() == dict(a=0)
+        assert self.get_json_dict()() == dict(a=0)
+        jsd['b'] = 3
+        assert self.get_json_dict()() == dict(a=0, b=3)
+
+    def test_transaction_conflict(self):
+        jsd = self.get_json_dict()
+        jsd['a'] = 0
+        with jsd.transaction(check_conflicts=True):
+            jsd['a'] = 1
+        assert self.get_json_dict()['a'] == 1
+        with pytest.raises(TransactionConflictError):
+            with jsd.transaction(check_conflicts=True):
+                jsd['a'] = 2
+                self.get_json_dict()['b'] = 3
+        assert jsd() == self.get_json_dict()() == dict(a=1, b=3)
+
     def test_keys_with_dots(self):
         jsd = self.get_json_dict()
         with pytest.raises(InvalidKeyError):
@@ -265,3 +316,130 @@ class TestJSONDictNestedData(TestJSONDict):
 class TestJSONDictNestedDataWriteConcern(TestJSONDictNestedData, TestJSONDictWriteConcern):
 
     pass
+
+
+class TestJSONDictConsistency(TestJSONDictBase):
+
+    def write_externally(self, data, age):
+        with open(self._fn_dict, 'w') as file:
+            json.dump(data, file)
+        mtime = time.time() - age
+        os.utime(self._fn_dict, (mtime, mtime))
+
+    def test_invalid_consistency(self):
+        with pytest.raises(ValueError):
+            JSONDict(filename=self._fn_dict, consistency='never')
+
+    def test_stat_consistency(self):
+        self.write_externally(dict(a=0), age=60)
+        jsd = JSONDict(filename=self._fn_dict)
+        assert jsd['a'] == 0
+        with mock.patch.object(JSONDict, '_load_from_disk', side_effect=AssertionError):
+            # The file is unchanged and must not be read again.
+            assert jsd['a'] == 0
+            assert list(jsd) == ['a']
+        self.write_externally(dict(a=1, b=2), age=30)
+        assert jsd['a'] == 1
+        assert jsd['b'] == 2
+        os.remove(self._fn_dict)
+        assert len(jsd) == 0
+
+    def test_stat_consistency_recently_modified(self):
+        jsd = JSONDict(filename=self._fn_dict)
+        jsd['a'] = 0
+        with open(self._fn_dict, 'w') as file:
+            json.dump(dict(a=1), file)
+        # A recently modified file is always read again.
+        assert jsd['a'] == 1
+
+    def test_strict_consistency(self):
+        self.write_externally(dict(a=0), age=60)
+        jsd = JSONDict(filename=self._fn_dict, consistency='strict')
+        assert jsd['a'] == 0
+        with mock.patch.object(JSONDict, '_load_from_disk', return_value=b'{"a": 1}'):
+            assert jsd['a'] == 1
+
+    def test_session_consistency(self):
+        self.write_externally(dict(a=0), age=60)
+        jsd = JSONDict(filename=self._fn_dict, consistency='session')
+        assert jsd['a'] == 0
+        self.write_externally(dict(a=1), age=30)
+        assert jsd['a'] == 0
+        jsd['b'] = 2
+        assert jsd() == dict(a=0, b=2)
+        with open(self._fn_dict) as file:
+            assert json.load(file) == dict(a=0, b=2)
+
+
+@dataclass
+class _DataClass:
+    a: int
+
+
+class _Enum(Enum):
+    A = 'a'
+
+
+class TestJSONCodecs(TestJSONDictBase):
+
+    DOCS = [
+        dict(a=0, b=0.1, c=-1e-300, d=1.7976931348623157e+308, e=2**64, f=-2**70),
+        dict(a=float('inf'), b=float('-inf')),
+        {'ä': 'ö', 'emoji': '\U0001F600', 'escape': '"\\\n\t', 'nul': '\x00'},
+        dict(a=None, b=True, c=False, d='null', e=[None, [None, {}]]),
+        dict(a=dict(b=dict(c=[1, 2.5, 'x', (3, 4)])), b=[]),
+        {1: 'int key'},
+        {2.5: 'float key'},
+        {True: 'bool key'},
+        {None: 'null key'},
+    ]
+
+    @pytest.fixture(params=signac_json.get_codecs())
+    def codec(self, request):
+        codec = signac_json.get_codec()
+        signac_json.set_codec(request.param)
+        yield signac_json.get_codec()
+        signac_json.set_codec(codec.name)
+
+    @pytest.mark.parametrize('doc', DOCS)
+    def test_round_trip(self, codec, doc):
+        blob = signac_json.encode(doc)
+        assert isinstance(blob, bytes)
+        expected = json.loads(json.dumps(doc))
+        assert signac_json.decode(blob) == expected
+        assert signac_json.decode(json.dumps(doc)) == expected
+        assert signac_json.decode(json.dumps(doc).encode()) == expected
+
+    def test_nan(self, codec):
+        doc = signac_json.decode(signac_json.encode(dict(a=float('nan'))))
+        assert math.isnan(doc['a'])
+
+    def test_invalid(self, codec):
+        with pytest.raises(TypeError):
+            signac_json.encode(dict(a=object()))
+        for value in (datetime(2020, 1, 1), uuid.uuid4(), _DataClass(1), _Enum.A):
+            with pytest.raises(TypeError):
+                signac_json.encode(dict(a=value))
+        with pytest.raises(ValueError):
+            signac_json.decode(b'{"a": ')
+
+    def test_subclasses(self, codec):
+        class Str(str):
+            pass
+
+        class Float(float):
+            pass
+
+        doc = OrderedDict(a=Str('b'), c=Float(1.5), d=[OrderedDict(e=None)])
+        assert signac_json.decode(signac_json.encode(doc)) == json.loads(json.dumps(doc))
+
+    def test_jsondict(self, codec):
+        jsd = JSONDict(filename=self._fn_dict)
+        jsd.update(self.DOCS[2])
+        jsd.a = dict(b=[1, 2.5])
+        with open(self._fn_dict) as file:
+            assert json.load(file) == jsd()
+
+    def test_unknown_codec(self):
+        with pytest.raises(KeyError):
+            signac_json.set_codec('unknown')
@@ -9,6 +9,7 @@ import uuid
 import logging
 import itertools
 import json
+import gzip
 import pickle
 import string
 import warnings
@@ -19,6 +20,7 @@ from tempfile import TemporaryDirectory
 from packaging import version
 from contextlib import redirect_stderr, contextmanager
 from time import time
+from unittest import mock
 from conftest import deprecated_in_version
 
 
@@ -26,6 +28,7 @@ import signac
 from signac.errors import DestinationExistsError
 from signac.contrib.linked_view import _find_all_links
 from signac.contrib.schema import ProjectSchema
+from signac.contrib.hashing import calc_id, calc_ids
 from signac.contrib.errors import JobsCorruptedError
 from signac.contrib.errors import WorkspaceError
 from signac.contrib.errors import StatepointParsingError
@@ -310,6 +313,167 @@ class TestProject(TestProjectBase):
         assert 1 == len(list(self.project.find_jobs({'a': 0})))
         assert 0 == len(list(self.project.find_jobs({'a': 5})))
 
+    def test_find_jobs_reuses_search_index(self):
+        for i in range(10):
+            self.project.open_job({'a': i, 'b': i % 2}).init()
+        assert len(self.project.find_jobs({'a': 0})) == 1
+        search_index = self.project._search_index
+        index_a = search_index._collection._index('statepoint.a')
+        assert len(self.project.find_jobs({'b': 0})) == 5
+        assert self.project._search_index is search_index
+        assert search_index._collection._index('statepoint.a') is index_a
+        # The search index is updated incrementally.
+        self.project.open_job({'a': 10, 'b': 0}).init()
+        self.project.open_job({'a': 0, 'b': 0}).remove()
+        assert len(self.project.find_jobs({'b': 0})) == 5
+        assert len(self.project.find_jobs({'a': 0})) == 0
+        assert len(self.project.find_jobs({'a': 10})) == 1
+        assert self.project._search_index is search_index
+        assert search_index._collection._index('statepoint.a') is index_a
+
+    def test_find_jobs_doc_filter_cache(self):
+        jobs = [self.project.open_job({'a': i}) for i in range(5)]
+        t = time() - 60
+        for job in jobs:
+            job.doc.b = job.sp.a % 2
+            os.utime(job.fn(job.FN_DOCUMENT), (t, t))
+        assert len(self.project.find_jobs(doc_filter={'b': 0})) == 3
+        if self.project.Job is signac.contrib.job.Job:
+            with mock.patch('signac.contrib.project.open', side_effect=AssertionError,
+                            create=True):
+                assert len(self.project.find_jobs(doc_filter={'b': 1})) == 2
+        # Changed documents are read again.
+        jobs[0].doc.b = 1
+        assert len(self.project.find_jobs(doc_filter={'b': 0})) == 2
+        assert len(self.project.find_jobs(doc_filter={'b': 1})) == 3
+
+    def test_find_jobs_doc_search_index(self):
+        jobs = [self.project.open_job({'a': i}) for i in range(10)]
+        t = time() - 60
+        for job in jobs:
+            job.doc.b = job.sp.a % 2
+            os.utime(job.fn(job.FN_DOCUMENT), (t, t))
+        jobs[9].remove()
+        assert len(self.project.find_jobs(doc_filter={'b': 0})) == 5
+        if self.project.Job is not signac.contrib.job.Job:
+            return
+        read_job_document = mock.patch.object(
+            self.project, '_read_job_document', wraps=self.project._read_job_document)
+        with read_job_document as read:
+            # Unchanged documents are neither read nor decoded again.
+            with mock.patch('signac.contrib.project.json.decode',
+                            side_effect=AssertionError):
+                assert len(self.project.find_jobs(doc_filter={'b': 1})) == 4
+                assert len(self.project.find_jobs({'a': {'$lt': 4}}, {'b': 1})) == 2
+                assert len(self.project.find_jobs(doc_filter={'b': {'$gt': 0}})) == 4
+            assert read.call_count == 0
+            # Only changed, new and recently modified documents are read again.
+            jobs[0].doc.b = 1
+            jobs[1].remove()
+            jobs[9].init()
+            jobs[9].doc.b = 0
+            assert len(self.project.find_jobs(doc_filter={'b': 0})) == 5
+            assert len(self.project.find_jobs({'a': {'$gt': 5}}, {'b': 0})) == 3
+            assert read.call_count == 2 + 1
+            for job in (jobs[0], jobs[9]):
+                os.utime(job.fn(job.FN_DOCUMENT), (t, t))
+            assert len(self.project.find_jobs(doc_filter={'b': 1})) == 4
+            read.reset_mock()
+            assert len(self.project.find_jobs(doc_filter={'b': 1})) == 4
+            assert read.call_count == 0
+        assert set(self.project._doc_search_index._collection.ids) == \
+            {job.id for job in self.project}
+
+    def test_read_job_document_copy(self):
+        job = self.project.open_job({'a': 0})
+        job.doc.b = {'c': [1]}
+        t = time() - 60
+        os.utime(job.fn(job.FN_DOCUMENT), (t, t))
+        # Modifications of returned documents do not affect the cache.
+        self.project._read_job_document(job.id)['b']['c'].append(2)
+        assert self.project._read_job_document(job.id) == {'b': {'c': [1]}}
+        next(iter(self.project.index(include_job_document=True)))['b']['c'].append(2)
+        assert len(self.project.find_jobs(doc_filter={'b.c': [1]})) == 1
+
+    def test_find_jobs_mixed_filters(self):
+        for i in range(10):
+            self.project.open_job({'a': i, 'b': {'c': i % 3}}).doc.d = i % 2
+        read_job_document = mock.patch.object(
+            self.project, '_read_job_document', wraps=self.project._read_job_document)
+        with read_job_document as read:
+            assert len(self.project.find_jobs({'a': 3}, {'d': 1})) == 1
+            assert len(self.project.find_jobs({'a': 3}, {'d': 0})) == 0
+            assert len(self.project.find_jobs({'a': 3}, {})) == 1
+            assert len(self.project.find_jobs({'a': 10}, {'d': 0})) == 0
+            if self.project.Job is signac.contrib.job.Job:
+                assert read.call_count == 2
+            assert len(self.project.find_jobs(
+                {'$or': [{'a': 3}, {'b.c': 0}]},
+                {'$and': [{'d': 0}, {'statepoint.a': {'$lt': 5}}]})) == 1
+            assert len(self.project.find_jobs({'b.c': 0}, {'d': 1})) == 2
+            assert len(self.project.find_jobs({'b.c': {'$in': [0, 1]}}, {'d': 1})) == 4
+            # State point clauses of document filters are resolved first.
+            read.reset_mock()
+            assert len(self.project.find_jobs(doc_filter={
+                '$and': [{'statepoint.a': 3}, {'d': 1}]})) == 1
+            assert len(self.project.find_jobs(doc_filter={
+                'statepoint.b.c': 0, '$and': [{'$or': [{'d': 0}, {'statepoint.a': 9}]}]})) == 3
+            assert len(self.project.find_jobs({'a': {'$lt': 5}}, {
+                '$and': [{'$not': {'statepoint.a': 1}}], '$or': [{'d': 1}]})) == 1
+            if self.project.Job is signac.contrib.job.Job:
+                assert read.call_count == 1 + 4 + 4
+            assert len(self.project.find_jobs(doc_filter={
+                'statepoint': {'a': 2}, '$or': [{'statepoint.a': 2}]})) == 1
+            if self.project.Job is signac.contrib.job.Job:
+                assert read.call_count == 1 + 4 + 4
+            with pytest.raises(ValueError):
+                self.project.find_jobs(doc_filter={'$and': [], 'd': 0}).__len__()
+            # Clauses that mix state point and document keys are not split.
+            assert len(self.project.find_jobs(doc_filter={
+                '$or': [{'statepoint.a': 1}, {'d': 0}]})) == 6
+
+    def test_find_jobs_compiled_filters(self):
+        for i in range(10):
+            self.project.open_job({'a': i, 'b': {'c': i % 3}}).doc.d = i % 2
+        filters = [
+            ({'a': 3}, None),
+            ({'b.c': {'$in': [0, 1]}}, {'d': 1}),
+            ({'$or': [{'a': 3}, {'b.c': 0}]}, {'$and': [{'d': 0}, {'statepoint.a': {'$lt': 5}}]}),
+            ({'$not': {'b': {'c': 0}}}, None),
+            (None, {'d': 0}),
+            ({}, {}),
+        ]
+        for f, doc_f in filters:
+            expected = set(self.project.find_job_ids(
+                None if f is None or '$not' in f else f, doc_f))
+            if f is not None and '$not' in f:
+                expected -= set(self.project.find_job_ids(f['$not']))
+            compiled = signac.compile_filter(f)
+            compiled_doc = signac.compile_filter(doc_f)
+            jobs = self.project.find_jobs(compiled, compiled_doc)
+            assert len(jobs) == len(expected)
+            assert {job.id for job in jobs} == expected
+            assert jobs == self.project.find_jobs(signac.compile_filter(f), compiled_doc)
+            if f is not None:
+                assert {job.id for job in self.project.find_jobs(compiled, doc_f)} == expected
+        groups = self.project.find_jobs(signac.compile_filter({'b.c': 1})).groupby('a')
+        assert [key for key, group in groups] == [1, 4, 7]
+
+    def test_read_job_documents(self):
+        jobs = [self.project.open_job({'a': i}) for i in range(100)]
+        for job in jobs[::2]:
+            job.doc.b = job.sp.a
+        for job in jobs[1::2]:
+            job.init()
+        job_ids = [job.id for job in reversed(jobs)]
+        expected = [(job.id, job.document()) for job in reversed(jobs)]
+        for concurrency in (1, 4):
+            self.project._document_read_concurrency = concurrency
+            assert list(self.project._read_job_documents(job_ids)) == expected
+        for doc in self.project.index(include_job_document=True):
+            assert doc.get('b') == (doc['statepoint']['a'] if doc['statepoint']['a'] % 2 == 0
+                                    else None)
+
     def test_find_jobs_next(self):
         statepoints = [{'a': i} for i in range(5)]
         for sp in statepoints:
@@ -383,6 +547,28 @@ class TestProject(TestProjectBase):
         assert len(self.project) == len(self.project.find_jobs())
         assert 3 == len(self.project.find_jobs({'b': True}))
 
+    def test_cached_job_ids(self):
+        jobs = [self.project.open_job({'a': i}) for i in range(5)]
+        for job in jobs[:3]:
+            job.init()
+        # Age the workspace directories, recently modified directories are not cached.
+        t = time() - 60
+        for path in {self.project.workspace()} | {os.path.dirname(job.workspace()) for job in jobs}:
+            if os.path.isdir(path):
+                os.utime(path, (t, t))
+        assert len(self.project) == 3
+        with mock.patch('os.scandir', side_effect=AssertionError):
+            assert len(self.project) == 3
+            assert set(self.project.find_job_ids()) == {job.id for job in jobs[:3]}
+            assert all(job in self.project for job in jobs[:3])
+            assert not any(job in self.project for job in jobs[3:])
+        jobs[3].init()
+        jobs[0].remove()
+        assert len(self.project) == 3
+        assert set(self.project.find_job_ids()) == {job.id for job in jobs[1:4]}
+        assert jobs[3] in self.project
+        assert jobs[0] not in self.project
+
     def test_iteration(self):
         statepoints = [{'a': i, 'b': i < 3} for i in range(5)]
         for sp in statepoints:
@@ -391,6 +577,62 @@ class TestProject(TestProjectBase):
             pass
         assert i == len(self.project) - 1
 
+    def test_iteration_skips_implicit_init(self):
+        for i in range(3):
+            self.project.open_job(dict(a=i)).init()
+        with mock.patch.object(self.project.Job, 'init') as init:
+            for job in self.project:
+                job.doc.a = job.sp.a
+            for job in self.project.find_jobs({'a': 0}):
+                assert job.doc.a == 0
+            assert not init.called
+            self.project.open_job(dict(a=0)).doc
+            assert init.called
+        # Removed jobs are initialized again on access.
+        job = next(iter(self.project.find_jobs({'a': 1})))
+        job.remove()
+        assert job not in self.project
+        job.doc.b = 1
+        assert job in self.project
+        assert job.doc() == {'b': 1}
+
+    def test_init_jobs(self):
+        statepoints = [{'a': i, 'b': {'c': str(i)}} for i in range(20)]
+        existing = self.project.open_job(statepoints[0])
+        existing.init()
+        self.project.update_cache()
+        for parallel in (True, 4, False):
+            jobs = self.project.init_jobs(statepoints + statepoints[:2], parallel=parallel)
+            assert [job.statepoint() for job in jobs] == statepoints + statepoints[:2]
+            assert jobs[0] == existing
+            assert len(self.project) == len(statepoints)
+            for job, sp in zip(jobs, statepoints):
+                assert job in self.project
+                assert job.id == calc_id(sp)
+                assert job.id in self.project._sp_cache
+                job._check_manifest()
+        # The new jobs are appended to the persistent cache with a single record.
+        with open(self.project.fn(self.project.FN_CACHE_JOURNAL), 'rb') as journal:
+            assert len(journal.readlines()) == 1
+        project = type(self.project).get_project(root=self.project.root_directory())
+        project._read_cache()
+        assert project._get_persistent_cache_ids() == {calc_id(sp) for sp in statepoints}
+        assert self.project.init_jobs([]) == []
+
+    def test_init_jobs_ids(self):
+        statepoints = [{'a': (i, 1.5), 1: {True: None, 'b': [i]}} for i in range(10)]
+        with mock.patch('signac.contrib.project.calc_ids', wraps=calc_ids) as hasher:
+            for hash_parallel in (False, 2):
+                jobs = self.project.init_jobs(statepoints, hash_parallel=hash_parallel)
+                assert hasher.call_count == 1
+                assert hasher.call_args[1] == dict(parallel=hash_parallel)
+                hasher.reset_mock()
+                for job, sp in zip(jobs, statepoints):
+                    assert job == self.project.open_job(sp)
+                    assert job.statepoint() == self.project.open_job(sp).statepoint()
+                    job._check_manifest()
+        assert len(self.project) == len(statepoints)
+
     def test_open_job_by_id(self):
         statepoints = [{'a': i} for i in range(5)]
         jobs = [self.project.open_job(sp) for sp in statepoints]
@@ -426,6 +668,35 @@ class TestProject(TestProjectBase):
         with pytest.raises(KeyError):
             self.project.open_job(id='abc')
 
+    def test_job_id_prefix_index(self):
+        from signac.contrib.project import _JobIdPrefixIndex
+
+        def min_len_unique_id(job_ids):
+            for i in range(33):
+                if len({_id[:i] for _id in job_ids}) == len(job_ids):
+                    return i
+
+        job_ids = dict.fromkeys(calc_id({'a': i}) for i in range(200))
+        index = _JobIdPrefixIndex(job_ids)
+        assert index.min_len_unique_id() == min_len_unique_id(job_ids)
+        for step in range(20):
+            job_ids = dict(job_ids)
+            if step % 3:
+                job_ids.update(dict.fromkeys(calc_id({'b': step, 'c': i}) for i in range(5)))
+            else:
+                for _id in list(job_ids)[step::40]:
+                    del job_ids[_id]
+            index = index.update(job_ids)
+            assert index._sorted_ids == sorted(job_ids)
+            assert index.min_len_unique_id() == min_len_unique_id(job_ids)
+        for _id in list(job_ids)[:20]:
+            for i in range(1, 8):
+                expected = sorted(j for j in job_ids if j.startswith(_id[:i]))
+                assert index.find(_id[:i]) == expected
+                assert index.find(_id[:i], limit=2) == expected[:2]
+        assert index.find('g') == []
+        assert _JobIdPrefixIndex(dict()).min_len_unique_id() == 0
+
     def test_missing_statepoint_file(self):
         job = self.project.open_job(dict(a=0))
         job.init()
@@ -458,12 +729,72 @@ class TestProject(TestProjectBase):
         finally:
             logging.disable(logging.NOTSET)
 
+    def test_update_cache_journal(self):
+        jobs = [self.project.open_job(dict(a=i)) for i in range(4)]
+        for job in jobs[:3]:
+            job.init()
+        self.project.update_cache()
+        fn_journal = self.project.fn(self.project.FN_CACHE_JOURNAL)
+        # Newly initialized jobs are appended to the journal.
+        jobs[3].init()
+        assert os.path.isfile(fn_journal)
+        project = type(self.project).get_project(root=self.project.root_directory())
+        project._read_cache()
+        assert project._get_persistent_cache_ids() == {job.id for job in jobs}
+        for job in jobs:
+            assert project._get_statepoint_from_cache(job.id) == job.statepoint()
+        # Removals are journaled and replayed incrementally.
+        jobs.pop().remove()
+        self.project.update_cache()
+        offset = project._sp_cache_journal_offset
+        project._read_cache()
+        assert project._sp_cache_journal_offset > offset
+        assert project._get_persistent_cache_ids() == {job.id for job in jobs}
+
+    def test_update_cache_compaction(self):
+        for i in range(3):
+            self.project.open_job(dict(a=i)).init()
+        self.project.update_cache()
+        self.project.open_job(dict(a=3)).init()
+        assert os.path.isfile(self.project.fn(self.project.FN_CACHE_JOURNAL))
+        self.project._sp_cache_compaction_threshold = 0
+        assert self.project.update_cache() == 4
+        assert not os.path.isfile(self.project.fn(self.project.FN_CACHE_JOURNAL))
+        project = type(self.project).get_project(root=self.project.root_directory())
+        project._read_cache()
+        assert len(project._get_persistent_cache_ids()) == 4
+        assert project._sp_cache_journal_entries == 0
+
+    def test_persistent_cache_lazy_lookup(self):
+        statepoints = [{'a': i, 'b': {'c': str(i)}} for i in range(10)]
+        for sp in statepoints:
+            self.project.open_job(sp).init()
+        self.project._sp_cache_compaction_threshold = 0
+        assert self.project.update_cache() == len(statepoints)
+        project = type(self.project).get_project(root=self.project.root_directory())
+        for sp in statepoints:
+            job_id = calc_id(sp)
+            assert job_id not in project._sp_cache
+            assert project.open_job(id=job_id).statepoint() == sp
+        assert project._sp_cache_misses == 0
+        assert project._get_statepoint_from_cache('0' * 32) is None
+        # Persistent cache files written by previous versions are converted.
+        project._remove_persistent_cache_file()
+        with gzip.open(project.fn(project._FN_CACHE_LEGACY), 'wb') as file:
+            file.write(json.dumps({calc_id(sp): sp for sp in statepoints}).encode())
+        project = type(self.project).get_project(root=self.project.root_directory())
+        assert project.open_job(id=calc_id(statepoints[0])).statepoint() == statepoints[0]
+        project.update_cache()
+        assert not os.path.isfile(project.fn(project._FN_CACHE_LEGACY))
+        assert os.path.isfile(project.fn(project.FN_CACHE))
+
     def test_rename_workspace(self):
         job = self.project.open_job(dict(a=0))
         job.init()
         # First, we move the job to the wrong directory.
         wd = job.workspace()
-        wd_invalid = os.path.join(self.project.workspace(), '0' * 32)
+        wd_invalid = self.project._get_job_workspace('0' * 32)
+        os.makedirs(os.path.dirname(wd_invalid), exist_ok=True)
         os.replace(wd, wd_invalid)  # Move to incorrect id.
         assert not os.path.exists(job.workspace())
 
@@ -912,6 +1243,10 @@ class TestProject(TestProjectBase):
             assert len(list(g)) == 1
             for job in list(g):
                 assert str(job.document) == k
+        for k, g in self.project.groupbydoc(lambda doc: doc.b):
+            assert len(list(g)) == 6
+            for job in list(g):
+                assert job.document.b == k
         group_count = 0
         for k, g in self.project.groupbydoc():
             assert len(list(g)) == 1
@@ -1942,6 +2277,28 @@ class TestCachedProject(TestProject):
         repr(self)
 
 
+class TestShardedProject(TestProject):
+
+    @pytest.fixture(autouse=True)
+    def setUpSharding(self, setUp):
+        from signac.contrib.migration import reshard_workspace
+        reshard_workspace(self.project, 2)
+
+    def test_sharded_layout(self):
+        job = self.project.open_job({'a': 0}).init()
+        assert job.workspace() == os.path.join(self.project.workspace(), job.id[:2], job.id)
+        assert os.listdir(self.project.workspace()) == [job.id[:2]]
+        assert list(self.project.find_job_ids()) == [job.id]
+        assert job in self.project
+        job.sp.a = 1
+        assert os.path.isdir(os.path.join(self.project.workspace(), job.id[:2], job.id))
+        assert len(self.project) == 1
+        self.project._sp_cache.clear()
+        assert self.project.open_job(id=job.id[:8]) == job
+        with pytest.raises(KeyError):
+            self.project.open_job(id='0' * 8 if job.id[:2] != '00' else 'f' * 8)
+
+
 class TestProjectInit():
 
     @pytest.fixture(autouse=True)
@@ -2188,6 +2545,24 @@ class TestProjectSchema(TestProjectBase):
         migrations = list(_collect_migrations(self.project))
         assert len(migrations) == 0
 
+    def test_reshard_workspace(self):
+        from signac.contrib.migration import reshard_workspace
+        for i in range(10):
+            self.project.open_job({'a': i}).document['b'] = i
+        job_ids = set(self.project.find_job_ids())
+        reshard_workspace(self.project, 3)
+        assert self.project.config['workspace_shard_length'] == '3'
+        assert all(len(d) == 3 for d in os.listdir(self.project.workspace()))
+        project = signac.get_project(root=self.project.root_directory())
+        assert set(project.find_job_ids()) == job_ids
+        for job in project:
+            assert job.document['b'] == job.sp.a
+        reshard_workspace(project, 0)
+        assert set(os.listdir(project.workspace())) == job_ids
+        assert set(project.find_job_ids()) == job_ids
+        with pytest.raises(ValueError):
+            reshard_workspace(project, 32)
+
 
 class TestProjectPickling(TestProjectBase):
 